@@ -5,13 +5,820 @@
 # 먼저 이미지가 있는 파일을 준비하고, SVG가 저장될 폴더를 생성하는 것이 적절함
 # from png, jpg, bmp, gif, webp 가능
 
+# 폴더 일괄 변환: python "# vtracer_jpgtosvg__script.py" <이미지 폴더> [-o SVG 폴더] [--workers N] [--force]
+# 전처리(선택, Pillow 필요): --max-dim 1024 --colors 16 --denoise 3 → 축소/감색/잡티 제거 후 메모리에서 바로 변환
+# 후처리(선택): --optimize [--precision 2] [--compress gzip|brotli] → SVG 좌표 정리/경로 병합 후 압축본도 저장
+# 자동 튜닝(선택, Pillow/NumPy/cairosvg 필요): --autotune image|folder → 축소본으로 옵션 탐색 후 원본에 적용
+
+import io
 import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import vtracer
 
+# 선택적 의존성: 전처리(축소/감색/잡티 제거)에 사용
+try:
+    from PIL import Image, ImageFilter
+except ImportError:
+    Image = None
+
+# 선택적 의존성: .svg.br 압축
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 선택적 의존성: 자동 튜닝 (SVG 래스터화 + SSIM 계산)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import cairosvg
+except ImportError:
+    cairosvg = None
+
+# vtracer 변환 옵션 (대화형/일괄 변환 공통)
+VTRACER_OPTIONS = {
+    'colormode': 'color',
+    'hierarchical': 'stacked',
+    'mode': 'spline',
+    'filter_speckle': 4,
+    'color_precision': 6,
+    'layer_difference': 16,
+    'corner_threshold': 60,
+    'length_threshold': 4.0,
+    'max_iterations': 10,
+    'splice_threshold': 45,
+    'path_precision': 8
+}
+
+SUPPORTED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp')
+
+# 전처리 옵션: 최대 변 길이(px), 팔레트 색 수, 미디언 필터 크기(홀수) - None/0이면 해당 단계 생략
+PREPROCESS_OPTIONS = {
+    'max_dimension': None,
+    'colors': None,
+    'denoise': 0
+}
+
+# SVG 후처리: 좌표 소수점 자릿수, 인접한 같은 색 경로 병합 여부
+SVG_OPTIMIZE_OPTIONS = {
+    'precision': 2,
+    'merge': True
+}
+COMPRESSED_EXTENSIONS = {'gzip': '.svgz', 'brotli': '.svg.br'}
+
+# 자동 튜닝: 탐색할 옵션 격자, 축소본 최대 변 길이, SSIM 허용 오차(최고 SSIM에서 이만큼 낮아도 더 작은 SVG 선택)
+AUTOTUNE_GRID = {
+    'filter_speckle': [2, 4, 8],
+    'color_precision': [4, 6, 8],
+    'layer_difference': [16, 32],
+    'corner_threshold': [60, 90]
+}
+AUTOTUNE_PROXY_DIMENSION = 256
+AUTOTUNE_SSIM_TOLERANCE = 0.01
+AUTOTUNE_FOLDER_SAMPLES = 3
+AUTOTUNE_CACHE_FILENAME = '.vtracer_autotune.json'
+SSIM_WINDOW = 7
+
+# SVG 경로 파싱용 정규식
+PATH_ELEMENT = re.compile(r'<path\b([^>]*?)/>')
+ATTRIBUTE = re.compile(r'([\w:-]+)="([^"]*)"')
+PATH_TOKEN = re.compile(r'[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+TRANSLATE = re.compile(r'^\s*translate\(\s*([-+\d.eE]+)(?:[\s,]+([-+\d.eE]+))?\s*\)\s*$')
+COMMENT = re.compile(r'<!--.*?-->\s*', re.S)
+SHORT_HEX = re.compile(r'^#([0-9a-fA-F])\1([0-9a-fA-F])\2([0-9a-fA-F])\3$')
+# 명령별 인자 개수 (호 A는 지원하지 않으므로 그런 경로는 원본 유지)
+COMMAND_ARGS = {'M': 2, 'L': 2, 'H': 1, 'V': 1, 'C': 6, 'S': 4, 'Q': 4, 'T': 2, 'Z': 0}
+
 # 마지막으로 성공한 입력 파일을 기억하기 위한 변수 (스크립트 실행 중 유지)
 last_input_path = None
 
-def main():
+
+# ==================== 일괄 변환 ====================
+def available_cores():
+    # 컨테이너/작업 스케줄러가 CPU를 제한한 경우 실제로 쓸 수 있는 코어 수
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def collect_images(input_dir):
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(os.path.join(input_dir, name))
+    )
+
+
+def is_up_to_date(input_path, output_path):
+    # 출력 SVG가 원본보다 새로우면 다시 변환하지 않음
+    try:
+        return os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+    except OSError:
+        return False
+
+
+# ==================== 전처리 ====================
+def preprocess_enabled(preprocess):
+    return bool(preprocess) and any(preprocess.get(key) for key in PREPROCESS_OPTIONS)
+
+
+def preprocess_image(input_path, max_dimension=None, colors=None, denoise=0):
+    """
+    변환 전 이미지 축소 → 잡티 제거 → 팔레트 감색 (모두 메모리에서 처리)
+
+    vtracer의 처리 시간과 path 수는 픽셀 수와 색 수에 비례하므로,
+    미리 줄여 두면 큰 사진도 훨씬 빨리, 작은 SVG로 변환된다.
+
+    Returns:
+        tuple: (PNG 바이트, 원본 크기, 처리 후 크기)
+    """
+    with Image.open(input_path) as source:
+        image = source.convert('RGBA')
+    original_size = image.size
+
+    if max_dimension and max(image.size) > max_dimension:
+        image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    # 투명도는 그대로 두고 색상 채널만 처리
+    alpha = image.getchannel('A')
+    rgb = image.convert('RGB')
+
+    if denoise and denoise >= 3:
+        rgb = rgb.filter(ImageFilter.MedianFilter(denoise | 1))
+
+    if colors:
+        rgb = rgb.quantize(colors=colors, method=Image.MEDIANCUT, dither=Image.NONE).convert('RGB')
+
+    rgb.putalpha(alpha)
+    buffer = io.BytesIO()
+    rgb.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue(), original_size, rgb.size
+
+
+def trace_in_memory(data, img_format, options):
+    # 임시 파일 없이 이미지 바이트를 바로 SVG 문자열로 변환
+    return vtracer.convert_raw_image_to_svg(data, img_format=img_format, **options)
+
+
+# ==================== SVG 후처리 ====================
+def parse_path_data(d):
+    """
+    경로 데이터를 절대 좌표 명령 목록으로 변환
+
+    Returns:
+        list: [(명령, [x, y, ...])] (H/V는 L로 통일), 지원하지 않는 명령이 있으면 None
+    """
+    tokens = PATH_TOKEN.findall(d)
+    segments = []
+    command = None
+    cx = cy = sx = sy = 0.0
+    i = 0
+
+    while i < len(tokens):
+        token = tokens[i]
+        if token.isalpha():
+            command = token
+            i += 1
+            if command in 'Zz':
+                segments.append(('Z', []))
+                cx, cy = sx, sy
+                continue
+        elif command is None or command in 'Zz':
+            return None
+
+        upper = command.upper()
+        count = COMMAND_ARGS.get(upper)
+        if count is None or i + count > len(tokens):
+            return None
+        try:
+            args = [float(value) for value in tokens[i:i + count]]
+        except ValueError:
+            return None
+        i += count
+
+        relative = command.islower()
+        if upper == 'H':
+            points = [args[0] + (cx if relative else 0), cy]
+            upper = 'L'
+        elif upper == 'V':
+            points = [cx, args[0] + (cy if relative else 0)]
+            upper = 'L'
+        elif relative:
+            points = [value + (cx if k % 2 == 0 else cy) for k, value in enumerate(args)]
+        else:
+            points = args
+
+        segments.append((upper, points))
+        cx, cy = points[-2], points[-1]
+        if upper == 'M':
+            sx, sy = cx, cy
+            # M 뒤에 이어지는 좌표쌍은 L로 해석
+            command = 'l' if relative else 'L'
+
+    return segments
+
+
+def format_number(value, precision):
+    # 가장 짧은 숫자 표기 (0.5 → .5, -0 → 0)
+    text = f"{value:.{precision}f}"
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def join_numbers(numbers):
+    # '-' 앞과 소수점이 이미 있는 숫자 뒤의 '.'는 구분 공백 생략 가능
+    out = []
+    previous = ''
+    for number in numbers:
+        if out and not number.startswith('-') and not (number.startswith('.') and '.' in previous):
+            out.append(' ')
+        out.append(number)
+        previous = number
+    return ''.join(out)
+
+
+def serialize_relative(segments, precision):
+    """
+    절대 좌표 명령을 반올림 후 상대 명령(첫 M만 절대)으로 직렬화
+
+    누적 오차가 생기지 않도록 절대 좌표를 먼저 반올림하고 그 차이를 상대값으로 쓴다.
+    """
+    parts = []
+    cx = cy = sx = sy = 0.0
+    last_letter = None
+
+    for index, (command, points) in enumerate(segments):
+        if command == 'Z':
+            parts.append('z')
+            cx, cy = sx, sy
+            last_letter = 'z'
+            continue
+
+        rounded = [round(value, precision) for value in points]
+        if index == 0:
+            letter = 'M'
+            values = rounded
+        else:
+            letter = command.lower()
+            values = [value - (cx if k % 2 == 0 else cy) for k, value in enumerate(rounded)]
+
+        formatted = [format_number(value, precision) for value in values]
+        # 수평/수직 직선은 h/v로 줄임
+        if letter == 'l' and formatted[0] == '0':
+            letter, formatted = 'v', formatted[1:]
+        elif letter == 'l' and formatted[1] == '0':
+            letter, formatted = 'h', formatted[:1]
+        numbers = join_numbers(formatted)
+        # 같은 명령이 이어지면 명령 문자 생략 (M/m 뒤의 좌표쌍은 L로 해석되므로 제외)
+        if letter == last_letter and letter not in 'Mm':
+            separator = '' if numbers.startswith('-') else ' '
+            parts.append(separator + numbers)
+        else:
+            parts.append(letter + numbers)
+        last_letter = letter
+
+        cx, cy = rounded[-2], rounded[-1]
+        if command == 'M':
+            sx, sy = cx, cy
+
+    return ''.join(parts)
+
+
+def path_bounds(segments):
+    xs = [value for _, points in segments for value in points[0::2]]
+    ys = [value for _, points in segments for value in points[1::2]]
+    if not xs:
+        return None
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def bounds_overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def is_invisible(attributes):
+    no_stroke = attributes.get('stroke', 'none') == 'none'
+    if attributes.get('opacity') in ('0', '0.0'):
+        return True
+    if no_stroke and (attributes.get('fill') == 'none' or attributes.get('fill-opacity') in ('0', '0.0')):
+        return True
+    return False
+
+
+def build_path_element(d, attributes):
+    rest = ''.join(f' {name}="{value}"' for name, value in attributes.items())
+    return f'<path d="{d}"{rest}/>'
+
+
+def optimize_svg(svg, precision=2, merge=True):
+    """
+    vtracer SVG 최적화: 좌표 반올림, 상대 명령 변환, translate 반영,
+    보이지 않거나 면적이 없는 경로 제거, 인접한 같은 색 경로 병합
+
+    병합은 바로 이웃한 경로끼리, 영역(bounding box)이 겹치지 않을 때만 한다.
+    (쌓인 순서가 바뀌거나 nonzero 채우기 규칙에서 겹친 부분이 구멍이 되는 것을 막기 위해)
+
+    Returns:
+        tuple: (최적화된 SVG 문자열, {"paths_in", "paths_out", "dropped", "merged"})
+    """
+    stats = {'paths_in': 0, 'paths_out': 0, 'dropped': 0, 'merged': 0}
+    matches = list(PATH_ELEMENT.finditer(svg))
+    if not matches:
+        return svg, stats
+
+    out = [COMMENT.sub('', svg[:matches[0].start()])]
+    group = None  # {"key", "ds", "bounds", "attributes"}
+
+    def flush():
+        nonlocal group
+        if group is not None:
+            out.append(build_path_element(''.join(group['ds']), group['attributes']) + '\n')
+            stats['paths_out'] += 1
+            group = None
+
+    previous_end = matches[0].start()
+    for match in matches:
+        between = svg[previous_end:match.start()]
+        previous_end = match.end()
+        if between.strip():
+            # 경로 사이의 다른 요소는 그대로 두고 병합 경계로 취급
+            flush()
+            out.append(between)
+
+        stats['paths_in'] += 1
+        attributes = dict(ATTRIBUTE.findall(match.group(1)))
+        if is_invisible(attributes):
+            stats['dropped'] += 1
+            continue
+
+        d = attributes.pop('d', '')
+        segments = parse_path_data(d)
+        translate = TRANSLATE.match(attributes.get('transform', '')) if 'transform' in attributes else None
+        if segments is None or ('transform' in attributes and translate is None):
+            # 해석할 수 없는 경로/변환은 원본 그대로
+            flush()
+            out.append(match.group(0) + '\n')
+            stats['paths_out'] += 1
+            continue
+
+        if translate is not None:
+            tx, ty = float(translate.group(1)), float(translate.group(2) or 0)
+            segments = [(command, [value + (tx if k % 2 == 0 else ty) for k, value in enumerate(points)])
+                        for command, points in segments]
+            del attributes['transform']
+
+        segments = [(command, [round(value, precision) for value in points]) for command, points in segments]
+        bounds = path_bounds(segments)
+        if bounds is None or bounds[0] == bounds[2] or bounds[1] == bounds[3]:
+            stats['dropped'] += 1
+            continue
+
+        fill = attributes.get('fill')
+        if fill:
+            short = SHORT_HEX.match(fill)
+            attributes['fill'] = f'#{short.group(1)}{short.group(2)}{short.group(3)}'.lower() if short else fill.lower()
+
+        d = serialize_relative(segments, precision)
+        key = tuple(sorted(attributes.items()))
+        if (merge and group is not None and group['key'] == key
+                and not any(bounds_overlap(bounds, other) for other in group['bounds'])):
+            group['ds'].append(d)
+            group['bounds'].append(bounds)
+            stats['merged'] += 1
+            continue
+
+        flush()
+        group = {'key': key, 'ds': [d], 'bounds': [bounds], 'attributes': attributes}
+
+    flush()
+    out.append(svg[previous_end:].lstrip('\n'))
+    return ''.join(out), stats
+
+
+def write_compressed(output_path, data, method):
+    # 웹 배포용 사전 압축본 저장 (.svgz 또는 .svg.br)
+    if method == 'brotli':
+        if brotli is None:
+            raise RuntimeError("brotli 압축에는 brotli 패키지가 필요합니다 (pip install brotli)")
+        payload = brotli.compress(data, quality=11)
+    else:
+        payload = gzip.compress(data, compresslevel=9)
+    compressed_path = os.path.splitext(output_path)[0] + COMPRESSED_EXTENSIONS[method]
+    with open(compressed_path, 'wb') as f:
+        f.write(payload)
+    return len(payload)
+
+
+def convert_one(input_path, output_path, options=None, preprocess=None, compare=False,
+                optimize=None, compress=None):
+    """
+    이미지 한 장을 SVG로 변환 (프로세스 풀 작업 단위)
+
+    후처리가 필요하면 변환 결과를 디스크에서 다시 읽지 않도록 메모리에서 변환해 같은 작업 안에서 최적화한다.
+
+    Args:
+        preprocess: 전처리 옵션 (PREPROCESS_OPTIONS 형식, 비어 있으면 원본 그대로 변환)
+        compare: True면 원본 해상도로도 변환해 전처리로 줄어든 시간/크기 비교
+        optimize: SVG 후처리 옵션 (SVG_OPTIMIZE_OPTIONS 형식, None이면 생략)
+        compress: 'gzip' 또는 'brotli'면 압축본도 저장
+
+    Returns:
+        dict: {"input", "output", "seconds", "svg_bytes", "raw_svg_bytes", "trace_seconds",
+               ["preprocess_seconds", "source_size", "traced_size"], ["baseline_seconds", "baseline_bytes"],
+               ["optimize_stats"], ["compressed_bytes"]}
+    """
+    options = options or VTRACER_OPTIONS
+    started = time.perf_counter()
+    result = {'input': input_path, 'output': output_path}
+    img_format = os.path.splitext(input_path)[1][1:].lower()
+    original = None
+
+    if preprocess_enabled(preprocess) and Image is not None:
+        data, result['source_size'], result['traced_size'] = preprocess_image(input_path, **preprocess)
+        result['preprocess_seconds'] = time.perf_counter() - started
+        trace_format = 'png'
+    elif optimize is not None or compress:
+        with open(input_path, 'rb') as f:
+            data = original = f.read()
+        trace_format = img_format
+    else:
+        data = None
+
+    trace_started = time.perf_counter()
+    if data is None:
+        vtracer.convert_image_to_svg_py(input_path, output_path, **options)
+        result['trace_seconds'] = time.perf_counter() - trace_started
+        result['seconds'] = time.perf_counter() - started
+        result['svg_bytes'] = result['raw_svg_bytes'] = os.path.getsize(output_path)
+        return result
+
+    svg = trace_in_memory(data, trace_format, options)
+    result['trace_seconds'] = time.perf_counter() - trace_started
+    result['raw_svg_bytes'] = len(svg.encode('utf-8'))
+
+    if optimize is not None:
+        svg, result['optimize_stats'] = optimize_svg(svg, **optimize)
+
+    encoded = svg.encode('utf-8')
+    with open(output_path, 'wb') as f:
+        f.write(encoded)
+    result['svg_bytes'] = len(encoded)
+    if compress:
+        result['compressed_bytes'] = write_compressed(output_path, encoded, compress)
+
+    if compare and 'traced_size' in result:
+        if original is None:
+            with open(input_path, 'rb') as f:
+                original = f.read()
+        baseline_started = time.perf_counter()
+        baseline_svg = trace_in_memory(original, img_format, options)
+        result['baseline_seconds'] = time.perf_counter() - baseline_started
+        result['baseline_bytes'] = len(baseline_svg.encode('utf-8'))
+
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def format_result(result):
+    # 이미지별 보고 한 줄
+    line = f"{result['seconds']:.2f}초, SVG {result['svg_bytes'] / 1024:.1f} KB"
+    if 'traced_size' in result:
+        (w0, h0), (w1, h1) = result['source_size'], result['traced_size']
+        line += f" ({w0}x{h0} → {w1}x{h1}, 전처리 {result['preprocess_seconds']:.2f}초 + 변환 {result['trace_seconds']:.2f}초)"
+    if 'optimize_stats' in result:
+        stats = result['optimize_stats']
+        ratio = 1 - result['svg_bytes'] / result['raw_svg_bytes'] if result['raw_svg_bytes'] else 0
+        line += (f" | 최적화 {result['raw_svg_bytes'] / 1024:.1f} → {result['svg_bytes'] / 1024:.1f} KB ({ratio:.0%} 감소), "
+                 f"경로 {stats['paths_in']} → {stats['paths_out']}")
+    if 'compressed_bytes' in result:
+        line += f", 압축본 {result['compressed_bytes'] / 1024:.1f} KB"
+    if 'baseline_seconds' in result:
+        saved_time = result['baseline_seconds'] - result['trace_seconds']
+        saved_bytes = result['baseline_bytes'] - result['raw_svg_bytes']
+        line += f" | 원본 대비 변환 {saved_time:+.2f}초 절약, {saved_bytes / 1024:+.1f} KB 절약"
+    return line
+
+
+# ==================== 자동 튜닝 ====================
+def autotune_available():
+    return Image is not None and np is not None and cairosvg is not None
+
+
+def file_sha1(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def grid_signature():
+    # 격자나 축소 크기가 바뀌면 캐시를 무효화
+    raw = json.dumps([AUTOTUNE_GRID, AUTOTUNE_PROXY_DIMENSION, AUTOTUNE_SSIM_TOLERANCE], sort_keys=True)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def grid_candidates():
+    keys = list(AUTOTUNE_GRID)
+    return [dict(zip(keys, values)) for values in itertools.product(*(AUTOTUNE_GRID[key] for key in keys))]
+
+
+def to_grayscale_array(image):
+    # 투명 영역은 흰 배경에 합성한 뒤 밝기 배열로
+    background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+    background.alpha_composite(image.convert('RGBA'))
+    return np.asarray(background.convert('L'), dtype=np.float64)
+
+
+def make_proxy(input_path, preprocess=None):
+    """
+    튜닝용 축소본 생성 (전처리 옵션이 있으면 같은 전처리를 적용한 뒤 축소)
+
+    Returns:
+        tuple: (PNG 바이트, 실제 변환 해상도 대비 축소 비율)
+    """
+    if preprocess_enabled(preprocess):
+        data, _, render_size = preprocess_image(input_path, **preprocess)
+        image = Image.open(io.BytesIO(data))
+    else:
+        with Image.open(input_path) as source:
+            image = source.convert('RGBA')
+        render_size = image.size
+
+    image.thumbnail((AUTOTUNE_PROXY_DIMENSION, AUTOTUNE_PROXY_DIMENSION), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue(), image.size[0] / render_size[0]
+
+
+def make_proxy_scale(input_path, preprocess=None):
+    # 축소본을 만들지 않고 축소 비율만 계산 (이미지 헤더만 읽음)
+    with Image.open(input_path) as image:
+        width, height = image.size
+    max_dimension = (preprocess or {}).get('max_dimension') if preprocess_enabled(preprocess) else None
+    if max_dimension and max(width, height) > max_dimension:
+        width, height = (width * max_dimension / max(width, height), height * max_dimension / max(width, height))
+    long_side = max(width, height)
+    return min(1.0, AUTOTUNE_PROXY_DIMENSION / long_side) if long_side else 1.0
+
+
+def ssim(a, b, window=SSIM_WINDOW):
+    """
+    균일 창 SSIM (밝기 0~255 배열, 적분 영상으로 창 평균 계산)
+    """
+    def box_mean(x):
+        c = np.pad(x, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+        return (c[window:, window:] - c[:-window, window:] - c[window:, :-window] + c[:-window, :-window]) / (window * window)
+
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    mu_a, mu_b = box_mean(a), box_mean(b)
+    var_a = box_mean(a * a) - mu_a ** 2
+    var_b = box_mean(b * b) - mu_b ** 2
+    covariance = box_mean(a * b) - mu_a * mu_b
+    score = ((2 * mu_a * mu_b + c1) * (2 * covariance + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(score.mean())
+
+
+def score_candidate(proxy_png, candidate):
+    """
+    후보 옵션으로 축소본을 변환해 (SSIM, SVG 바이트) 반환 (프로세스 풀 작업 단위)
+    """
+    options = dict(VTRACER_OPTIONS, **candidate)
+    svg = trace_in_memory(proxy_png, 'png', options).encode('utf-8')
+
+    reference = Image.open(io.BytesIO(proxy_png))
+    width, height = reference.size
+    rendered = Image.open(io.BytesIO(cairosvg.svg2png(bytestring=svg, output_width=width, output_height=height)))
+    return ssim(to_grayscale_array(reference), to_grayscale_array(rendered)), len(svg)
+
+
+def choose_candidate(scores):
+    """
+    최고 SSIM에서 허용 오차 이내인 후보 중 가장 작은 SVG를 선택
+
+    Args:
+        scores: [(후보 옵션, 평균 SSIM, 합계 바이트)]
+    """
+    best_ssim = max(score for _, score, _ in scores)
+    acceptable = [item for item in scores if item[1] >= best_ssim - AUTOTUNE_SSIM_TOLERANCE]
+    return min(acceptable, key=lambda item: (item[2], -item[1]))
+
+
+def scale_to_render(candidate, scale):
+    # filter_speckle은 픽셀 단위이므로 축소본에서 찾은 값을 실제 변환 해상도로 환산
+    scaled = dict(candidate)
+    if scale > 0:
+        scaled['filter_speckle'] = max(1, min(128, round(candidate['filter_speckle'] / scale)))
+    return scaled
+
+
+def tune_images(executor, image_paths, preprocess=None):
+    """
+    이미지들의 축소본에 격자 후보를 병렬 적용해 가장 좋은 옵션 탐색 (여러 장이면 점수 합산)
+
+    Returns:
+        tuple: (선택된 옵션(축소본 기준), 평균 SSIM, 합계 바이트, 축소 비율 목록)
+    """
+    proxies = [make_proxy(path, preprocess) for path in image_paths]
+    candidates = grid_candidates()
+    futures = {
+        (index, proxy_index): executor.submit(score_candidate, proxy_png, candidate)
+        for index, candidate in enumerate(candidates)
+        for proxy_index, (proxy_png, _) in enumerate(proxies)
+    }
+
+    scores = []
+    for index, candidate in enumerate(candidates):
+        results = [futures[(index, proxy_index)].result() for proxy_index in range(len(proxies))]
+        scores.append((candidate, sum(r[0] for r in results) / len(results), sum(r[1] for r in results)))
+
+    candidate, score, size = choose_candidate(scores)
+    return candidate, score, size, [scale for _, scale in proxies]
+
+
+def load_autotune_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if cache.get('grid') != grid_signature():
+        cache = {'grid': grid_signature(), 'images': {}, 'folder': None}
+    return cache
+
+
+def save_autotune_cache(cache_path, cache):
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, cache_path)
+
+
+def autotune_options(executor, input_dir, image_paths, mode, preprocess=None):
+    """
+    이미지별 vtracer 옵션 결정 (캐시 우선)
+
+    mode='image': 이미지 내용 해시마다 튜닝 결과를 캐시
+    mode='folder': 폴더에서 몇 장을 골라 한 번 튜닝하고 모든 이미지에 적용
+    캐시는 입력 폴더의 .vtracer_autotune.json에 축소본 기준 옵션으로 저장하고,
+    filter_speckle은 이미지마다 실제 변환 해상도에 맞춰 환산한다.
+
+    Returns:
+        dict: {이미지 경로: vtracer 옵션}
+    """
+    cache_path = os.path.join(input_dir, AUTOTUNE_CACHE_FILENAME)
+    cache = load_autotune_cache(cache_path)
+    preprocess_key = json.dumps(preprocess if preprocess_enabled(preprocess) else None, sort_keys=True)
+    tuned = {}
+
+    if mode == 'folder':
+        entry = cache.get('folder')
+        if entry is None or entry.get('preprocess') != preprocess_key:
+            # 이름순으로 고르게 뽑은 표본으로 튜닝
+            step = max(1, len(image_paths) // AUTOTUNE_FOLDER_SAMPLES)
+            samples = image_paths[::step][:AUTOTUNE_FOLDER_SAMPLES]
+            candidate, score, _, _ = tune_images(executor, samples, preprocess)
+            entry = {'preprocess': preprocess_key, 'options': candidate, 'ssim': score}
+            cache['folder'] = entry
+            print(f"폴더 튜닝 ({len(samples)}장 표본): {candidate} (SSIM {score:.3f})")
+        else:
+            print(f"폴더 튜닝 캐시 사용: {entry['options']}")
+        for path in image_paths:
+            tuned[path] = dict(VTRACER_OPTIONS, **scale_to_render(entry['options'], make_proxy_scale(path, preprocess)))
+    else:
+        hits = 0
+        for path in image_paths:
+            key = f"{file_sha1(path)}:{preprocess_key}"
+            entry = cache['images'].get(key)
+            if entry is None:
+                candidate, score, _, (scale,) = tune_images(executor, [path], preprocess)
+                entry = {'options': candidate, 'ssim': score, 'scale': scale}
+                cache['images'][key] = entry
+                print(f"튜닝: {os.path.basename(path)} → {candidate} (SSIM {score:.3f})")
+            else:
+                hits += 1
+            tuned[path] = dict(VTRACER_OPTIONS, **scale_to_render(entry['options'], entry['scale']))
+        print(f"이미지 튜닝 캐시 적중 {hits}/{len(image_paths)}개")
+
+    save_autotune_cache(cache_path, cache)
+    return tuned
+
+
+def batch_convert(input_dir, output_dir=None, workers=None, force=False, options=None,
+                  preprocess=None, compare=False, optimize=None, compress=None, autotune=None):
+    """
+    폴더 안의 이미지를 프로세스 풀로 일괄 변환하고 이미지별 시간/크기 보고
+
+    Args:
+        input_dir: 이미지 폴더
+        output_dir: SVG 저장 폴더 (None이면 이미지 폴더)
+        workers: 프로세스 수 (None이면 사용 가능한 코어 수)
+        force: True면 최신 SVG가 있어도 다시 변환
+        options: vtracer 옵션 (None이면 VTRACER_OPTIONS)
+        preprocess: 전처리 옵션 (PREPROCESS_OPTIONS 형식)
+        compare: 원본 해상도 변환과 시간/크기 비교
+        optimize: SVG 후처리 옵션 (SVG_OPTIMIZE_OPTIONS 형식, None이면 생략)
+        compress: 'gzip' 또는 'brotli'면 압축본도 저장
+        autotune: 'image' 또는 'folder'면 축소본으로 옵션을 자동 탐색해 적용
+
+    Returns:
+        list: 변환 결과 목록
+    """
+    output_dir = output_dir or input_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    if preprocess_enabled(preprocess) and Image is None:
+        print("경고: Pillow가 설치되지 않아 전처리 없이 변환합니다. (pip install pillow)")
+    if compress == 'brotli' and brotli is None:
+        print("오류: brotli 압축에는 brotli 패키지가 필요합니다. (pip install brotli)")
+        return []
+    if autotune and not autotune_available():
+        print("경고: 자동 튜닝에는 Pillow, NumPy, cairosvg가 필요합니다. 기본 옵션으로 변환합니다.")
+        autotune = None
+
+    jobs = []
+    skipped = 0
+    for input_path in collect_images(input_dir):
+        filename = os.path.splitext(os.path.basename(input_path))[0] + ".svg"
+        output_path = os.path.join(output_dir, filename)
+        if not force and is_up_to_date(input_path, output_path):
+            skipped += 1
+            continue
+        jobs.append((input_path, output_path))
+
+    print(f"변환 대상 {len(jobs)}개 (최신 SVG가 있어 건너뜀 {skipped}개)")
+    if not jobs:
+        return []
+
+    workers = workers or available_cores()
+    results = []
+    failed = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        job_options = {input_path: options for input_path, _ in jobs}
+        if autotune:
+            tune_started = time.perf_counter()
+            job_options = autotune_options(executor, input_dir, [path for path, _ in jobs], autotune, preprocess)
+            print(f"자동 튜닝 {time.perf_counter() - tune_started:.1f}초\n")
+
+        futures = {executor.submit(convert_one, input_path, output_path, job_options[input_path], preprocess,
+                                   compare, optimize, compress): input_path
+                   for input_path, output_path in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            name = os.path.basename(futures[future])
+            try:
+                result = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(jobs)}] 오류: {name} ({e})")
+                continue
+            results.append(result)
+            print(f"[{done}/{len(jobs)}] {name}: {format_result(result)}")
+
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(result['svg_bytes'] for result in results)
+    cpu_seconds = sum(result['seconds'] for result in results)
+    print(f"\n완료: {len(results)}개 성공, {failed}개 실패, 경과 {elapsed:.1f}초 "
+          f"(이미지별 합계 {cpu_seconds:.1f}초, {workers}개 프로세스), SVG 합계 {total_bytes / 1024 / 1024:.2f} MB")
+
+    optimized = [result for result in results if 'optimize_stats' in result]
+    if optimized:
+        raw_bytes = sum(result['raw_svg_bytes'] for result in optimized)
+        optimized_bytes = sum(result['svg_bytes'] for result in optimized)
+        print(f"SVG 최적화: {raw_bytes / 1024 / 1024:.2f} MB → {optimized_bytes / 1024 / 1024:.2f} MB")
+
+    compared = [result for result in results if 'baseline_seconds' in result]
+    if compared:
+        baseline_seconds = sum(result['baseline_seconds'] for result in compared)
+        trace_seconds = sum(result['trace_seconds'] for result in compared)
+        baseline_bytes = sum(result['baseline_bytes'] for result in compared)
+        traced_bytes = sum(result['raw_svg_bytes'] for result in compared)
+        print(f"전처리 효과: 변환 시간 {baseline_seconds:.1f}초 → {trace_seconds:.1f}초, "
+              f"SVG {baseline_bytes / 1024 / 1024:.2f} MB → {traced_bytes / 1024 / 1024:.2f} MB")
+    return results
+
+
+# ==================== 대화형 변환 ====================
+def interactive():
     global last_input_path
     print("PNG/JPG 이미지를 SVG로 변환하는 스크립트입니다.\n")
     
@@ -59,21 +866,7 @@ def main():
         print("\n변환 중입니다... (이미지 크기에 따라 시간이 걸릴 수 있습니다)")
         
         try:
-            vtracer.convert_image_to_svg_py(
-                input_path,
-                output_path,
-                colormode='color',
-                hierarchical='stacked',
-                mode='spline',
-                filter_speckle=4,
-                color_precision=6,
-                layer_difference=16,
-                corner_threshold=60,
-                length_threshold=4.0,
-                max_iterations=10,
-                splice_threshold=45,
-                path_precision=8
-            )
+            vtracer.convert_image_to_svg_py(input_path, output_path, **VTRACER_OPTIONS)
             
             print(f"\n완료! SVG 파일이 저장되었습니다: {output_path}\n")
             
@@ -90,5 +883,39 @@ def main():
 
     print("스크립트를 종료합니다.")
 
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="이미지를 SVG로 변환 (폴더를 주면 일괄 변환)")
+    parser.add_argument("input_dir", nargs="?", help="이미지 폴더 (생략하면 대화형 모드)")
+    parser.add_argument("-o", "--output-dir", default=None, help="SVG 저장 폴더 (기본: 이미지 폴더)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: 사용 가능한 코어 수)")
+    parser.add_argument("--force", action="store_true", help="최신 SVG가 있어도 다시 변환")
+    parser.add_argument("--max-dim", type=int, default=None, help="전처리: 긴 변을 이 길이(px)로 축소")
+    parser.add_argument("--colors", type=int, default=None, help="전처리: 팔레트 색 수로 감색")
+    parser.add_argument("--denoise", type=int, default=0, help="전처리: 미디언 필터 크기 (3, 5, ...)")
+    parser.add_argument("--compare", action="store_true", help="원본 해상도 변환과 시간/크기 비교 보고")
+    parser.add_argument("--optimize", action="store_true", help="SVG 후처리 (좌표 반올림, 상대 명령, 경로 병합/정리)")
+    parser.add_argument("--precision", type=int, default=SVG_OPTIMIZE_OPTIONS['precision'], help="후처리 좌표 소수점 자릿수")
+    parser.add_argument("--no-merge", action="store_true", help="후처리에서 같은 색 경로 병합 안 함")
+    parser.add_argument("--compress", choices=tuple(COMPRESSED_EXTENSIONS), default=None, help="압축본(.svgz/.svg.br)도 저장")
+    parser.add_argument("--autotune", choices=("image", "folder"), default=None,
+                        help="축소본으로 옵션 자동 탐색 (image: 이미지별, folder: 폴더 공통), 결과는 캐시")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.input_dir is None:
+        interactive()
+    elif not os.path.isdir(args.input_dir):
+        print(f"오류: '{args.input_dir}' 폴더를 찾을 수 없습니다.")
+        sys.exit(1)
+    else:
+        preprocess = {'max_dimension': args.max_dim, 'colors': args.colors, 'denoise': args.denoise}
+        optimize = {'precision': args.precision, 'merge': not args.no_merge} if args.optimize else None
+        batch_convert(args.input_dir, args.output_dir, args.workers, args.force,
+                      preprocess=preprocess, compare=args.compare, optimize=optimize, compress=args.compress,
+                      autotune=args.autotune)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,66 +4,64 @@ Audio LP Effect Processor
 """
 
 import os
+import io
 import sys
+import json
+import hashlib
+import argparse
+from fractions import Fraction
 import numpy as np
 import soundfile as sf
 from scipy.signal import resample_poly
 from pedalboard import Pedalboard, Chorus, Distortion, LowpassFilter, Compressor, Gain
-from mutagen.flac import FLAC
-from mutagen.id3 import ID3, TIT2
-from mutagen.mp4 import MP4
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import ID3, TIT2, APIC, ID3NoHeaderError
+from mutagen.mp4 import MP4, MP4Cover
 from mutagen.wave import WAVE
 from mutagen import MutagenError, File as MutagenFile
 from pydub import AudioSegment
 import shutil
+import lp_kernels
+import lp_fingerprint
+import lp_thumbnails
+from lp_presets import EffectConfig, PresetStore
+
+# 앨범 아트 축소/재압축용 (선택 사항)
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
 
 
 # ==================== 상수 정의 ====================
 SUPPORTED_INPUT_FORMATS = {".wav", ".flac", ".mp3", ".m4a", ".aac", ".ogg"}
 
-EFFECT_PRESETS = {
-    "1": {
-        "label": "Piano/Modern",
-        "speed": 0.98,
-        "cutoff": 14000,
-        "sat": 4,
-        "wf_rate": 0.6,
-        "wf_depth": 0.015,
-        "crackle_amt": 0,
-        "crackle_cps": 0
-    },
-    "2": {
-        "label": "Hardbop/Brass",
-        "speed": 0.97,
-        "cutoff": 12000,
-        "sat": 6,
-        "wf_rate": 0.7,
-        "wf_depth": 0.02,
-        "crackle_amt": 0.0012,
-        "crackle_cps": 0.8
-    },
-    "3": {
-        "label": "Vocal Jazz",
-        "speed": 0.99,
-        "cutoff": 11000,
-        "sat": 6,
-        "wf_rate": 0,
-        "wf_depth": 0,
-        "crackle_amt": 0.0018,
-        "crackle_cps": 1.2
-    },
-    "4": {
-        "label": "Fusion/Electric",
-        "speed": 0.96,
-        "cutoff": 10000,
-        "sat": 9,
-        "wf_rate": 0.9,
-        "wf_depth": 0.03,
-        "crackle_amt": 0,
-        "crackle_cps": 0
-    }
+# 배치 체크포인트(저널) 파일명 및 임시 출력 파일 접미사
+CHECKPOINT_FILENAME = ".lp_checkpoint.jsonl"
+PARTIAL_SUFFIX = ".partial"
+
+# 앨범 아트 준비 설정 (None이면 원본 그대로 사용, 축소/재압축에는 Pillow 필요)
+ALBUM_ART_MAX_DIMENSION = None   # 예: 1000 → 긴 변을 1000px 이하로 축소
+ALBUM_ART_MAX_BYTES = None       # 예: 500_000 → JPEG 재압축 목표 크기
+ALBUM_ART_JPEG_QUALITY = 90
+
+OUTPUT_EXTENSIONS = {
+    "flac": ".flac",
+    "m4a": ".m4a",
+    "mp3": ".mp3",
+    "wav": ".wav",
+    "cd": ".wav"
 }
 
+# 처리 샘플레이트 계획: 출력 코덱이 버리는 대역까지 렌더링하지 않도록 필요한 만큼만 사용
+PROCESSING_RATES = (44100, 48000, 88200, 96000, 176400, 192000)
+MIN_PROCESSING_RATE = 44100      # 이보다 낮은 표준 레이트로는 내리지 않음 (원본이 더 낮으면 원본 유지)
+BANDWIDTH_MARGIN = 1.1           # 로우패스 전이 대역을 위한 나이퀴스트 여유
+CODEC_BANDWIDTH_HZ = {"mp3": 20000}   # 320kbps 인코더가 자체적으로 걸러내는 대역
+CODEC_MAX_RATE = {"mp3": 48000}
+FIXED_OUTPUT_RATES = {"cd": 44100}
+LOSSLESS_FORMATS = ("flac", "m4a", "wav")   # 처리 레이트를 낮춰도 원본 레이트로 되돌려 저장
+
 
 # ==================== 오디오 입출력 함수 ====================
 def load_audio_any(file_path):
@@ -135,6 +133,114 @@ def write_mp3(file_path, audio_data, sample_rate, bitrate="320k"):
     segment.export(file_path, format="mp3", bitrate=bitrate)
 
 
+# ==================== 원자적 저장 및 체크포인트 ====================
+def partial_output_path(output_path):
+    """
+    원자적 저장을 위한 임시 파일 경로 생성
+    
+    확장자로 저장 포맷을 판별하므로 원래 확장자는 그대로 유지한다.
+    (예: LP_out/LP_song.flac → LP_out/.LP_song.partial.flac)
+    """
+    directory, filename = os.path.split(output_path)
+    stem, extension = os.path.splitext(filename)
+    return os.path.join(directory, f".{stem}{PARTIAL_SUFFIX}{extension}")
+
+
+def fsync_file(file_path):
+    """파일 내용을 디스크에 강제로 기록"""
+    with open(file_path, "rb+") as f:
+        os.fsync(f.fileno())
+
+
+def cleanup_partial_outputs(output_dir):
+    """
+    이전 실행에서 중단되어 남은 임시 출력 파일 삭제
+    
+    Returns:
+        int: 삭제된 파일 수
+    """
+    if not os.path.isdir(output_dir):
+        return 0
+    
+    removed = 0
+    for filename in os.listdir(output_dir):
+        stem = os.path.splitext(filename)[0]
+        if filename.startswith(".") and stem.endswith(PARTIAL_SUFFIX):
+            try:
+                os.remove(os.path.join(output_dir, filename))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def render_settings_key(config, seed=0, streaming=False):
+    """
+    출력을 결정하는 렌더링 설정(해석된 EffectConfig + 시드 + 렌더링 경로)의 해시
+    
+    체크포인트 항목에 함께 기록해, 프리셋/슬라이더/.lpconfig를 바꾼 뒤 --resume 하면
+    예전 설정으로 만든 출력을 건너뛰지 않고 다시 처리하게 한다.
+    스트리밍 처리(lp_batch)는 메모리 내 처리와 출력이 다르므로 키를 구분한다.
+    (메모리 내 처리의 키는 예전 저널과 호환되도록 그대로 둔다)
+    """
+    settings = {"config": EffectConfig.coerce(config).to_dict(), "seed": seed}
+    if streaming:
+        settings["render"] = "streaming"
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    체크포인트 저널에서 완료된 항목 읽기
+    
+    같은 출력 파일에 대한 항목이 여러 번 있으면 마지막 항목만 유효하고,
+    출력 파일이 존재하며 기록된 SHA-256과 내용이 같은 항목만 완료로 본다.
+    
+    Args:
+        checkpoint_path: 체크포인트 파일 경로
+        
+    Returns:
+        set: 완료된 (원본 경로, 출력 포맷, 렌더링 설정 키) 집합
+    """
+    completed = set()
+    if not os.path.exists(checkpoint_path):
+        return completed
+    
+    latest = {}
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 기록 도중 중단된 마지막 줄은 무시
+                continue
+            latest[entry["output"]] = entry
+    
+    for output_path, entry in latest.items():
+        # 설정 키가 없는 예전 형식 항목은 다시 처리
+        if "settings" not in entry or not os.path.exists(output_path):
+            continue
+        if file_sha256(output_path) != entry.get("sha256"):
+            continue
+        completed.add((entry["source"], entry["format"], entry["settings"]))
+    return completed
+
+
+def append_checkpoint(checkpoint_path, source_path, output_path, output_format, settings_key):
+    """완료된 항목을 체크포인트 저널에 즉시 기록 (fsync 포함)"""
+    entry = {
+        "source": os.path.abspath(source_path),
+        "output": os.path.abspath(output_path),
+        "format": output_format,
+        "settings": settings_key,
+        "sha256": file_sha256(output_path)
+    }
+    with open(checkpoint_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
 # ==================== 메타데이터 처리 ====================
 def read_metadata(file_path):
     """
@@ -154,7 +260,8 @@ def read_metadata(file_path):
         metadata = {
             'tags': {},
             'audio_object': audio,
-            'format': type(audio).__name__
+            'format': type(audio).__name__,
+            'album_art': extract_album_art(audio)
         }
         
         # 모든 태그 복사
@@ -219,6 +326,8 @@ def copy_metadata(source_path, dest_path, new_title=None):
             elif isinstance(dest_audio, MP4):
                 mp4_dest = MP4(dest_path)
                 for key, value in source_metadata['tags'].items():
+                    if key == 'covr':
+                        continue
                     if key != '\xa9nam' or not new_title:
                         mp4_dest[key] = value
                 if new_title:
@@ -227,6 +336,8 @@ def copy_metadata(source_path, dest_path, new_title=None):
                 
             elif hasattr(dest_audio, 'tags'):
                 for key, value in source_metadata['tags'].items():
+                    if key.startswith('APIC'):
+                        continue
                     try:
                         dest_audio.tags[key] = value
                     except:
@@ -234,10 +345,16 @@ def copy_metadata(source_path, dest_path, new_title=None):
                 if new_title:
                     set_title_tag(dest_path, new_title)
                 dest_audio.save()
+            
+            # 앨범 아트는 캐시를 거쳐 복사
+            copy_album_art(source_metadata['album_art'], dest_path, dest_ext)
         
         # 다른 포맷인 경우 공통 태그만 매핑
         else:
-            copy_common_metadata(source_metadata['tags'], dest_path, source_ext, dest_ext, new_title)
+            copy_common_metadata(
+                source_metadata['tags'], dest_path, source_ext, dest_ext, new_title,
+                album_art=source_metadata['album_art']
+            )
             
     except Exception as e:
         # 실패시 최소한 제목이라도 설정
@@ -245,7 +362,7 @@ def copy_metadata(source_path, dest_path, new_title=None):
             set_title_tag(dest_path, new_title)
 
 
-def copy_common_metadata(source_tags, dest_path, source_ext, dest_ext, new_title=None):
+def copy_common_metadata(source_tags, dest_path, source_ext, dest_ext, new_title=None, album_art=None):
     """
     포맷 간 공통 메타데이터 매핑 및 복사
     
@@ -255,6 +372,7 @@ def copy_common_metadata(source_tags, dest_path, source_ext, dest_ext, new_title
         source_ext: 원본 파일 확장자
         dest_ext: 대상 파일 확장자
         new_title: 새로운 제목
+        album_art: 원본 앨범 아트 바이트 (없으면 None)
     """
     # 공통 태그 매핑 테이블
     tag_mapping = {
@@ -330,7 +448,7 @@ def copy_common_metadata(source_tags, dest_path, source_ext, dest_ext, new_title
                 set_specific_tag(dest_audio, dest_path, dest_ext, dest_key, value)
         
         # 앨범 아트 복사
-        copy_album_art(source_tags, dest_audio, dest_path, source_ext, dest_ext)
+        copy_album_art(album_art, dest_path, dest_ext)
         
     except Exception as e:
         pass
@@ -378,56 +496,164 @@ def set_specific_tag(audio_obj, file_path, file_ext, tag_key, value):
         pass
 
 
-def copy_album_art(source_tags, dest_audio, dest_path, source_ext, dest_ext):
-    """앨범 아트 복사"""
+# ==================== 앨범 아트 캐시 ====================
+# 이미지 해시 → (MIME 타입, 준비된 이미지 바이트)
+# 같은 앨범의 트랙들은 같은 커버를 공유하므로 판별/축소는 커버당 한 번만 수행
+_album_art_cache = {}
+
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+]
+
+
+def sniff_image_mime(data):
+    """
+    이미지 바이트의 시그니처로 실제 MIME 타입 판별
+    
+    Returns:
+        str: MIME 타입 (알 수 없으면 'image/jpeg')
+    """
+    for signature, mime in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
+
+def extract_album_art(audio):
+    """
+    Mutagen 객체에서 앨범 아트(전면 커버 우선) 바이트 추출
+    
+    Args:
+        audio: MutagenFile로 읽은 오디오 객체
+        
+    Returns:
+        bytes: 이미지 데이터 (없으면 None)
+    """
     try:
-        # FLAC → 다른 포맷
-        if source_ext == '.flac' and hasattr(dest_audio, 'tags'):
-            if 'APIC:' in source_tags or any(k.startswith('APIC') for k in source_tags.keys()):
-                for key, value in source_tags.items():
-                    if key.startswith('APIC'):
-                        if dest_ext == '.mp3':
-                            from mutagen.id3 import APIC
-                            id3 = ID3(dest_path)
-                            id3.add(value)
-                            id3.save(dest_path, v2_version=3)
-                        elif dest_ext == '.m4a':
-                            mp4 = MP4(dest_path)
-                            if hasattr(value, 'data'):
-                                mp4['covr'] = [value.data]
-                            mp4.save()
-        
-        # MP3 → 다른 포맷
-        elif source_ext == '.mp3':
-            for key, value in source_tags.items():
-                if key.startswith('APIC'):
-                    if dest_ext == '.flac':
-                        flac = FLAC(dest_path)
-                        flac.add_picture(value)
-                        flac.save()
-                    elif dest_ext == '.m4a':
-                        mp4 = MP4(dest_path)
-                        if hasattr(value, 'data'):
-                            mp4['covr'] = [value.data]
-                        mp4.save()
-        
-        # M4A → 다른 포맷
-        elif source_ext == '.m4a' and 'covr' in source_tags:
-            cover_data = source_tags['covr'][0]
-            if dest_ext == '.mp3':
-                from mutagen.id3 import APIC
+        # FLAC: pictures 블록
+        if isinstance(audio, FLAC):
+            pictures = audio.pictures
+            if pictures:
+                front = [p for p in pictures if p.type == 3]
+                return bytes((front or pictures)[0].data)
+        
+        # MP4: covr 아톰
+        elif isinstance(audio, MP4):
+            covers = audio.get('covr')
+            if covers:
+                return bytes(covers[0])
+        
+        # ID3: APIC 프레임
+        elif audio.tags is not None:
+            frames = [value for key, value in audio.tags.items() if key.startswith('APIC')]
+            if frames:
+                front = [f for f in frames if f.type == 3]
+                return bytes((front or frames)[0].data)
+    except Exception:
+        pass
+    return None
+
+
+def _shrink_album_art(data, mime):
+    """설정된 최대 크기/용량에 맞게 앨범 아트 축소 및 JPEG 재압축"""
+    if Image is None or (ALBUM_ART_MAX_DIMENSION is None and ALBUM_ART_MAX_BYTES is None):
+        return data, mime
+    
+    with Image.open(io.BytesIO(data)) as image:
+        needs_resize = ALBUM_ART_MAX_DIMENSION and max(image.size) > ALBUM_ART_MAX_DIMENSION
+        needs_recompress = ALBUM_ART_MAX_BYTES and len(data) > ALBUM_ART_MAX_BYTES
+        if not (needs_resize or needs_recompress):
+            return data, mime
+        
+        image = image.convert("RGB")
+        if needs_resize:
+            image.thumbnail((ALBUM_ART_MAX_DIMENSION, ALBUM_ART_MAX_DIMENSION), Image.LANCZOS)
+        
+        # 목표 용량에 들어올 때까지 품질을 낮춰가며 재압축
+        quality = ALBUM_ART_JPEG_QUALITY
+        while True:
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=quality, optimize=True)
+            if not ALBUM_ART_MAX_BYTES or buffer.tell() <= ALBUM_ART_MAX_BYTES or quality <= 50:
+                break
+            quality -= 10
+    
+    return buffer.getvalue(), "image/jpeg"
+
+
+def prepare_album_art(data):
+    """
+    앨범 아트를 캐시를 거쳐 준비 (MIME 판별 및 축소는 이미지당 한 번)
+    
+    Args:
+        data: 원본 이미지 바이트
+        
+    Returns:
+        tuple: (MIME 타입, 준비된 이미지 바이트)
+    """
+    key = hashlib.sha1(data).hexdigest()
+    cached = _album_art_cache.get(key)
+    if cached is None:
+        mime = sniff_image_mime(data)
+        try:
+            prepared, mime = _shrink_album_art(data, mime)
+        except Exception:
+            prepared = data
+        cached = (mime, prepared)
+        _album_art_cache[key] = cached
+    return cached
+
+
+def copy_album_art(album_art, dest_path, dest_ext):
+    """
+    앨범 아트 복사
+    
+    Args:
+        album_art: 원본 앨범 아트 바이트 (None이면 아무것도 하지 않음)
+        dest_path: 대상 파일 경로
+        dest_ext: 대상 파일 확장자
+    """
+    if not album_art:
+        return
+    
+    try:
+        mime, data = prepare_album_art(album_art)
+        
+        if dest_ext == '.mp3':
+            try:
                 id3 = ID3(dest_path)
-                id3.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='Cover', data=bytes(cover_data)))
-                id3.save(dest_path, v2_version=3)
-            elif dest_ext == '.flac':
-                from mutagen.flac import Picture
-                flac = FLAC(dest_path)
-                picture = Picture()
-                picture.data = bytes(cover_data)
-                picture.type = 3
-                picture.mime = 'image/jpeg'
-                flac.add_picture(picture)
-                flac.save()
+            except ID3NoHeaderError:
+                id3 = ID3()
+            id3.delall('APIC')
+            id3.add(APIC(encoding=3, mime=mime, type=3, desc='Cover', data=data))
+            id3.save(dest_path, v2_version=3)
+            
+        elif dest_ext == '.m4a':
+            # MP4는 JPEG/PNG 커버만 지원
+            image_format = {
+                'image/jpeg': MP4Cover.FORMAT_JPEG,
+                'image/png': MP4Cover.FORMAT_PNG
+            }.get(mime)
+            if image_format is not None:
+                mp4 = MP4(dest_path)
+                mp4['covr'] = [MP4Cover(data, imageformat=image_format)]
+                mp4.save()
+                
+        elif dest_ext == '.flac':
+            flac = FLAC(dest_path)
+            picture = Picture()
+            picture.data = data
+            picture.type = 3
+            picture.mime = mime
+            flac.clear_pictures()
+            flac.add_picture(picture)
+            flac.save()
                 
     except Exception as e:
         pass
@@ -521,7 +747,7 @@ def build_effect_board(rate_hz, depth, cutoff_hz, drive_db):
     return Pedalboard(effect_chain)
 
 
-def add_crackle_noise(audio_signal, sample_rate, amount=0.0, crackles_per_second=0.0):
+def add_crackle_noise(audio_signal, sample_rate, amount=0.0, crackles_per_second=0.0, rng=None):
     """
     LP 특유의 크래클 노이즈 추가
     
@@ -530,6 +756,7 @@ def add_crackle_noise(audio_signal, sample_rate, amount=0.0, crackles_per_second
         sample_rate: 샘플레이트
         amount: 크래클 강도
         crackles_per_second: 초당 크래클 발생 횟수
+        rng: numpy.random.Generator (같은 시드면 같은 결과, None이면 매번 다름)
         
     Returns:
         numpy.ndarray: 크래클이 추가된 오디오 신호
@@ -537,23 +764,183 @@ def add_crackle_noise(audio_signal, sample_rate, amount=0.0, crackles_per_second
     if amount <= 0 or crackles_per_second <= 0:
         return audio_signal
     
+    if rng is None:
+        rng = np.random.default_rng()
+    
     num_samples, num_channels = audio_signal.shape
-    output = audio_signal.copy()
     
     # 크래클 발생 횟수 계산
     num_crackles = int(crackles_per_second * num_samples / sample_rate)
     
-    for _ in range(num_crackles):
-        # 랜덤 위치에 크래클 추가
-        position = np.random.randint(0, max(1, num_samples - 64))
+    # 랜덤 위치와 강도를 한 번에 생성
+    positions = rng.integers(0, max(1, num_samples - 64), size=num_crackles)
+    strengths = rng.random(num_crackles) * 0.6 + 0.4
+    
+    # 해닝 윈도우로 자연스러운 크래클 생성 (겹치는 크래클은 누적)
+    window = np.hanning(64).astype(np.float32)
+    indices = (positions[:, None] + np.arange(64)).ravel()
+    values = (amount * strengths[:, None] * window).astype(np.float32).ravel()
+    in_range = indices < num_samples
+    
+    envelope = np.zeros(num_samples, dtype=np.float32)
+    np.add.at(envelope, indices[in_range], values[in_range])
+    
+    return np.clip(audio_signal + envelope[:, None], -1.0, 1.0)
+
+
+def file_sha256(file_path, chunk_size=1 << 20):
+    """파일 내용의 SHA-256 해시 (원본 식별 및 출력 비트 단위 비교용)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def derive_render_seed(input_path, config, seed=0, source_hash=None):
+    """
+    파일별 렌더링 시드 생성
+    
+    (원본 내용 해시, 효과 설정, 사용자 시드)에서 유도하므로 처리 순서나
+    병렬 여부와 상관없이 같은 입력은 항상 같은 출력을 만든다.
+    
+    Args:
+        input_path: 입력 파일 경로
+        config: 효과 설정
+        seed: 사용자 지정 시드
+        source_hash: 이미 계산한 원본 SHA-256 (None이면 새로 계산)
         
-        # 해닝 윈도우로 자연스러운 크래클 생성
-        window = np.hanning(64).astype(np.float32)
-        window *= (np.random.rand() * 0.6 + 0.4)
+    Returns:
+        int: 64비트 시드
+    """
+    digest = hashlib.sha256()
+    digest.update((source_hash or file_sha256(input_path)).encode("ascii"))
+    digest.update(json.dumps(EffectConfig.coerce(config).to_dict(), sort_keys=True).encode("utf-8"))
+    digest.update(str(seed).encode("ascii"))
+    return int.from_bytes(digest.digest()[:8], "little")
+
+
+def plan_processing_rate(source_rate, output_format, config):
+    """
+    효과 체인을 돌릴 가장 낮은 처리 샘플레이트 선택
+    
+    필요한 대역폭 = min(로우패스 cutoff, 속도 조정 후 원본 대역, 출력 코덱 대역)이고,
+    원본과 같은 계열(44.1k/48k)의 표준 레이트 중 이를 담을 수 있는 가장 낮은 값을 고른다.
+    원본보다 높게 올리지는 않으며, Audio-CD는 항상 44.1kHz로 처리한다.
+    저장 레이트는 이와 별개로 plan_output_rate가 정한다.
+    
+    Args:
+        source_rate: 원본 샘플레이트
+        output_format: 출력 포맷
+        config: 효과 설정 (EffectConfig 또는 딕셔너리)
+        
+    Returns:
+        int: 처리 샘플레이트
+    """
+    config = EffectConfig.coerce(config)
+    if output_format in FIXED_OUTPUT_RATES:
+        return FIXED_OUTPUT_RATES[output_format]
+    
+    bandwidth = min(
+        config.cutoff,
+        source_rate / 2 / config.speed,
+        CODEC_BANDWIDTH_HZ.get(output_format, float("inf"))
+    )
+    needed = 2 * bandwidth * BANDWIDTH_MARGIN
+    ceiling = min(source_rate, CODEC_MAX_RATE.get(output_format, source_rate))
+    family = 44100 if source_rate % 11025 == 0 else 48000
+    
+    candidates = [rate for rate in PROCESSING_RATES
+                  if rate % family == 0 and MIN_PROCESSING_RATE <= rate <= ceiling]
+    for rate in candidates:
+        if rate >= needed:
+            return rate
+    return candidates[-1] if candidates else ceiling
+
+
+def plan_output_rate(source_rate, output_format, processing_rate):
+    """
+    저장 샘플레이트 선택
+
+    무손실 포맷(WAV/FLAC/ALAC)은 처리 레이트와 관계없이 원본 레이트로 전달하고,
+    Audio-CD는 44.1kHz, 손실 포맷(MP3)은 어차피 대역을 버리므로 처리 레이트 그대로 저장한다.
+
+    Returns:
+        int: 저장 샘플레이트
+    """
+    if output_format in FIXED_OUTPUT_RATES:
+        return FIXED_OUTPUT_RATES[output_format]
+    if output_format in LOSSLESS_FORMATS:
+        return int(source_rate)
+    return int(processing_rate)
+
+
+def resample_factors(source_rate, processing_rate, speed):
+    """
+    속도 조정과 처리 레이트 변환을 한 번에 하는 resample_poly (up, down) 계수
+    
+    속도 조정은 샘플 수를 speed배로 늘리는 리샘플이므로 레이트 변환 비율과 곱해 하나로 합친다.
+    """
+    ratio = Fraction(round(speed * 100), 100) * Fraction(int(processing_rate), int(source_rate))
+    return ratio.numerator, ratio.denominator
+
+
+def render_lp_audio(audio_data, sample_rate, config, rng=None, processing_rate=None):
+    """
+    메모리상의 오디오에 LP 효과 전체(속도, 이펙트 체인, 크래클)를 적용
+    
+    config.engine이 'native'이면 wow/flutter와 포화를 lp_kernels로 처리하고
+    (포화 방식과 오버샘플링은 config.sat_mode, config.sat_oversample),
+    Pedalboard 체인에는 로우패스/컴프레서/게인만 남긴다.
+    config.riaa(0~1)가 주어지면 RIAA 스타일 톤 커브를 섞는다.
+    
+    Args:
+        audio_data: 오디오 데이터 배열 (샘플 수, 채널 수)
+        sample_rate: 샘플레이트
+        config: 효과 설정 (EffectConfig 또는 딕셔너리)
+        rng: 크래클 생성용 numpy.random.Generator
+        processing_rate: 효과를 적용할 샘플레이트 (None이면 원본 레이트, plan_processing_rate 참고)
         
-        output[position:position + 64, :] += (amount * window)[:, None]
+    Returns:
+        numpy.ndarray: processing_rate로 처리된 오디오 신호
+    """
+    config = EffectConfig.coerce(config)
+    processing_rate = processing_rate or sample_rate
     
-    return np.clip(output, -1.0, 1.0)
+    # 속도 조정 + 처리 레이트 변환 (리샘플링 한 번)
+    up, down = resample_factors(sample_rate, processing_rate, config.speed)
+    processed = audio_data
+    if up != down:
+        processed = resample_poly(audio_data, up, down, axis=0)
+    processed = processed.astype(np.float32)
+    sample_rate = processing_rate
+    
+    # 이펙트 체인 적용
+    if config.engine == "native":
+        processed = lp_kernels.wow_flutter(processed, sample_rate, config.wf_rate, config.wf_depth)
+        processed = lp_kernels.saturate(
+            processed, config.sat, mode=config.sat_mode, oversample=config.sat_oversample
+        )
+        effect_board = build_effect_board(0, 0, config.cutoff, 0)
+    else:
+        effect_board = build_effect_board(
+            config.wf_rate,
+            config.wf_depth,
+            config.cutoff,
+            config.sat
+        )
+    
+    processed = lp_kernels.riaa_tone(processed, sample_rate, config.riaa)
+    processed = effect_board(processed, sample_rate)
+    
+    # 크래클 노이즈 추가
+    return add_crackle_noise(
+        processed,
+        sample_rate,
+        config.crackle_amt,
+        config.crackle_cps,
+        rng=rng
+    )
 
 
 # ==================== 사용자 인터페이스 ====================
@@ -563,26 +950,56 @@ def prompt_folder_path():
     return input("> ").strip('"').strip()
 
 
-def prompt_preset_selection():
+def prompt_preset_selection(preset_store):
     """
     프리셋 또는 커스텀 설정 선택
     
+    Args:
+        preset_store: 프리셋 저장소
+        
     Returns:
-        tuple: (설정 딕셔너리, 커스텀 여부)
+        tuple: (EffectConfig, 커스텀 여부)
     """
+    names = preset_store.names()
+    
     print("\n[Preset] 효과 프리셋을 선택하세요:")
-    print("1) Piano/Modern")
-    print("2) Hardbop/Brass")
-    print("3) Vocal Jazz")
-    print("4) Fusion/Electric")
-    print("5) Custom")
+    for number, name in enumerate(names, start=1):
+        print(f"{number}) {name}")
+    print(f"{len(names) + 1}) Custom")
     
     selection = input("> ").strip()
     
-    if selection in EFFECT_PRESETS:
-        return EFFECT_PRESETS[selection], False
+    if selection.isdigit() and 1 <= int(selection) <= len(names):
+        return preset_store.get(names[int(selection) - 1]), False
     else:
-        return {}, True
+        return prompt_custom_config(), True
+
+
+def prompt_custom_config():
+    """
+    커스텀 효과 설정 입력 (엔터는 기본값 사용)
+    
+    Returns:
+        EffectConfig: 입력된 설정
+    """
+    defaults = EffectConfig().to_dict()
+    values = {}
+    
+    print("\n[Custom] 값을 입력하세요 (엔터: 기본값)")
+    for key, default in defaults.items():
+        while True:
+            answer = input(f"{key} [{default}]: ").strip()
+            if not answer:
+                break
+            try:
+                # 앞에서 입력한 값과 함께 검증 (sat_mode 등은 engine에 따라 허용 여부가 다름)
+                EffectConfig.from_dict(dict(values, **{key: answer}))
+                values[key] = answer
+                break
+            except ValueError as error:
+                print(f"  {error}")
+    
+    return EffectConfig.from_dict(values)
 
 
 def prompt_output_format():
@@ -613,92 +1030,118 @@ def prompt_output_format():
 
 
 # ==================== 파일 처리 ====================
-def process_audio_file(input_path, output_dir, config, output_format):
+def process_audio_file(input_path, output_dir, config, output_format, seed=0, thumbnail_dir=None):
     """
     개별 오디오 파일 처리
     
     Args:
         input_path: 입력 파일 경로
         output_dir: 출력 디렉토리
-        config: 효과 설정
+        config: 효과 설정 (EffectConfig 또는 딕셔너리)
         output_format: 출력 포맷
+        seed: 렌더링 시드 (같은 원본/설정/시드면 같은 출력)
+        thumbnail_dir: 처리 전/후 썸네일 캐시 폴더 (None이면 만들지 않음)
         
+    Returns:
+        str: 출력 파일 경로
+    """
+    audio_data, source_rate = load_audio_any(input_path)
+    return process_loaded_audio(
+        input_path, audio_data, source_rate, output_dir, config, output_format, seed, thumbnail_dir
+    )
+
+
+def process_loaded_audio(input_path, audio_data, source_rate, output_dir, config, output_format,
+                         seed=0, thumbnail_dir=None):
+    """
+    이미 디코딩된 오디오로 process_audio_file의 나머지 단계(효과 적용, 저장, 메타데이터, 썸네일) 실행
+
+    배치 워커처럼 원본을 다른 곳(공유 메모리 등)에서 받아 오는 경우에 사용한다.
+    input_path는 출력 파일명, 메타데이터 복사, 렌더링 시드 계산에 쓰인다.
+
     Returns:
         str: 출력 파일 경로
     """
     # 파일명 추출
     base_name = os.path.splitext(os.path.basename(input_path))[0]
     
-    # 오디오 로드
-    audio_data, sample_rate = load_audio_any(input_path)
+    # LP 효과 적용
+    config = EffectConfig.coerce(config)
+    source_hash = file_sha256(input_path)
+    render_seed = derive_render_seed(input_path, config, seed, source_hash=source_hash)
+    rng = np.random.default_rng(render_seed)
     
-    # 속도 조정 (리샘플링)
-    speed_ratio = config["speed"]
-    processed = resample_poly(
-        audio_data,
-        int(speed_ratio * 100),
-        100,
-        axis=0
-    ).astype(np.float32)
+    # 출력 포맷이 버릴 대역은 렌더링하지 않도록 처리 레이트를 낮춰 효과 적용
+    processing_rate = plan_processing_rate(source_rate, output_format, config)
+    processed = render_lp_audio(audio_data, source_rate, config, rng=rng, processing_rate=processing_rate)
     
-    # 이펙트 체인 적용
-    effect_board = build_effect_board(
-        config["wf_rate"],
-        config["wf_depth"],
-        config["cutoff"],
-        config["sat"]
-    )
-    processed = effect_board(processed, sample_rate)
-    
-    # 크래클 노이즈 추가
-    processed = add_crackle_noise(
-        processed,
-        sample_rate,
-        config["crackle_amt"],
-        config["crackle_cps"]
-    )
+    # 무손실 포맷은 처리 레이트가 낮아졌어도 원본 레이트로 되돌려 저장
+    sample_rate = plan_output_rate(source_rate, output_format, processing_rate)
+    up, down = resample_factors(processing_rate, sample_rate, 1.0)
+    if up != down:
+        processed = resample_poly(processed, up, down, axis=0).astype(np.float32)
     
     # 출력 디렉토리 생성
     os.makedirs(output_dir, exist_ok=True)
     
-    # 포맷별 저장
+    # 포맷별 저장 (임시 파일에 먼저 기록한 뒤 원자적으로 이름 변경)
     output_filename = f"LP_{base_name}"
+    extension = OUTPUT_EXTENSIONS.get(output_format, ".wav")
+    output_path = os.path.join(output_dir, f"{output_filename}{extension}")
+    temp_path = partial_output_path(output_path)
     
-    if output_format == "flac":
-        output_path = os.path.join(output_dir, f"{output_filename}.flac")
-        write_flac(output_path, processed, sample_rate)
+    try:
+        if output_format == "flac":
+            write_flac(temp_path, processed, sample_rate)
+            
+        elif output_format == "m4a":
+            write_m4a_alac(temp_path, processed, sample_rate)
+            
+        elif output_format == "mp3":
+            write_mp3(temp_path, processed, sample_rate)
+            
+        elif output_format == "cd":
+            write_wav_16bit(temp_path, processed, sample_rate)
+            
+        else:  # wav
+            write_wav_24bit(temp_path, processed, sample_rate)
         
-    elif output_format == "m4a":
-        output_path = os.path.join(output_dir, f"{output_filename}.m4a")
-        write_m4a_alac(output_path, processed, sample_rate)
+        # 원본 파일의 모든 메타데이터 복사 (제목은 새로 설정)
+        copy_metadata(input_path, temp_path, new_title=output_filename)
         
-    elif output_format == "mp3":
-        output_path = os.path.join(output_dir, f"{output_filename}.mp3")
-        write_mp3(output_path, processed, sample_rate)
+        fsync_file(temp_path)
+        os.replace(temp_path, output_path)
         
-    else:  # wav 또는 cd
-        output_path = os.path.join(output_dir, f"{output_filename}.wav")
-        write_wav_24bit(output_path, processed, sample_rate)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
     
-    # 원본 파일의 모든 메타데이터 복사 (제목은 새로 설정)
-    copy_metadata(input_path, output_path, new_title=output_filename)
+    # 썸네일: 메모리에 있는 처리 전/후 신호로 바로 그림 (이미 캐시에 있으면 건너뜀)
+    if thumbnail_dir:
+        before = lp_thumbnails.store_thumbnail(thumbnail_dir, source_hash, audio_data, source_rate)
+        after = lp_thumbnails.store_thumbnail(
+            thumbnail_dir, f"{render_seed:016x}_{output_format}_{sample_rate}", processed, sample_rate
+        )
+        lp_thumbnails.record_thumbnails(thumbnail_dir, input_path, before, after, output_path)
     
     return output_path
 
 
-def collect_audio_files(root_folder):
+def collect_audio_files(root_folder, exclude_dirs=("LP_out",)):
     """
     폴더에서 지원되는 오디오 파일 수집
     
     Args:
         root_folder: 검색할 루트 폴더
+        exclude_dirs: 탐색에서 제외할 폴더명 (이전 실행의 출력 폴더 등)
         
     Returns:
         list: 오디오 파일 경로 리스트
     """
     audio_files = []
     
-    for root, _, files in os.walk(root_folder):
+    for root, dirs, files in os.walk(root_folder):
+        dirs[:] = [d for d in dirs if d not in exclude_dirs]
         for filename in files:
             file_extension = os.path.splitext(filename)[1].lower()
             if file_extension in SUPPORTED_INPUT_FORMATS:
@@ -708,19 +1151,59 @@ def collect_audio_files(root_folder):
 
 
 # ==================== 메인 함수 ====================
-def main():
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="Audio LP Effect Processor")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="이전 실행의 체크포인트에서 이어서 처리 (완료된 파일은 건너뜀)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="렌더링 시드 (같은 시드면 실행마다 비트 단위로 같은 출력)"
+    )
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="오디오 지문으로 같은 곡의 다른 포맷을 찾아 최고 품질 원본만 처리"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="최대 병렬 워커 수 (1: 순차 처리, 0: CPU 코어 수), 실제 동시 작업 수는 CPU 사용률에 따라 조절"
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        help="동시 작업 메모리 예산 (MB, 기본: 사용 가능 메모리의 절반), 혼자서도 넘는 파일은 스트리밍 처리"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """메인 실행 함수"""
+    args = parse_args(argv)
+    
     print("=" * 60)
     print("Audio LP Effect Processor")
     print("=" * 60)
     
+    # 프리셋 라이브러리는 시작 시 한 번만 로드
+    preset_store = PresetStore.load()
+    
     # 사용자 입력
     source_folder = prompt_folder_path()
-    effect_config, is_custom = prompt_preset_selection()
+    effect_config, is_custom = prompt_preset_selection(preset_store)
     output_format = prompt_output_format()
     
     # 출력 디렉토리 설정
     output_directory = os.path.join(source_folder, "LP_out")
+    checkpoint_path = os.path.join(output_directory, CHECKPOINT_FILENAME)
     
     # 오디오 파일 수집
     target_files = collect_audio_files(source_folder)
@@ -729,27 +1212,68 @@ def main():
         print("\n처리할 오디오 파일이 없습니다.")
         return
     
-    print(f"\n총 {len(target_files)}개 파일 처리 시작...\n")
+    # 체크포인트 준비: 중단된 임시 파일 정리 후 완료 항목 제외
+    os.makedirs(output_directory, exist_ok=True)
+    removed = cleanup_partial_outputs(output_directory)
+    if removed:
+        print(f"\n중단된 임시 파일 {removed}개 정리")
     
-    # 파일 처리
-    processed_files = []
-    failed_files = []
+    # 중복 원본 제외: 같은 곡이 여러 포맷이면 품질이 가장 좋은 파일만 남김
+    if args.dedupe:
+        index_path = os.path.join(output_directory, lp_fingerprint.INDEX_FILENAME)
+        target_files, duplicate_groups = lp_fingerprint.select_best_sources(target_files, index_path)
+        for group in duplicate_groups:
+            print(f"\n[중복] {os.path.basename(group[0])} 사용")
+            for duplicate in group[1:]:
+                print(f"       - {os.path.basename(duplicate)} 건너뜀")
+        skipped = sum(len(group) - 1 for group in duplicate_groups)
+        print(f"\n[Dedupe] 중복 그룹 {len(duplicate_groups)}개, {skipped}개 파일 건너뜀")
     
+    # 폴더별 .lpconfig 오버라이드 적용 (체크포인트 비교에도 해석된 설정을 사용)
+    file_configs = []
+    config_failures = []
     for file_path in target_files:
         try:
-            output_path = process_audio_file(
-                file_path,
-                output_directory,
-                effect_config,
-                output_format
-            )
-            processed_files.append(output_path)
-            print(f"[완료] {os.path.basename(file_path)}")
-            
+            file_configs.append((file_path, preset_store.resolve_for_file(file_path, effect_config, source_folder)))
         except Exception as error:
-            failed_files.append((file_path, str(error)))
+            config_failures.append((file_path, str(error)))
             print(f"[실패] {os.path.basename(file_path)} - {error}")
     
+    # 메모리 예산으로 작업을 나누고, 예산을 넘는 긴 파일은 스트리밍으로 처리
+    # (스트리밍 여부가 렌더링 설정 키에 들어가므로 체크포인트 비교 전에 결정)
+    import lp_batch
+    
+    memory_budget = args.memory_budget * (1 << 20) if args.memory_budget else lp_batch.default_memory_budget()
+    jobs = lp_batch.plan_jobs(file_configs, output_format, memory_budget)
+    
+    if args.resume:
+        # 원본/포맷/렌더링 설정이 모두 같고 출력 해시가 맞는 항목만 건너뜀
+        completed = load_checkpoint(checkpoint_path)
+        remaining = [
+            job for job in jobs
+            if (os.path.abspath(job.path), output_format,
+                render_settings_key(job.config, args.seed, job.streaming)) not in completed
+        ]
+        skipped = len(jobs) - len(remaining)
+        print(f"\n[Resume] 완료된 {skipped}개 파일 건너뜀")
+        jobs = remaining
+    else:
+        # 새 실행은 새 저널로 시작
+        open(checkpoint_path, "w", encoding="utf-8").close()
+    
+    print(f"\n총 {len(jobs)}개 파일 처리 시작...\n")
+    
+    processed_files, failed_files = lp_batch.run_batch(
+        jobs,
+        output_directory,
+        output_format,
+        checkpoint_path,
+        seed=args.seed,
+        max_workers=args.workers or os.cpu_count() or 1,
+        memory_budget=memory_budget
+    )
+    failed_files = config_failures + failed_files
+    
     # 결과 요약
     print("\n" + "=" * 60)
     print(f"처리 완료: {len(processed_files)}개")
@@ -0,0 +1,420 @@
+"""
+LP Batch Runner
+메모리 예산 기반 작업 승인(admission)과 CPU 사용률에 따른 워커 수 자동 조절을 하는 배치 실행기
+
+- 작업마다 헤더 정보(sf.info, 실패 시 mutagen)로 메모리 사용량을 미리 추정한다.
+  (샘플 수 × 채널 수 × 4바이트 × 중간 사본 수 × 속도/레이트 변환에 따른 길이 증가)
+- 실행 중인 작업의 추정치 합이 메모리 예산 안에 들어갈 때만 새 작업을 시작한다.
+- 예산을 혼자서도 넘는 파일은 통째로 읽지 않고 lp_realtime 블록 프로세서로 스트리밍 처리한다.
+- 일정 간격으로 CPU 사용률을 측정해 여유가 있으면 동시 작업 수를 늘리고, 포화되면 줄인다.
+- 완료된 파일은 기존과 같이 체크포인트 저널에 즉시 기록한다. (--resume 호환)
+- 병렬 처리 시 원본은 부모 프로세스의 디코딩 스레드가 공유 메모리(lp_shared_audio)에 풀어 두고,
+  워커에는 (이름, shape, dtype) 핸들만 넘긴다. 워커는 디코딩 없이 붙어서 렌더링/저장만 한다.
+"""
+
+import os
+import time
+import tempfile
+import subprocess
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import soundfile as sf
+from mutagen import File as MutagenFile
+from pydub import AudioSegment
+
+import lp_realtime
+import lp_shared_audio
+from audio_lp_processor import (
+    OUTPUT_EXTENSIONS, process_audio_file, plan_processing_rate, plan_output_rate, derive_render_seed,
+    partial_output_path, fsync_file, copy_metadata, append_checkpoint, render_settings_key
+)
+from lp_presets import EffectConfig
+
+# 메모리/CPU 측정용 (선택 사항, 없으면 os.sysconf / load average 사용)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# ==================== 상수 정의 ====================
+# 메모리 추정: float32 기준, 디코딩(float64 = 2) + float32 변환 + 리샘플 + 이펙트 체인 + 크래클 + 저장 버퍼
+BYTES_PER_SAMPLE = 4
+INTERMEDIATE_COPIES = 8
+
+# 메모리 예산 기본값: 사용 가능한 메모리의 절반 (측정할 수 없으면 2GB)
+DEFAULT_BUDGET_FRACTION = 0.5
+FALLBACK_MEMORY_BUDGET = 2 << 30
+
+# 스트리밍 처리 블록 크기와 그때의 메모리 추정치 (블록 버퍼 + Pedalboard 내부 버퍼 여유)
+STREAMING_BLOCK_SIZE = 65536
+STREAMING_MEMORY = 64 << 20
+
+# 병렬 처리 시 부모에서 원본을 공유 메모리로 디코딩하는 스레드 수 (디코딩은 대부분 I/O/ffmpeg 대기)
+DECODE_THREADS = 2
+
+# 워커 수 조절: 측정 간격(초)과 CPU 사용률 기준(%)
+SCALE_INTERVAL = 2.0
+SCALE_UP_CPU = 70.0
+SCALE_DOWN_CPU = 95.0
+
+# 스트리밍 처리 후 ffmpeg로 변환할 포맷별 인코더 인자 (flac/wav는 soundfile로 바로 저장,
+# 저장 레이트는 -ar로 plan_output_rate에 맞춤)
+FFMPEG_CODEC_ARGS = {
+    "mp3": ["-c:a", "libmp3lame", "-b:a", "320k"],
+    "m4a": ["-c:a", "alac"],
+    "cd": ["-c:a", "pcm_s16le"],
+}
+SOUNDFILE_FORMATS = {"flac": "FLAC", "wav": "WAV"}
+
+
+# ==================== 메모리 추정 ====================
+@dataclass
+class BatchJob:
+    """배치 작업 하나 (원본 경로, 적용 설정, 메모리 추정치, 스트리밍 여부)"""
+    path: str
+    config: EffectConfig
+    memory: int
+    streaming: bool = False
+
+
+def read_audio_header(file_path):
+    """
+    디코딩 없이 (샘플 수, 채널 수, 샘플레이트) 읽기
+
+    soundfile이 읽지 못하는 포맷(m4a/aac 등)은 mutagen의 길이 정보로 계산한다.
+    """
+    try:
+        info = sf.info(file_path)
+        return info.frames, info.channels, info.samplerate
+    except Exception:
+        info = MutagenFile(file_path).info
+        sample_rate = int(getattr(info, "sample_rate", 0) or 44100)
+        channels = int(getattr(info, "channels", 0) or 2)
+        return int(float(getattr(info, "length", 0) or 0) * sample_rate), channels, sample_rate
+
+
+def estimate_job_memory(file_path, config, output_format):
+    """
+    process_audio_file로 통째로 처리할 때의 최대 메모리 추정치 (바이트)
+    """
+    config = EffectConfig.coerce(config)
+    frames, channels, sample_rate = read_audio_header(file_path)
+    processing_rate = plan_processing_rate(sample_rate, output_format, config)
+    output_rate = plan_output_rate(sample_rate, output_format, processing_rate)
+    growth = max(1.0, config.speed * max(processing_rate, output_rate) / sample_rate)
+    return int(frames * channels * BYTES_PER_SAMPLE * INTERMEDIATE_COPIES * growth)
+
+
+def default_memory_budget():
+    """사용 가능한 물리 메모리의 DEFAULT_BUDGET_FRACTION (바이트)"""
+    if psutil is not None:
+        available = psutil.virtual_memory().available
+    else:
+        try:
+            available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        except (ValueError, OSError, AttributeError):
+            return FALLBACK_MEMORY_BUDGET
+    return int(available * DEFAULT_BUDGET_FRACTION)
+
+
+def plan_jobs(file_configs, output_format, memory_budget):
+    """
+    (경로, 설정) 목록 → BatchJob 목록 (예산을 넘는 파일은 스트리밍 작업으로 지정)
+
+    헤더를 읽지 못한 파일은 추정치 0으로 두고 실제 처리에서 오류를 보고하게 한다.
+    """
+    jobs = []
+    for file_path, config in file_configs:
+        try:
+            memory = estimate_job_memory(file_path, config, output_format)
+        except Exception:
+            memory = 0
+        if memory > memory_budget:
+            jobs.append(BatchJob(file_path, config, STREAMING_MEMORY, streaming=True))
+        else:
+            jobs.append(BatchJob(file_path, config, memory))
+    return jobs
+
+
+# ==================== 스트리밍 처리 ====================
+def _ffmpeg(arguments):
+    """pydub이 찾은 ffmpeg로 파일 → 파일 변환 (오디오를 메모리에 올리지 않음)"""
+    command = [AudioSegment.converter, "-y", "-loglevel", "error"] + arguments
+    subprocess.run(command, check=True, capture_output=True)
+
+
+def open_stream_source(input_path, work_dir):
+    """soundfile로 바로 열고, 지원하지 않는 포맷은 ffmpeg로 임시 WAV에 풀어서 열기"""
+    try:
+        return sf.SoundFile(input_path)
+    except Exception:
+        decoded_path = os.path.join(work_dir, "source.wav")
+        _ffmpeg(["-i", input_path, "-c:a", "pcm_f32le", decoded_path])
+        return sf.SoundFile(decoded_path)
+
+
+def process_audio_file_streaming(input_path, output_dir, config, output_format, seed=0):
+    """
+    메모리 예산을 넘는 긴 파일을 블록 단위로 처리 (process_audio_file과 같은 출력 경로/메타데이터)
+
+    lp_realtime의 블록 프로세서를 쓰므로 효과는 원본 샘플레이트에서 적용되고, 속도 조정은
+    Hermite 보간, wow/flutter와 포화는 Pedalboard 구현으로 처리된다. 따라서 메모리 내 처리와
+    출력이 같지 않으며 체크포인트에는 스트리밍용 렌더링 설정 키로 기록된다.
+    저장 샘플레이트는 메모리 내 처리와 같게 plan_output_rate로 정한다.
+
+    Raises:
+        ValueError: engine='native' (배열 전체용 커널이라 블록 단위로 처리할 수 없음)
+
+    Returns:
+        str: 출력 파일 경로
+    """
+    config = EffectConfig.coerce(config)
+    if config.engine == "native":
+        raise ValueError(
+            "engine='native'는 스트리밍 처리에서 지원하지 않습니다 "
+            "(--memory-budget을 늘리거나 engine='pedalboard'를 사용하세요)"
+        )
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    output_filename = f"LP_{base_name}"
+    extension = OUTPUT_EXTENSIONS.get(output_format, ".wav")
+    output_path = os.path.join(output_dir, f"{output_filename}{extension}")
+    temp_path = partial_output_path(output_path)
+    os.makedirs(output_dir, exist_ok=True)
+
+    render_seed = derive_render_seed(input_path, config, seed)
+
+    try:
+        # 중간 파일은 용량이 크므로 /tmp 대신 출력 폴더 안에 만듦
+        with tempfile.TemporaryDirectory(prefix=".lp_stream_", dir=output_dir) as work_dir:
+            with open_stream_source(input_path, work_dir) as source:
+                processor = lp_realtime.RealtimeProcessor(
+                    config, source.samplerate, source.channels, STREAMING_BLOCK_SIZE, seed=render_seed
+                )
+                output_rate = plan_output_rate(
+                    source.samplerate, output_format,
+                    plan_processing_rate(source.samplerate, output_format, config)
+                )
+                direct = output_format in SOUNDFILE_FORMATS
+                render_path = temp_path if direct else os.path.join(work_dir, "render.wav")
+                file_format = SOUNDFILE_FORMATS.get(output_format, "WAV")
+                with sf.SoundFile(render_path, "w", samplerate=source.samplerate, channels=source.channels,
+                                  format=file_format, subtype="PCM_24") as destination:
+                    lp_realtime.stream_blocks(processor, source, destination)
+
+            if not direct:
+                _ffmpeg(["-i", render_path] + FFMPEG_CODEC_ARGS[output_format] + ["-ar", str(output_rate), temp_path])
+
+        # 원본 파일의 모든 메타데이터 복사 (제목은 새로 설정)
+        copy_metadata(input_path, temp_path, new_title=output_filename)
+
+        fsync_file(temp_path)
+        os.replace(temp_path, output_path)
+
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return output_path
+
+
+def run_job(job, output_dir, output_format, seed, source=None):
+    """
+    워커 프로세스 진입점
+
+    source가 (공유 블록 핸들, 샘플레이트)이면 부모가 디코딩해 둔 원본을 붙어서 사용한다.
+    """
+    if job.streaming:
+        return process_audio_file_streaming(job.path, output_dir, job.config, output_format, seed)
+    if source is not None:
+        handle, sample_rate = source
+        return lp_shared_audio.process_shared_file(
+            handle, sample_rate, job.path, output_dir, job.config, output_format, seed
+        )
+    return process_audio_file(job.path, output_dir, job.config, output_format, seed=seed)
+
+
+# ==================== 승인 제어 / 워커 수 조절 ====================
+class CpuMonitor:
+    """최근 구간의 시스템 CPU 사용률(%) 측정 (psutil이 없으면 1분 load average 기준)"""
+
+    def __init__(self):
+        if psutil is not None:
+            # 첫 호출은 기준점 설정용 (이후 호출은 직전 호출 이후 구간의 사용률)
+            psutil.cpu_percent(interval=None)
+
+    def sample(self):
+        """
+        Returns:
+            float 또는 None: CPU 사용률(%), 측정할 수 없으면 None
+        """
+        if psutil is not None:
+            return psutil.cpu_percent(interval=None)
+        try:
+            return 100.0 * os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (OSError, AttributeError):
+            return None
+
+
+class AdmissionController:
+    """
+    메모리 예산과 목표 워커 수로 새 작업 시작 여부를 결정
+
+    목표 워커 수는 CPU 사용률에 따라 1 ~ max_workers 사이에서 한 단계씩 조절된다.
+    """
+
+    def __init__(self, memory_budget, max_workers, initial_workers=None):
+        self.memory_budget = memory_budget
+        self.max_workers = max_workers
+        self.target_workers = initial_workers or max(1, max_workers // 2)
+        self.reserved = 0
+        self.running = 0
+
+    def fits(self, memory):
+        if self.running >= self.target_workers:
+            return False
+        # 아무것도 실행 중이 아니면 항상 승인 (예산을 넘는 작업은 이미 스트리밍으로 분류됨)
+        return self.running == 0 or self.reserved + memory <= self.memory_budget
+
+    def admit(self, memory):
+        self.reserved += memory
+        self.running += 1
+
+    def release(self, memory):
+        self.reserved -= memory
+        self.running -= 1
+
+    def rescale(self, cpu_percent, backlog):
+        """
+        CPU 사용률에 따라 목표 워커 수 조절
+
+        워커가 목표만큼 다 차 있는데도 CPU가 남으면 늘리고 (메모리 때문에 덜 찬 경우는 제외),
+        CPU가 포화되면 줄인다.
+
+        Returns:
+            int: 변경량 (+1, -1, 0)
+        """
+        if cpu_percent is None:
+            return 0
+        if (cpu_percent < SCALE_UP_CPU and backlog and self.running >= self.target_workers
+                and self.target_workers < self.max_workers):
+            self.target_workers += 1
+            return 1
+        if cpu_percent > SCALE_DOWN_CPU and self.target_workers > 1:
+            self.target_workers -= 1
+            return -1
+        return 0
+
+
+# ==================== 배치 실행 ====================
+def _finish(job, output_path, error, checkpoint_path, output_format, seed, processed_files, failed_files):
+    """작업 하나의 결과 기록 및 출력"""
+    name = os.path.basename(job.path)
+    if error is not None:
+        failed_files.append((job.path, str(error)))
+        print(f"[실패] {name} - {error}")
+        return
+    append_checkpoint(checkpoint_path, job.path, output_path, output_format,
+                      render_settings_key(job.config, seed, job.streaming))
+    processed_files.append(output_path)
+    print(f"[완료] {name}" + (" (스트리밍)" if job.streaming else ""))
+
+
+def _release_decoded(future):
+    """결과를 쓰지 못하게 된 디코딩 작업의 공유 블록 정리"""
+    if not future.cancelled() and future.exception() is None:
+        future.result()[0].release()
+
+
+def run_batch(jobs, output_dir, output_format, checkpoint_path, seed=0,
+              max_workers=1, memory_budget=None):
+    """
+    배치 실행
+
+    max_workers가 1이면 기존처럼 현재 프로세스에서 순서대로 처리하고,
+    그보다 크면 프로세스 풀에서 메모리 예산/목표 워커 수 안에서 병렬 처리한다.
+    병렬 처리 시 큰 작업부터 시작해 마지막에 긴 작업 하나만 남는 일을 줄인다.
+
+    Returns:
+        tuple: (완료된 출력 경로 목록, [(원본 경로, 오류 메시지)] 실패 목록)
+    """
+    memory_budget = memory_budget or default_memory_budget()
+    processed_files = []
+    failed_files = []
+
+    if max_workers <= 1:
+        for job in jobs:
+            try:
+                output_path, error = run_job(job, output_dir, output_format, seed), None
+            except Exception as exc:
+                output_path, error = None, exc
+            _finish(job, output_path, error, checkpoint_path, output_format, seed, processed_files, failed_files)
+        return processed_files, failed_files
+
+    controller = AdmissionController(memory_budget, max_workers)
+    monitor = CpuMonitor()
+    pending = sorted(jobs, key=lambda job: job.memory, reverse=True)
+    # future → (작업, 단계 "decode"/"render", 공유 원본 블록)
+    running = {}
+    next_scale = time.monotonic() + SCALE_INTERVAL
+
+    print(f"[Batch] 최대 워커 {max_workers}개, 시작 {controller.target_workers}개, "
+          f"메모리 예산 {memory_budget / (1 << 20):,.0f}MB")
+
+    def submit_render(job, shared=None, sample_rate=None):
+        source = (shared.handle, sample_rate) if shared is not None else None
+        future = executor.submit(run_job, job, output_dir, output_format, seed, source)
+        running[future] = (job, "render", shared)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor, \
+            ThreadPoolExecutor(max_workers=DECODE_THREADS) as decoder:
+        try:
+            while pending or running:
+                # 승인: 앞에서부터 예산에 들어가는 작업을 시작 (큰 작업이 막히면 뒤의 작은 작업이 먼저 들어감)
+                # 승인된 작업은 예산을 잡은 채로 디코딩 → 렌더링 순서로 진행 (스트리밍 작업은 바로 렌더링)
+                index = 0
+                while index < len(pending) and controller.running < controller.target_workers:
+                    job = pending[index]
+                    if controller.fits(job.memory):
+                        pending.pop(index)
+                        controller.admit(job.memory)
+                        if job.streaming:
+                            submit_render(job)
+                        else:
+                            running[decoder.submit(lp_shared_audio.load_shared, job.path)] = (job, "decode", None)
+                    else:
+                        index += 1
+
+                done, _ = wait(running, timeout=SCALE_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, stage, shared = running.pop(future)
+                    try:
+                        result, error = future.result(), None
+                    except Exception as exc:
+                        result, error = None, exc
+
+                    if stage == "decode" and error is None:
+                        shared, sample_rate = result
+                        submit_render(job, shared, sample_rate)
+                        continue
+
+                    if shared is not None:
+                        shared.release()
+                    controller.release(job.memory)
+                    _finish(job, result, error, checkpoint_path, output_format, seed, processed_files, failed_files)
+
+                if time.monotonic() >= next_scale:
+                    change = controller.rescale(monitor.sample(), bool(pending))
+                    if change:
+                        print(f"[Batch] 목표 워커 수 {controller.target_workers}개로 조절")
+                    next_scale = time.monotonic() + SCALE_INTERVAL
+        finally:
+            # 중단(Ctrl+C, 풀 오류) 시에도 부모가 만든 공유 블록은 모두 정리 (디코딩 중이면 끝나는 대로)
+            for future, (job, stage, shared) in running.items():
+                if shared is not None:
+                    shared.release()
+                elif stage == "decode" and not future.cancel():
+                    future.add_done_callback(_release_decoded)
+
+    return processed_files, failed_files
@@ -0,0 +1,274 @@
+"""
+LP Fingerprint
+같은 곡이 여러 포맷(FLAC + MP3 + M4A 등)으로 들어 있는 경우를 처리 전에 찾아내는 오디오 지문 모듈
+
+앞부분 N초만 낮은 샘플레이트로 디코딩해 크로마(12음계 에너지) 기반 비트 지문을 만들고,
+파일 크기/수정 시각이 같으면 디스크 인덱스(.lp_fingerprints.json)의 지문을 재사용한다.
+지문이 거의 같은 파일끼리 묶은 뒤 그룹마다 품질이 가장 좋은 원본 하나만 남긴다.
+"""
+
+import os
+import json
+from math import gcd
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import resample_poly
+from mutagen import File as MutagenFile
+from pydub import AudioSegment
+
+
+# ==================== 상수 정의 ====================
+INDEX_FILENAME = ".lp_fingerprints.json"
+INDEX_VERSION = 1
+
+FINGERPRINT_SECONDS = 30
+FINGERPRINT_RATE = 11025
+FRAME_SIZE = 4096
+HOP_SIZE = 2048
+
+# 크로마 계산에 쓰는 주파수 범위와 무음 판정 기준 (프레임 RMS)
+CHROMA_MIN_HZ = 55.0
+CHROMA_MAX_HZ = 5000.0
+SILENCE_RMS = 1e-4
+
+# 비트 비교 시 정규화 크로마에 더할 바닥값과 "더 크다"로 볼 최소 비율
+CHROMA_FLOOR = 0.01
+COMPARE_MARGIN = 1.1
+
+# 프레임당 24비트: 12비트(이웃 음계보다 큰지) + 12비트(직전 프레임 대비 증가 여부)
+BITS_PER_FRAME = 24
+
+# 인코더 지연 차이를 흡수할 프레임 이동 범위, 같은 곡으로 볼 최대 비트 오류율과 길이 차이(초)
+MAX_OFFSET_FRAMES = 3
+MIN_COMPARE_FRAMES = 20
+DUPLICATE_BIT_ERROR_RATE = 0.08
+DUPLICATE_DURATION_TOLERANCE = 2.0
+
+LOSSLESS_EXTENSIONS = {".wav", ".flac"}
+
+
+# ==================== 디코딩 ====================
+def decode_excerpt(file_path, seconds=FINGERPRINT_SECONDS, target_rate=FINGERPRINT_RATE):
+    """
+    앞부분 seconds초만 모노로 디코딩해 target_rate로 리샘플
+
+    Returns:
+        numpy.ndarray: 모노 float32 신호
+    """
+    try:
+        info = sf.info(file_path)
+        audio, sample_rate = sf.read(file_path, frames=int(info.samplerate * seconds), always_2d=True)
+        mono = audio.mean(axis=1)
+    except Exception:
+        # soundfile로 읽기 실패 시 pydub 사용 (ffmpeg 필요, 앞부분만 디코딩)
+        segment = AudioSegment.from_file(file_path, duration=seconds).set_channels(1)
+        sample_rate = segment.frame_rate
+        max_value = float(2 ** (8 * segment.sample_width - 1))
+        mono = np.array(segment.get_array_of_samples(), dtype=np.float64) / max_value
+
+    divisor = gcd(int(target_rate), int(sample_rate))
+    return resample_poly(mono, target_rate // divisor, sample_rate // divisor).astype(np.float32)
+
+
+# ==================== 지문 계산 ====================
+def chroma_matrix(sample_rate=FINGERPRINT_RATE, frame_size=FRAME_SIZE):
+    """FFT 빈 → 12음계(A=0) 누적 행렬 (12, 빈 수)"""
+    freqs = np.fft.rfftfreq(frame_size, 1 / sample_rate)
+    mapping = np.zeros((12, freqs.size), dtype=np.float32)
+    valid = (freqs >= CHROMA_MIN_HZ) & (freqs <= CHROMA_MAX_HZ)
+    pitch_class = np.round(12 * np.log2(freqs[valid] / 440.0)).astype(int) % 12
+    mapping[pitch_class, np.nonzero(valid)[0]] = 1.0
+    return mapping
+
+
+_CHROMA_MATRIX = chroma_matrix()
+
+
+def compute_fingerprint(signal):
+    """
+    크로마 비트 지문 계산
+
+    Args:
+        signal: FINGERPRINT_RATE 모노 신호
+
+    Returns:
+        numpy.ndarray: 프레임별 24비트 지문 (uint32)
+    """
+    if signal.size < FRAME_SIZE:
+        return np.zeros(0, dtype=np.uint32)
+
+    num_frames = 1 + (signal.size - FRAME_SIZE) // HOP_SIZE
+    indices = np.arange(FRAME_SIZE)[None, :] + HOP_SIZE * np.arange(num_frames)[:, None]
+    frames = signal[indices] * np.hanning(FRAME_SIZE).astype(np.float32)
+
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+    chroma = power @ _CHROMA_MATRIX.T
+    chroma /= chroma.sum(axis=1, keepdims=True) + 1e-12
+
+    # 이웃 음계끼리 비교한 비트는 0/1이 고르게 나와 다른 곡과 우연히 일치할 확률이 낮음
+    # 거의 같은 값끼리의 비교는 잡음에 따라 뒤집히므로 바닥값과 여유 비율을 둔다
+    chroma += CHROMA_FLOOR
+    above_neighbor = chroma > np.roll(chroma, -1, axis=1) * COMPARE_MARGIN
+    rising = np.zeros_like(above_neighbor)
+    rising[1:] = chroma[1:] > chroma[:-1] * COMPARE_MARGIN
+
+    # 무음 프레임은 모든 비트 0 (인코딩마다 다른 앞뒤 무음이 지문을 흔들지 않도록)
+    silent = np.sqrt((signal[indices] ** 2).mean(axis=1)) < SILENCE_RMS
+    above_neighbor[silent] = False
+    rising[silent] = False
+
+    weights = (1 << np.arange(12)).astype(np.uint32)
+    return ((above_neighbor @ weights) | (rising @ weights) << 12).astype(np.uint32)
+
+
+def fingerprint_distance(a, b, max_offset=MAX_OFFSET_FRAMES):
+    """
+    두 지문의 최소 비트 오류율 (±max_offset 프레임 이동 중 가장 잘 맞는 위치 기준)
+
+    Returns:
+        float: 0(같음) ~ 1, 비교할 프레임이 부족하면 1.0
+    """
+    best = 1.0
+    for offset in range(-max_offset, max_offset + 1):
+        x = a[offset:] if offset >= 0 else a
+        y = b if offset >= 0 else b[-offset:]
+        n = min(len(x), len(y))
+        if n < MIN_COMPARE_FRAMES:
+            continue
+        errors = np.unpackbits(np.bitwise_xor(x[:n], y[:n]).view(np.uint8)).sum()
+        best = min(best, errors / (n * BITS_PER_FRAME))
+    return best
+
+
+# ==================== 품질 비교 ====================
+def describe_source(file_path):
+    """
+    원본 길이와 품질 정렬 키
+
+    Returns:
+        tuple: (길이(초), [무손실 여부, 비트 깊이, 샘플레이트, 비트레이트])
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    audio = MutagenFile(file_path)
+    info = getattr(audio, "info", None)
+
+    duration = float(getattr(info, "length", 0.0) or 0.0)
+    sample_rate = int(getattr(info, "sample_rate", 0) or 0)
+    bits = int(getattr(info, "bits_per_sample", 0) or 0)
+    bitrate = int(getattr(info, "bitrate", 0) or 0)
+    codec = str(getattr(info, "codec", "") or "")
+
+    lossless = extension in LOSSLESS_EXTENSIONS or codec.startswith("alac")
+    return duration, [int(lossless), bits, sample_rate, bitrate]
+
+
+# ==================== 인덱스 ====================
+def load_index(index_path):
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return data.get("entries", {})
+
+
+def save_index(index_path, entries):
+    # 임시 파일에 쓴 뒤 교체 (중간에 끊겨도 인덱스가 깨지지 않게)
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": INDEX_VERSION, "entries": entries}, f)
+    os.replace(temp_path, index_path)
+
+
+def fingerprint_entry(file_path, entries):
+    """
+    인덱스 항목 조회 또는 계산 (크기와 mtime이 같으면 재사용)
+
+    Returns:
+        dict: {"size", "mtime_ns", "duration", "quality", "fingerprint"(hex)}
+    """
+    key = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    entry = entries.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry
+
+    duration, quality = describe_source(file_path)
+    fingerprint = compute_fingerprint(decode_excerpt(file_path))
+    entry = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "duration": duration,
+        "quality": quality,
+        "fingerprint": fingerprint.astype("<u4").tobytes().hex()
+    }
+    entries[key] = entry
+    return entry
+
+
+# ==================== 중복 그룹 ====================
+def _find(parent, item):
+    while parent[item] != item:
+        parent[item] = parent[parent[item]]
+        item = parent[item]
+    return item
+
+
+def find_duplicate_groups(file_paths, index_path):
+    """
+    지문이 거의 같은 파일끼리 묶기
+
+    길이가 비슷한 파일끼리만 지문을 비교하므로(길이순 정렬 후 허용 오차 안의 이웃만),
+    큰 라이브러리에서도 모든 쌍을 비교하지 않는다.
+
+    Returns:
+        list: 2개 이상인 그룹 목록 (각 그룹은 품질 좋은 순으로 정렬된 경로 목록)
+    """
+    entries = load_index(index_path)
+    items = []
+    for path in file_paths:
+        try:
+            entry = fingerprint_entry(path, entries)
+        except Exception as error:
+            print(f"[지문 실패] {os.path.basename(path)} - {error}")
+            continue
+        fingerprint = np.frombuffer(bytes.fromhex(entry["fingerprint"]), dtype="<u4")
+        items.append((entry["duration"], path, entry["quality"], fingerprint))
+    save_index(index_path, entries)
+
+    items.sort(key=lambda item: item[0])
+    parent = list(range(len(items)))
+    for i, (duration, _, _, fingerprint) in enumerate(items):
+        for j in range(i + 1, len(items)):
+            if items[j][0] - duration > DUPLICATE_DURATION_TOLERANCE:
+                break
+            if _find(parent, i) == _find(parent, j):
+                continue
+            if fingerprint_distance(fingerprint, items[j][3]) <= DUPLICATE_BIT_ERROR_RATE:
+                parent[_find(parent, j)] = _find(parent, i)
+
+    groups = {}
+    for i, item in enumerate(items):
+        groups.setdefault(_find(parent, i), []).append(item)
+
+    result = []
+    for members in groups.values():
+        if len(members) > 1:
+            members.sort(key=lambda item: item[2], reverse=True)
+            result.append([item[1] for item in members])
+    return result
+
+
+def select_best_sources(file_paths, index_path):
+    """
+    중복 그룹마다 최고 품질 원본만 남긴 처리 대상 목록
+
+    Returns:
+        tuple: (남길 경로 목록(원래 순서), 중복 그룹 목록)
+    """
+    groups = find_duplicate_groups(file_paths, index_path)
+    dropped = {path for group in groups for path in group[1:]}
+    return [path for path in file_paths if path not in dropped], groups
@@ -0,0 +1,351 @@
+"""
+LP DSP Kernels
+턴테이블 특유의 피치 흔들림(wow/flutter), 테이프/진공관 포화, RIAA 톤 커브를
+NumPy(설치되어 있으면 Numba)로 직접 구현한 커널 모음
+
+모든 커널은 (샘플 수, 채널 수) 형태의 float32 배열을 받아 같은 형태로 돌려주며,
+긴 트랙도 메모리가 일정하도록 블록 단위로 처리하고 채널은 한 번에 벡터화한다.
+"""
+
+import time
+import numpy as np
+from scipy.signal import resample_poly, bilinear_zpk, zpk2sos, sosfilt, freqz_zpk
+
+# Numba가 있으면 보간 루프를 JIT 컴파일 (선택 사항)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# ==================== 상수 정의 ====================
+BLOCK_SIZE = 65536
+
+# wow/flutter: depth 1.0 = 최대 피치 편차 10%
+PITCH_DEVIATION_SCALE = 0.1
+FLUTTER_RATE_HZ = 7.5
+FLUTTER_RATIO = 0.25
+
+# 포화: 기본은 ADAA만 (오버샘플링 없음), 오버샘플링 시 블록 경계의 리샘플 필터 여유 샘플
+OVERSAMPLE_FACTOR = 1   # 기본값 (EffectConfig.sat_oversample로 파일/프리셋별 지정)
+OVERSAMPLE_MARGIN = 64
+ADAA_EPSILON = 1e-3
+TUBE_BIAS = 0.2
+
+# RIAA 재생 커브 시정수 (초)
+RIAA_T1 = 3180e-6
+RIAA_T2 = 318e-6
+RIAA_T3 = 75e-6
+
+
+# ==================== 분수 지연 보간기 ====================
+def _hermite_interpolate_numpy(padded, positions):
+    """
+    4점 3차 Hermite 보간 (NumPy 벡터화 버전)
+
+    Args:
+        padded: 앞뒤로 패딩된 원본 신호 (샘플 수, 채널 수)
+        positions: 읽을 분수 위치 배열 (패딩 기준 인덱스)
+
+    Returns:
+        numpy.ndarray: 보간된 신호 (len(positions), 채널 수)
+    """
+    index = np.floor(positions).astype(np.int64)
+    frac = (positions - index).astype(np.float32)[:, None]
+
+    # 한 행(모든 채널)을 원소 하나로 보는 1차원 뷰에서 모으면 2차원 행 인덱싱보다 3배 이상 빠름
+    num_channels = padded.shape[1]
+    padded = np.ascontiguousarray(padded, dtype=np.float32)
+    rows = padded.view(np.dtype((np.void, padded.itemsize * num_channels))).ravel()
+
+    def gather(offset):
+        return rows[index + offset].view(np.float32).reshape(-1, num_channels)
+
+    xm1 = gather(-1)
+    x0 = gather(0)
+    x1 = gather(1)
+    x2 = gather(2)
+
+    c1 = 0.5 * (x1 - xm1)
+    c2 = xm1 - 2.5 * x0 + 2.0 * x1 - 0.5 * x2
+    c3 = 0.5 * (x2 - xm1) + 1.5 * (x0 - x1)
+    return ((c3 * frac + c2) * frac + c1) * frac + x0
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _hermite_interpolate_numba(padded, positions):
+        """4점 3차 Hermite 보간 (Numba 루프 버전)"""
+        num_positions = positions.shape[0]
+        num_channels = padded.shape[1]
+        output = np.empty((num_positions, num_channels), dtype=np.float32)
+        for i in range(num_positions):
+            index = int(np.floor(positions[i]))
+            frac = positions[i] - index
+            for ch in range(num_channels):
+                xm1 = padded[index - 1, ch]
+                x0 = padded[index, ch]
+                x1 = padded[index + 1, ch]
+                x2 = padded[index + 2, ch]
+                c1 = 0.5 * (x1 - xm1)
+                c2 = xm1 - 2.5 * x0 + 2.0 * x1 - 0.5 * x2
+                c3 = 0.5 * (x2 - xm1) + 1.5 * (x0 - x1)
+                output[i, ch] = ((c3 * frac + c2) * frac + c1) * frac + x0
+        return output
+
+    hermite_interpolate = _hermite_interpolate_numba
+else:
+    hermite_interpolate = _hermite_interpolate_numpy
+
+
+# ==================== Wow / Flutter ====================
+def wow_flutter(audio_signal, sample_rate, rate_hz, depth,
+                flutter_hz=FLUTTER_RATE_HZ, flutter_ratio=FLUTTER_RATIO,
+                block_size=BLOCK_SIZE):
+    """
+    가변 지연선으로 턴테이블의 피치 흔들림 구현
+
+    지연 d(t) = A·sin(2πft) 일 때 순간 피치 편차는 2πf·A/sr 이므로,
+    depth로 정한 최대 피치 편차에서 지연 진폭 A를 역산한다.
+    느린 wow(rate_hz)와 빠른 flutter(flutter_hz)를 합성한다.
+
+    Args:
+        audio_signal: 오디오 신호 (샘플 수, 채널 수)
+        sample_rate: 샘플레이트
+        rate_hz: wow 속도 (Hz)
+        depth: wow 깊이 (1.0 = 피치 편차 10%)
+        flutter_hz: flutter 속도 (Hz)
+        flutter_ratio: wow 대비 flutter 피치 편차 비율
+        block_size: 처리 블록 크기
+
+    Returns:
+        numpy.ndarray: 처리된 오디오 신호
+    """
+    if rate_hz <= 0 or depth <= 0:
+        return audio_signal
+
+    num_samples, num_channels = audio_signal.shape
+    deviation = depth * PITCH_DEVIATION_SCALE
+    wow_amp = deviation * sample_rate / (2 * np.pi * rate_hz)
+    flutter_amp = deviation * flutter_ratio * sample_rate / (2 * np.pi * flutter_hz)
+
+    # 평균 지연이 0이 되도록 양쪽에 최대 편차 + 보간 여유만큼 패딩
+    pad = int(np.ceil(wow_amp + flutter_amp)) + 2
+    padded = np.zeros((num_samples + 2 * pad, num_channels), dtype=np.float32)
+    padded[pad:pad + num_samples] = audio_signal
+
+    output = np.empty((num_samples, num_channels), dtype=np.float32)
+    wow_omega = 2 * np.pi * rate_hz / sample_rate
+    flutter_omega = 2 * np.pi * flutter_hz / sample_rate
+
+    # 블록 안의 회전자 표를 한 번만 만들고, 블록마다 시작 위상만 곱해 sin 계산을 대신함
+    offsets = np.arange(block_size, dtype=np.float64)
+    wow_table = wow_amp * np.exp(1j * wow_omega * offsets)
+    flutter_table = flutter_amp * np.exp(1j * flutter_omega * offsets)
+
+    for start in range(0, num_samples, block_size):
+        stop = min(start + block_size, num_samples)
+        length = stop - start
+        modulation = (np.exp(1j * wow_omega * start) * wow_table[:length]).imag
+        modulation += (np.exp(1j * flutter_omega * start) * flutter_table[:length]).imag
+        positions = offsets[:length] + (start + pad) - modulation
+        output[start:stop] = hermite_interpolate(padded, positions)
+
+    return output
+
+
+# ==================== 포화 (Saturation) ====================
+def _process_blocks_with_margin(audio_signal, func, block_size, margin):
+    """
+    블록 경계에 여유 샘플을 붙여 처리한 뒤 중앙만 잘라 이어붙이기
+
+    리샘플 필터의 경계 효과가 여유 구간 안에 머물도록 해서
+    블록 처리 결과가 전체 배열 처리와 같아지게 한다.
+    """
+    num_samples = audio_signal.shape[0]
+    output = np.empty_like(audio_signal)
+
+    for start in range(0, num_samples, block_size):
+        stop = min(start + block_size, num_samples)
+        lo = max(0, start - margin)
+        hi = min(num_samples, stop + margin)
+        processed = func(audio_signal[lo:hi])
+        output[start:stop] = processed[start - lo:start - lo + (stop - start)]
+
+    return output
+
+
+def _log_cosh(x):
+    """
+    log(cosh(x)) + log(2) = |x| + log1p(exp(-2|x|))
+
+    큰 입력에서도 넘치지 않는 형태 (상수 log(2)는 ADAA의 차이에서 지워짐)
+    """
+    abs_x = np.abs(x)
+    return abs_x + np.log1p(np.exp(-2 * abs_x))
+
+
+def _tanh_adaa(u, u_prev):
+    """
+    1차 ADAA(antiderivative anti-aliasing) tanh
+
+    y[n] = (F(u[n]) - F(u[n-1])) / (u[n] - u[n-1]), F = log(cosh) 는 tanh를 한 샘플 구간에서
+    평균낸 값이라 오버샘플링 없이도 접힘(aliasing) 성분이 크게 줄어든다.
+    구간이 아주 짧으면 0/0을 피해 중점의 tanh로 대체한다.
+
+    Args:
+        u: 드라이브가 적용된 입력 (샘플 수, 채널 수)
+        u_prev: 각 채널의 직전 블록 마지막 샘플 (채널 수,)
+
+    Returns:
+        numpy.ndarray: 포화된 신호 (float32)
+    """
+    shifted = np.empty_like(u)
+    shifted[0] = u_prev
+    shifted[1:] = u[:-1]
+
+    # F는 샘플마다 한 번만 계산하고 한 칸 밀어서 F(u[n-1])로 재사용
+    antiderivative = _log_cosh(u)
+    antiderivative_prev = np.empty_like(antiderivative)
+    antiderivative_prev[0] = _log_cosh(np.asarray(u_prev, dtype=u.dtype))
+    antiderivative_prev[1:] = antiderivative[:-1]
+
+    delta = u - shifted
+    small = np.abs(delta) < ADAA_EPSILON
+    averaged = (antiderivative - antiderivative_prev) / np.where(small, np.float32(1), delta)
+    return np.where(small, np.tanh(0.5 * (u + shifted)), averaged).astype(np.float32)
+
+
+def saturate(audio_signal, drive_db, mode="tape",
+             oversample=OVERSAMPLE_FACTOR, block_size=BLOCK_SIZE):
+    """
+    ADAA tanh 포화 (테이프/진공관 스타일)
+
+    기본(oversample=1)은 오버샘플링 없이 ADAA만으로 에일리어싱을 억제한다.
+    oversample을 2 이상으로 주면 리샘플 왕복을 추가해 고역 드라이브에서 더 깨끗해진다. (대신 느림)
+
+    Args:
+        audio_signal: 오디오 신호 (샘플 수, 채널 수)
+        drive_db: 드라이브 강도 (dB)
+        mode: 'tape' (대칭) 또는 'tube' (비대칭, 짝수 배음)
+        oversample: 오버샘플링 배수 (1 = ADAA만 사용)
+        block_size: 처리 블록 크기
+
+    Returns:
+        numpy.ndarray: 처리된 오디오 신호
+    """
+    if drive_db <= 0:
+        return audio_signal
+
+    gain = np.float32(10 ** (drive_db / 20))
+    bias = np.float32(TUBE_BIAS if mode == "tube" else 0.0)
+    offset = np.float32(np.tanh(bias))
+
+    if oversample <= 1:
+        # ADAA는 직전 샘플만 필요하므로 블록 사이에 마지막 입력만 넘기면 전체 처리와 같다
+        output = np.empty_like(audio_signal, dtype=np.float32)
+        u_prev = np.full(audio_signal.shape[1], bias, dtype=np.float32)
+        for start in range(0, audio_signal.shape[0], block_size):
+            u = gain * audio_signal[start:start + block_size] + bias
+            output[start:start + block_size] = _tanh_adaa(u, u_prev) - offset
+            u_prev = u[-1]
+        return output
+
+    def shape(block):
+        upsampled = resample_poly(block, oversample, 1, axis=0).astype(np.float32)
+        u = gain * upsampled + bias
+        shaped = _tanh_adaa(u, u[0]) - offset
+        return resample_poly(shaped, 1, oversample, axis=0).astype(np.float32)
+
+    return _process_blocks_with_margin(audio_signal, shape, block_size, OVERSAMPLE_MARGIN)
+
+
+# ==================== RIAA 톤 커브 ====================
+def riaa_sos(sample_rate):
+    """
+    RIAA 재생(de-emphasis) 커브의 디지털 필터 계수 (1kHz에서 0dB로 정규화)
+
+    H(s) = (1 + s·T2) / ((1 + s·T1)(1 + s·T3))
+    """
+    zeros = [-1 / RIAA_T2]
+    poles = [-1 / RIAA_T1, -1 / RIAA_T3]
+    gain = RIAA_T2 / (RIAA_T1 * RIAA_T3)
+
+    z, p, k = bilinear_zpk(zeros, poles, gain, fs=sample_rate)
+    _, response = freqz_zpk(z, p, k, worN=[1000.0], fs=sample_rate)
+    return zpk2sos(z, p, k / abs(response[0]))
+
+
+def riaa_tone(audio_signal, sample_rate, amount):
+    """
+    RIAA 스타일 톤 커브 적용
+
+    Args:
+        audio_signal: 오디오 신호 (샘플 수, 채널 수)
+        sample_rate: 샘플레이트
+        amount: 원음과 RIAA 커브 신호의 혼합 비율 (0~1)
+
+    Returns:
+        numpy.ndarray: 처리된 오디오 신호
+    """
+    if amount <= 0:
+        return audio_signal
+
+    filtered = sosfilt(riaa_sos(sample_rate), audio_signal, axis=0).astype(np.float32)
+    if amount >= 1:
+        return filtered
+    return (1 - amount) * audio_signal + amount * filtered
+
+
+# ==================== 벤치마크 ====================
+def benchmark(seconds=60.0, sample_rate=48000, channels=2,
+              rate_hz=0.7, depth=0.02, drive_db=6.0, repeats=5):
+    """
+    Pedalboard 체인(Chorus + Distortion)과 네이티브 커널의 처리량 비교
+
+    측정 잡음을 줄이려고 엔진마다 repeats번 돌려 가장 빠른 시간을 쓴다.
+
+    Returns:
+        dict: 엔진별 실시간 대비 처리 배속
+    """
+    from pedalboard import Pedalboard, Chorus, Distortion
+
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal((int(seconds * sample_rate), channels)) * 0.1).astype(np.float32)
+
+    board = Pedalboard([
+        Chorus(rate_hz=rate_hz, depth=depth, centre_delay_ms=7.0),
+        Distortion(drive_db=drive_db)
+    ])
+
+    def best_time(func):
+        elapsed = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            func()
+            elapsed.append(time.perf_counter() - started)
+        return min(elapsed)
+
+    pedalboard_time = best_time(lambda: board(audio, sample_rate))
+
+    # Numba JIT 컴파일 시간은 제외
+    wow_flutter(audio[:1024], sample_rate, rate_hz, depth)
+
+    native_time = best_time(lambda: saturate(wow_flutter(audio, sample_rate, rate_hz, depth), drive_db))
+
+    results = {
+        "pedalboard": seconds / pedalboard_time,
+        "native": seconds / native_time
+    }
+
+    backend = "numba" if njit is not None else "numpy"
+    print(f"[Benchmark] {seconds:.0f}초, {sample_rate}Hz, {channels}ch")
+    print(f"  Pedalboard (Chorus + Distortion): {results['pedalboard']:.1f}x 실시간")
+    saturation = "ADAA 포화" if OVERSAMPLE_FACTOR <= 1 else f"{OVERSAMPLE_FACTOR}x ADAA 포화"
+    print(f"  Native ({backend}, wow/flutter + {saturation}): {results['native']:.1f}x 실시간")
+    print(f"  Native / Pedalboard: {results['native'] / results['pedalboard']:.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,294 @@
+"""
+LP Preset Store
+프리셋 라이브러리(TOML/JSON)를 시작 시 한 번 읽어 검증/정규화하고,
+폴더별 .lpconfig 오버라이드를 해석하는 모듈
+
+.lpconfig 예시 (TOML, 또는 '{'로 시작하면 JSON):
+    preset = "Vocal Jazz"
+    cutoff = 9000
+"""
+
+import os
+import json
+from dataclasses import dataclass, asdict, fields, replace
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+# ==================== 상수 정의 ====================
+PRESET_LIBRARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lp_presets.toml")
+FOLDER_CONFIG_FILENAME = ".lpconfig"
+
+# 파라미터별 허용 범위 (최소, 최대)
+PARAMETER_RANGES = {
+    "speed": (0.5, 1.5),
+    "cutoff": (1000, 24000),
+    "sat": (0, 40),
+    "wf_rate": (0, 20),
+    "wf_depth": (0, 1),
+    "crackle_amt": (0, 0.1),
+    "crackle_cps": (0, 50),
+    "riaa": (0, 1),
+    "sat_oversample": (1, 8),
+}
+
+# 정수만 허용하는 파라미터
+INTEGER_PARAMETERS = ("sat_oversample",)
+
+SUPPORTED_ENGINES = ("pedalboard", "native")
+# 포화 방식 (lp_kernels.saturate의 mode, engine='native'에서만 사용)
+SUPPORTED_SAT_MODES = ("tape", "tube")
+
+# 슬라이더 등에서 들어오는 부동소수 오차를 없애 같은 설정이 같은 키가 되도록 반올림
+PARAMETER_DECIMALS = 6
+
+
+# ==================== 효과 설정 ====================
+@dataclass(frozen=True)
+class EffectConfig:
+    """
+    검증/정규화된 LP 효과 설정 (불변, 해시 가능 → 캐시 키로 사용 가능)
+    """
+    speed: float = 1.0
+    cutoff: float = 20000.0
+    sat: float = 0.0
+    wf_rate: float = 0.0
+    wf_depth: float = 0.0
+    crackle_amt: float = 0.0
+    crackle_cps: float = 0.0
+    riaa: float = 0.0
+    engine: str = "pedalboard"
+    sat_mode: str = "tape"
+    sat_oversample: int = 1
+
+    @classmethod
+    def from_dict(cls, data, base=None):
+        """
+        딕셔너리에서 설정 생성 (검증 및 정규화)
+
+        Args:
+            data: 설정 딕셔너리 (일부 키만 있어도 됨, 'label'은 무시)
+            base: 생략된 값을 채울 기준 설정 (None이면 기본값)
+
+        Returns:
+            EffectConfig: 정규화된 설정
+
+        Raises:
+            ValueError: 알 수 없는 키, 잘못된 값 또는 범위를 벗어난 값,
+                Pedalboard 엔진에서 사용할 수 없는 포화 설정
+        """
+        known = {f.name for f in fields(cls)}
+        values = {}
+
+        for key, value in data.items():
+            if key == "label":
+                continue
+            if key not in known:
+                raise ValueError(f"알 수 없는 설정 키: {key}")
+
+            if key == "engine":
+                if value not in SUPPORTED_ENGINES:
+                    raise ValueError(f"지원하지 않는 엔진: {value}")
+                values[key] = value
+                continue
+
+            if key == "sat_mode":
+                if value not in SUPPORTED_SAT_MODES:
+                    raise ValueError(f"지원하지 않는 포화 방식: {value}")
+                values[key] = value
+                continue
+
+            try:
+                number = round(float(value), PARAMETER_DECIMALS)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} 값이 숫자가 아닙니다: {value!r}")
+
+            low, high = PARAMETER_RANGES[key]
+            if not low <= number <= high:
+                raise ValueError(f"{key} 값 {number}이(가) 허용 범위({low}~{high})를 벗어났습니다")
+            if key in INTEGER_PARAMETERS:
+                if not number.is_integer():
+                    raise ValueError(f"{key} 값이 정수가 아닙니다: {value!r}")
+                number = int(number)
+            values[key] = number
+
+        config = replace(base or cls(), **values)
+        # 포화 방식/오버샘플링은 lp_kernels 포화에만 있으므로 Pedalboard 엔진에서는 무시하지 않고 거부
+        if config.engine != "native" and (config.sat_mode != "tape" or config.sat_oversample != 1):
+            raise ValueError("sat_mode/sat_oversample은 engine = \"native\"에서만 사용할 수 있습니다")
+        return config
+
+    @classmethod
+    def coerce(cls, config):
+        """EffectConfig 또는 딕셔너리를 EffectConfig로 변환"""
+        if isinstance(config, cls):
+            return config
+        return cls.from_dict(config)
+
+    def to_dict(self):
+        """직렬화용 딕셔너리"""
+        return asdict(self)
+
+
+# ==================== 파일 읽기 ====================
+def load_config_file(file_path):
+    """
+    TOML 또는 JSON 설정 파일 읽기
+
+    확장자가 .json이거나 내용이 '{'로 시작하면 JSON, 그 외에는 TOML로 해석한다.
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read()
+
+    text = raw.decode("utf-8-sig")
+    if file_path.endswith(".json") or text.lstrip().startswith("{"):
+        return json.loads(text)
+
+    if tomllib is None:
+        raise RuntimeError("TOML 설정을 읽으려면 Python 3.11+ 또는 tomli 패키지가 필요합니다")
+    return tomllib.loads(text)
+
+
+def validate_overrides(overrides, file_path):
+    """
+    .lpconfig 오버라이드 검증 (키 이름과 값 형식만, 값의 범위는 해석 시 EffectConfig가 검증)
+
+    오버라이드는 캐시 키(튜플)에 들어가므로 리스트/테이블 같은 값은 여기서 거부한다.
+
+    Raises:
+        ValueError: 최상위가 테이블이 아니거나, 알 수 없는 키 또는 스칼라가 아닌 값
+    """
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{file_path}: 최상위는 키/값 테이블이어야 합니다")
+
+    known = {f.name for f in fields(EffectConfig)} | {"preset", "label"}
+    for key, value in overrides.items():
+        if key not in known:
+            raise ValueError(f"{file_path}: 알 수 없는 설정 키: {key}")
+        if key == "preset" and not isinstance(value, str):
+            raise ValueError(f"{file_path}: preset은 문자열이어야 합니다: {value!r}")
+        if not isinstance(value, (str, int, float)):
+            raise ValueError(f"{file_path}: {key} 값은 숫자 또는 문자열이어야 합니다: {value!r}")
+
+
+# ==================== 프리셋 저장소 ====================
+class PresetStore:
+    """
+    프리셋 라이브러리와 폴더별 오버라이드 해석기
+
+    폴더별 .lpconfig는 폴더당 한 번만 확인하고 결과를 캐시하므로,
+    만 개 단위의 폴더를 가진 라이브러리에서도 해석 비용이 무시할 만하다.
+    """
+
+    def __init__(self, presets):
+        """
+        Args:
+            presets: {프리셋 이름: EffectConfig} (순서 유지)
+        """
+        self.presets = dict(presets)
+        self._folder_overrides = {}
+        self._resolved = {}
+
+    @classmethod
+    def load(cls, library_path=PRESET_LIBRARY_PATH):
+        """
+        프리셋 라이브러리 파일을 읽어 저장소 생성
+
+        Args:
+            library_path: TOML/JSON 프리셋 파일 경로 ([presets."이름"] 테이블)
+
+        Returns:
+            PresetStore: 프리셋 저장소
+        """
+        data = load_config_file(library_path)
+        presets = {}
+        for name, values in data.get("presets", {}).items():
+            try:
+                presets[name] = EffectConfig.from_dict(values)
+            except ValueError as error:
+                raise ValueError(f"프리셋 '{name}' 오류: {error}")
+        return cls(presets)
+
+    def names(self):
+        """프리셋 이름 목록 (라이브러리 파일 순서)"""
+        return list(self.presets.keys())
+
+    def get(self, name):
+        """이름으로 프리셋 조회"""
+        return self.presets[name]
+
+    def folder_overrides(self, directory, root):
+        """
+        root부터 directory까지의 .lpconfig를 누적한 오버라이드
+
+        하위 폴더의 값이 상위 폴더의 값을 덮어쓴다.
+
+        Returns:
+            tuple: 정렬된 (키, 값) 튜플 (해시 가능)
+        """
+        directory = os.path.abspath(directory)
+        cached = self._folder_overrides.get(directory)
+        if cached is not None:
+            return cached
+
+        parent = os.path.dirname(directory)
+        if directory == os.path.abspath(root) or parent == directory:
+            merged = {}
+        else:
+            merged = dict(self.folder_overrides(parent, root))
+
+        config_path = os.path.join(directory, FOLDER_CONFIG_FILENAME)
+        if os.path.isfile(config_path):
+            overrides = load_config_file(config_path)
+            validate_overrides(overrides, config_path)
+            # 폴더에서 프리셋을 바꾸면 상위 폴더의 개별 값 오버라이드는 버림
+            if "preset" in overrides:
+                merged = {}
+            merged.update(overrides)
+
+        result = tuple(sorted(merged.items()))
+        self._folder_overrides[directory] = result
+        return result
+
+    def resolve(self, directory, base_config, root):
+        """
+        폴더에 적용할 최종 설정 해석
+
+        Args:
+            directory: 대상 폴더
+            base_config: 사용자가 선택한 기본 설정 (EffectConfig)
+            root: 오버라이드 탐색을 멈출 최상위 폴더
+
+        Returns:
+            EffectConfig: 최종 설정
+        """
+        overrides = self.folder_overrides(directory, root)
+        if not overrides:
+            return base_config
+
+        key = (base_config, overrides)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            values = dict(overrides)
+            config = base_config
+            preset_name = values.pop("preset", None)
+            if preset_name is not None:
+                if preset_name not in self.presets:
+                    raise ValueError(f"{directory}: 알 수 없는 프리셋 '{preset_name}'")
+                config = self.presets[preset_name]
+            try:
+                resolved = EffectConfig.from_dict(values, base=config)
+            except ValueError as error:
+                raise ValueError(f"{directory}: {error}")
+            self._resolved[key] = resolved
+        return resolved
+
+    def resolve_for_file(self, file_path, base_config, root):
+        """파일이 속한 폴더 기준으로 설정 해석"""
+        return self.resolve(os.path.dirname(os.path.abspath(file_path)), base_config, root)
@@ -0,0 +1,481 @@
+"""
+LP Realtime Monitor
+LP 효과를 고정 크기 블록(256~1024 프레임) 단위로 실시간 적용하는 모니터링 모드
+
+오프라인 처리(render_lp_audio)는 배열 전체를 한 번에 다루지만, 여기서는 모든 단계가 블록 사이 상태를 유지한다.
+- 속도: 입력 FIFO + 4점 Hermite 분수 위치 리샘플러 (오프라인의 resample_poly 근사)
+- 이펙트 체인: 한 번 만든 Pedalboard를 reset=False로 계속 사용 (코러스/필터/컴프레서 상태 유지)
+- RIAA 톤: sosfilt 필터 상태(zi)를 블록 사이에 이어감
+- 크래클: 블록마다 포아송 분포로 발생 수를 뽑고, 블록 끝을 넘는 크래클 꼬리는 다음 블록으로 넘김
+
+engine='native'의 wow/flutter와 포화는 배열 전체용 커널이라, 실시간에서는 Pedalboard의
+Chorus/Distortion으로 대신한다. (프리셋 소리를 빠르게 확인하는 용도)
+
+라이브 입력은 정확히 1배속으로만 들어오므로 속도 조정(varispeed)을 할 수 없다.
+(speed < 1이면 매 블록 입력이 모자라고, speed > 1이면 입력이 계속 쌓여 버려진다)
+라이브 입력 모니터링은 speed를 무시하고 1.0으로 처리하며, 속도 조정은 파일 입력에서만 적용된다.
+
+오디오 입출력은 교체 가능한 백엔드로 분리했다.
+- SoundDeviceBackend: sounddevice 스트림 (라이브 입력 → 출력, 또는 파일 → 출력)
+- FileBackend: 파일 → 파일 (콜백 구조를 그대로 흉내 내는 테스트/루프백 대용)
+
+사용 예:
+    python lp_realtime.py --preset "Vocal Jazz" --input song.flac      # 파일을 스피커로 모니터링
+    python lp_realtime.py --preset "Vocal Jazz"                        # 라이브 입력 모니터링
+    python lp_realtime.py --input song.flac --output monitor.wav       # 파일 백엔드
+모니터링 중에는 "cutoff=9000"처럼 입력해 설정을 바로 바꿀 수 있다.
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+import numpy as np
+import soundfile as sf
+from scipy.signal import sosfilt
+
+import lp_kernels
+from audio_lp_processor import build_effect_board
+from lp_presets import EffectConfig, PresetStore
+
+# 실시간 오디오 입출력용 (선택 사항)
+try:
+    import sounddevice as sd
+except ImportError:
+    sd = None
+
+
+# ==================== 상수 정의 ====================
+DEFAULT_BLOCK_SIZE = 512
+DEFAULT_SAMPLE_RATE = 48000
+DEFAULT_CHANNELS = 2
+
+# 속도 조정 FIFO에 쌓아 둘 최대 입력 길이 (블록 수, 넘치면 오래된 샘플 버림)
+MAX_FIFO_BLOCKS = 8
+
+CRACKLE_LENGTH = 64
+
+
+# ==================== 블록 처리 구성 요소 ====================
+class StreamingResampler:
+    """
+    블록 단위 속도 조정 (출력 1샘플당 입력 1/ratio샘플 진행)
+
+    입력은 push로 FIFO에 쌓고, pull로 원하는 만큼 출력을 꺼낸다.
+    보간에 필요한 직전 샘플과 분수 읽기 위치를 블록 사이에 유지한다.
+    """
+
+    def __init__(self, ratio, channels):
+        self.step = 1.0 / ratio
+        self.buffer = np.zeros((1, channels), dtype=np.float32)
+        self.position = 1.0
+
+    def push(self, block):
+        self.buffer = np.concatenate([self.buffer, block.astype(np.float32, copy=False)])
+
+    def available(self):
+        """지금 버퍼로 만들 수 있는 출력 샘플 수 (Hermite 보간에 읽기 위치 뒤 2샘플 필요)"""
+        return max(0, int(np.ceil((len(self.buffer) - 2 - self.position) / self.step)))
+
+    def needed(self, frames):
+        """frames개를 출력하려면 더 넣어야 하는 입력 샘플 수"""
+        last = self.position + self.step * (frames - 1)
+        return max(0, int(np.floor(last)) + 3 - len(self.buffer))
+
+    def pull(self, frames):
+        positions = self.position + self.step * np.arange(frames)
+        output = lp_kernels.hermite_interpolate(self.buffer, positions)
+        self.position += self.step * frames
+
+        # 다음 보간에 필요한 직전 1샘플만 남기고 소비한 입력은 버림
+        drop = int(np.floor(self.position)) - 1
+        if drop > 0:
+            self.buffer = self.buffer[drop:]
+            self.position -= drop
+        return output
+
+    def trim(self, max_frames):
+        """
+        FIFO가 max_frames를 넘으면 오래된 입력을 버림 (라이브 입력에서 지연이 쌓이지 않도록)
+
+        Returns:
+            int: 버린 샘플 수
+        """
+        excess = len(self.buffer) - max_frames
+        if excess <= 0:
+            return 0
+        self.buffer = self.buffer[excess:]
+        self.position = max(1.0, self.position - excess)
+        return excess
+
+
+class BlockCrackle:
+    """블록 단위 크래클 생성기 (발생 수는 포아송, 블록 경계를 넘는 꼬리는 다음 블록에 더함)"""
+
+    def __init__(self, sample_rate, amount, crackles_per_second, rng=None):
+        self.sample_rate = sample_rate
+        self.amount = amount
+        self.crackles_per_second = crackles_per_second
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.window = np.hanning(CRACKLE_LENGTH).astype(np.float32)
+        self.tail = np.zeros(CRACKLE_LENGTH, dtype=np.float32)
+
+    def process(self, block):
+        if self.amount <= 0 or self.crackles_per_second <= 0:
+            return block
+
+        frames = len(block)
+        envelope = np.zeros(frames + CRACKLE_LENGTH, dtype=np.float32)
+        envelope[:CRACKLE_LENGTH] += self.tail
+
+        count = self.rng.poisson(self.crackles_per_second * frames / self.sample_rate)
+        if count:
+            positions = self.rng.integers(0, frames, size=count)
+            strengths = self.rng.random(count) * 0.6 + 0.4
+            indices = (positions[:, None] + np.arange(CRACKLE_LENGTH)).ravel()
+            values = (self.amount * strengths[:, None] * self.window).astype(np.float32).ravel()
+            np.add.at(envelope, indices, values)
+
+        self.tail = envelope[frames:].copy()
+        return np.clip(block + envelope[:frames, None], -1.0, 1.0)
+
+
+class RealtimeStats:
+    """콜백 시간 예산 사용률과 드롭아웃 집계"""
+
+    def __init__(self):
+        self.blocks = 0
+        self.total_load = 0.0
+        self.max_load = 0.0
+        self.late_blocks = 0
+        self.underruns = 0
+        self.dropped_frames = 0
+        self.backend_dropouts = 0
+
+    def record(self, elapsed, budget):
+        load = elapsed / budget
+        self.blocks += 1
+        self.total_load += load
+        self.max_load = max(self.max_load, load)
+        if load > 1.0:
+            self.late_blocks += 1
+
+    @property
+    def mean_load(self):
+        return self.total_load / self.blocks if self.blocks else 0.0
+
+    @property
+    def dropouts(self):
+        return self.late_blocks + self.underruns + self.backend_dropouts
+
+    def summary(self):
+        return (f"블록 {self.blocks:,}개, 예산 사용률 평균 {self.mean_load:.1%} / 최대 {self.max_load:.1%}, "
+                f"드롭아웃 {self.dropouts} (지연 {self.late_blocks}, 입력 부족 {self.underruns}, "
+                f"백엔드 {self.backend_dropouts}), 버린 입력 {self.dropped_frames:,}샘플")
+
+
+# ==================== 블록 프로세서 ====================
+class RealtimeProcessor:
+    """
+    고정 크기 블록에 LP 효과를 적용하는 상태 유지 프로세서
+
+    process(input_block)은 같은 길이의 출력 블록을 돌려준다.
+    set_config는 다른 스레드(설정 입력)에서 불러도 되고, 다음 블록 처리 시작 시 반영된다.
+    varispeed=False면 config.speed를 무시한다. (입력이 1배속으로 들어오는 라이브 입력용)
+    """
+
+    def __init__(self, config, sample_rate=DEFAULT_SAMPLE_RATE, channels=DEFAULT_CHANNELS,
+                 block_size=DEFAULT_BLOCK_SIZE, seed=None, varispeed=True):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self.varispeed = varispeed
+        self.rng = np.random.default_rng(seed)
+        self.stats = RealtimeStats()
+        self.valid_frames = 0
+        self._pending = None
+        self._lock = threading.Lock()
+        self._build(EffectConfig.coerce(config))
+
+    def _build(self, config):
+        """설정에 맞춰 블록 처리 상태 생성 (속도가 같으면 리샘플러 FIFO는 유지)"""
+        self.config = config
+
+        speed = config.speed if self.varispeed else 1.0
+        if getattr(self, "speed", None) != speed:
+            self.speed = speed
+            self.resampler = None if speed == 1.0 else StreamingResampler(speed, self.channels)
+
+        self.board = build_effect_board(config.wf_rate, config.wf_depth, config.cutoff, config.sat)
+        self.riaa_sos = lp_kernels.riaa_sos(self.sample_rate) if config.riaa > 0 else None
+        if self.riaa_sos is not None:
+            self.riaa_zi = np.zeros((self.riaa_sos.shape[0], 2, self.channels), dtype=np.float64)
+        self.crackle = BlockCrackle(self.sample_rate, config.crackle_amt, config.crackle_cps, self.rng)
+
+    def set_config(self, config):
+        with self._lock:
+            self._pending = EffectConfig.coerce(config)
+
+    def input_frames_needed(self, frames):
+        """frames개 출력에 필요한 입력 샘플 수 (파일처럼 원하는 만큼 읽을 수 있는 입력용)"""
+        if self.resampler is None:
+            return frames
+        return self.resampler.needed(frames)
+
+    def process(self, block, final=False):
+        """
+        입력 블록 → 출력 블록 (len(block)이 0이어도 출력은 block_size)
+
+        입력이 모자라 무음으로 채운 부분을 뺀 실제 샘플 수는 valid_frames에 남는다.
+        final=True는 입력(파일)이 끝난 뒤라는 뜻으로, 이때 모자란 샘플은 드롭아웃으로 세지 않는다.
+
+        Returns:
+            numpy.ndarray: (block_size, 채널 수) float32
+        """
+        start = time.perf_counter()
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._build(pending)
+
+        frames = self.block_size
+        block = np.asarray(block, dtype=np.float32).reshape(-1, self.channels)
+
+        # 속도 조정: FIFO에 넣고 블록 크기만큼 꺼냄 (입력이 모자라면 무음으로 채우고 드롭아웃 집계)
+        if self.resampler is None:
+            audio = np.zeros((frames, self.channels), dtype=np.float32)
+            audio[:len(block)] = block[:frames]
+            self.valid_frames = min(len(block), frames)
+        else:
+            self.resampler.push(block)
+            self.stats.dropped_frames += self.resampler.trim(MAX_FIFO_BLOCKS * frames)
+            available = min(self.resampler.available(), frames)
+            if available < frames and not final:
+                self.stats.underruns += 1
+            audio = np.zeros((frames, self.channels), dtype=np.float32)
+            if available:
+                audio[:available] = self.resampler.pull(available)
+            self.valid_frames = available
+
+        # RIAA 톤 (필터 상태 유지)
+        if self.riaa_sos is not None:
+            filtered, self.riaa_zi = sosfilt(self.riaa_sos, audio, axis=0, zi=self.riaa_zi)
+            amount = min(self.config.riaa, 1.0)
+            audio = ((1 - amount) * audio + amount * filtered).astype(np.float32)
+
+        # Pedalboard는 (채널, 샘플) 배치를 기본으로 하므로 전치해서 넘기고, reset=False로 내부 상태 유지
+        processed = self.board.process(
+            np.ascontiguousarray(audio.T), self.sample_rate, buffer_size=frames, reset=False
+        )
+        output = self.crackle.process(np.ascontiguousarray(processed.T))
+
+        self.stats.record(time.perf_counter() - start, frames / self.sample_rate)
+        return output.astype(np.float32, copy=False)
+
+    def drain_remaining(self):
+        """입력이 끝난 뒤 리샘플러에 남은 출력 블록 수 (파일 백엔드 마무리용)"""
+        if self.resampler is None:
+            return 0
+        return -(-self.resampler.available() // self.block_size)
+
+
+# ==================== 백엔드 ====================
+class FileBackend:
+    """
+    파일 → 파일 백엔드 (sounddevice 없이 콜백 흐름을 그대로 재현하는 테스트/루프백 대용)
+
+    realtime=True면 블록마다 실제 시간만큼 기다려 장치처럼 속도를 맞춘다.
+    """
+
+    def __init__(self, input_path, output_path, realtime=False):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.realtime = realtime
+
+    def run(self, processor):
+        with sf.SoundFile(self.input_path) as src, \
+                sf.SoundFile(self.output_path, "w", samplerate=processor.sample_rate,
+                             channels=processor.channels, subtype="PCM_24") as dst:
+            stream_blocks(processor, src, dst, realtime=self.realtime)
+        return processor.stats
+
+
+def stream_blocks(processor, src, dst, realtime=False):
+    """
+    열린 soundfile 입력을 블록 단위로 처리해 출력에 기록 (입력이 끝나면 리샘플러 잔여분까지 출력)
+
+    Args:
+        processor: RealtimeProcessor
+        src: 읽기용 soundfile.SoundFile
+        dst: 쓰기용 soundfile.SoundFile
+        realtime: True면 블록마다 실제 시간만큼 기다림
+    """
+    frames = processor.block_size
+    budget = frames / processor.sample_rate
+    next_deadline = time.perf_counter()
+    tail_blocks = None
+    while tail_blocks is None or tail_blocks > 0:
+        needed = processor.input_frames_needed(frames)
+        block = src.read(needed, dtype="float32", always_2d=True)
+        if tail_blocks is None and needed > 0 and len(block) == 0:
+            tail_blocks = processor.drain_remaining()
+            continue
+        if tail_blocks is not None:
+            tail_blocks -= 1
+        # 파일 출력은 장치와 달리 입력 끝의 무음 채움을 기록하지 않음
+        final = tail_blocks is not None or len(block) < needed
+        output = processor.process(match_channels(block, processor.channels), final=final)
+        dst.write(output[:processor.valid_frames])
+
+        if realtime:
+            next_deadline += budget
+            time.sleep(max(0.0, next_deadline - time.perf_counter()))
+
+
+class SoundDeviceBackend:
+    """
+    sounddevice 스트림 백엔드
+
+    input_path가 없으면 입력 장치 → 출력 장치(라이브 모니터링, varispeed=False 프로세서 필요),
+    있으면 파일을 콜백 안에서 필요한 만큼 읽어 출력 장치로 재생한다.
+    """
+
+    def __init__(self, input_path=None, device=None, latency="low"):
+        if sd is None:
+            raise RuntimeError("실시간 입출력에는 sounddevice 패키지가 필요합니다 (pip install sounddevice)")
+        self.input_path = input_path
+        self.device = device
+        self.latency = latency
+        self.finished = threading.Event()
+
+    def run(self, processor, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        stats = processor.stats
+        if self.input_path is None and processor.varispeed:
+            raise ValueError("라이브 입력은 1배속으로 들어오므로 속도 조정을 할 수 없습니다 "
+                             "(RealtimeProcessor(..., varispeed=False)로 만들어 주세요)")
+        source = sf.SoundFile(self.input_path) if self.input_path else None
+
+        def duplex_callback(indata, outdata, frames, time_info, status):
+            if status:
+                stats.backend_dropouts += 1
+            outdata[:] = processor.process(indata)
+
+        def playback_callback(outdata, frames, time_info, status):
+            if status:
+                stats.backend_dropouts += 1
+            needed = processor.input_frames_needed(frames)
+            block = source.read(needed, dtype="float32", always_2d=True)
+            outdata[:] = processor.process(match_channels(block, processor.channels), final=len(block) < needed)
+            if needed > 0 and len(block) == 0 and processor.drain_remaining() == 0:
+                raise sd.CallbackStop
+
+        common = dict(
+            samplerate=processor.sample_rate,
+            blocksize=processor.block_size,
+            channels=processor.channels,
+            dtype="float32",
+            latency=self.latency,
+            device=self.device,
+            finished_callback=self.finished.set
+        )
+        try:
+            if source is None:
+                stream = sd.Stream(callback=duplex_callback, **common)
+            else:
+                stream = sd.OutputStream(callback=playback_callback, **common)
+            with stream:
+                while not stop_event.is_set() and not self.finished.is_set():
+                    stop_event.wait(0.1)
+        finally:
+            if source is not None:
+                source.close()
+        return stats
+
+
+def match_channels(block, channels):
+    """입력 채널 수를 출력 채널 수에 맞춤 (모노 → 복제, 그 외 → 앞 채널 사용/평균)"""
+    if block.shape[1] == channels:
+        return block
+    if block.shape[1] == 1:
+        return np.repeat(block, channels, axis=1)
+    if channels == 1:
+        return block.mean(axis=1, keepdims=True)
+    return block[:, :channels]
+
+
+# ==================== 실행 ====================
+def read_config_updates(processor, stop_event):
+    """표준 입력에서 'key=value'를 읽어 실시간으로 설정 변경 (빈 줄이나 q 입력 시 종료)"""
+    print("설정 변경: key=value (예: cutoff=9000), 종료: q")
+    while not stop_event.is_set():
+        try:
+            line = input().strip()
+        except EOFError:
+            break
+        if line in ("", "q"):
+            break
+        key, _, value = line.partition("=")
+        try:
+            config = EffectConfig.from_dict({key.strip(): value.strip()}, base=processor.config)
+        except ValueError as error:
+            print(f"  {error}")
+            continue
+        processor.set_config(config)
+        print(f"  적용: {key.strip()}={getattr(config, key.strip())}")
+        if key.strip() == "speed" and not processor.varispeed:
+            print("  (라이브 입력 모니터링에서는 speed가 적용되지 않고 1.0으로 처리됩니다)")
+    stop_event.set()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="LP 효과 실시간 모니터링")
+    parser.add_argument("--preset", default=None, help="프리셋 이름 (생략하면 기본 설정)")
+    parser.add_argument("--input", default=None, help="입력 오디오 파일 (생략하면 입력 장치)")
+    parser.add_argument("--output", default=None, help="출력 파일 (지정하면 sounddevice 대신 파일 백엔드)")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="블록 크기 (프레임)")
+    parser.add_argument("--samplerate", type=int, default=None, help="처리 샘플레이트 (기본: 입력 파일 또는 48000)")
+    parser.add_argument("--channels", type=int, default=DEFAULT_CHANNELS, help="채널 수")
+    parser.add_argument("--device", default=None, help="sounddevice 장치 이름 또는 번호")
+    parser.add_argument("--realtime", action="store_true", help="파일 백엔드도 실제 시간 속도로 진행")
+    parser.add_argument("--seed", type=int, default=None, help="크래클 시드")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = PresetStore.load().get(args.preset) if args.preset else EffectConfig()
+
+    sample_rate = args.samplerate
+    if sample_rate is None:
+        sample_rate = sf.info(args.input).samplerate if args.input else DEFAULT_SAMPLE_RATE
+
+    # 라이브 입력은 1배속으로만 들어오므로 속도 조정은 파일 입력에서만 적용
+    live_input = not args.input
+    if live_input and config.speed != 1.0:
+        print(f"라이브 입력 모니터링에서는 속도 조정을 적용하지 않습니다 (speed {config.speed} → 1.0)")
+    processor = RealtimeProcessor(config, sample_rate, args.channels, args.block_size,
+                                  seed=args.seed, varispeed=not live_input)
+
+    if args.output:
+        if not args.input:
+            print("파일 백엔드에는 --input이 필요합니다.")
+            sys.exit(1)
+        stats = FileBackend(args.input, args.output, realtime=args.realtime).run(processor)
+        print(f"저장: {args.output}")
+    else:
+        device = int(args.device) if args.device and args.device.isdigit() else args.device
+        backend = SoundDeviceBackend(args.input, device=device)
+        stop_event = threading.Event()
+        threading.Thread(target=read_config_updates, args=(processor, stop_event), daemon=True).start()
+        try:
+            stats = backend.run(processor, stop_event)
+        except KeyboardInterrupt:
+            stats = processor.stats
+
+    print(f"\n[Realtime] {stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
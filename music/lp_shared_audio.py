@@ -0,0 +1,212 @@
+"""
+LP Shared Audio
+프로세스 사이에 디코딩된 오디오 배열을 pickle 없이 넘기는 공유 메모리 전송 모듈
+
+부모(GUI/배치 디스패처)가 공유 메모리 블록을 만들고 (이름, shape, dtype) 핸들만 워커에 넘기면,
+워커는 같은 메모리를 numpy 배열로 붙여(attach) 읽고 쓴다. 어느 방향으로도 배열 복사가 없다.
+
+사용처:
+- lp_batch 병렬 처리: 부모가 load_shared로 원본을 공유 블록에 디코딩하고, 워커는 process_shared_file로
+  붙어서 렌더링/저장만 한다.
+- mp3_lp_gui 미리 듣기: render_in_worker로 발췌 구간을 워커에서 렌더링하고 결과 블록을 바로 읽는다.
+
+수명 규칙:
+- 블록을 만든 쪽(owner)만 unlink한다. 워커는 close만 한다.
+- 워커는 리소스 트래커에 등록하지 않고 붙는다. (Python 3.12 이하는 attach도 트래커에 등록해서,
+  워커가 끝날 때 부모가 아직 쓰는 블록을 지우거나 누수 경고를 내는 문제가 있음)
+- 부모가 비정상 종료해도 부모의 리소스 트래커가 남은 블록을 정리한다.
+- release 전에 .array로 얻은 뷰를 버려야 매핑이 바로 해제된다. (남아 있으면 GC 때 해제)
+"""
+
+import sys
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+import soundfile as sf
+
+
+# ==================== 공유 블록 ====================
+def _attach_untracked(name):
+    """리소스 트래커에 등록하지 않고 기존 블록에 붙기"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    # 3.12 이하: attach 중에만 register를 건너뜀 (워커 프로세스는 단일 스레드로 호출)
+    original_register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = original_register
+
+
+class SharedAudio:
+    """
+    공유 메모리에 올린 numpy 오디오 배열 (샘플 수, 채널 수)
+
+    with 블록을 벗어나면 release()가 호출된다. (owner면 unlink까지)
+    """
+
+    def __init__(self, shm, shape, dtype, owner):
+        self._shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+
+    @classmethod
+    def create(cls, shape, dtype=np.float32):
+        """새 블록 생성 (호출한 프로세스가 owner)"""
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        # 크기 0 블록은 만들 수 없으므로 최소 1바이트
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        return cls(shm, shape, dtype, owner=True)
+
+    @classmethod
+    def from_array(cls, array):
+        """배열을 새 블록에 한 번 복사해 올림"""
+        array = np.ascontiguousarray(array)
+        shared = cls.create(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, handle):
+        """핸들로 기존 블록에 붙기 (owner 아님, release 시 close만)"""
+        name, shape, dtype = handle
+        return cls(_attach_untracked(name), shape, dtype, owner=False)
+
+    @property
+    def handle(self):
+        """다른 프로세스에 넘길 (이름, shape, dtype) 튜플 (pickle 크기 수십 바이트)"""
+        return self._shm.name, self.shape, self.dtype.str
+
+    @property
+    def array(self):
+        """공유 메모리를 그대로 가리키는 numpy 뷰 (복사 없음)"""
+        if self._shm is None:
+            raise ValueError("이미 해제된 공유 오디오입니다")
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    def truncate(self, frames):
+        """앞쪽 frames 샘플만 쓰도록 shape 축소 (블록 크기는 그대로)"""
+        if frames > self.shape[0]:
+            raise ValueError(f"블록보다 긴 길이입니다: {frames} > {self.shape[0]}")
+        self.shape = (frames,) + self.shape[1:]
+
+    def release(self):
+        """close (owner면 unlink까지), 두 번 호출해도 안전"""
+        if self._shm is None:
+            return
+        shm, self._shm = self._shm, None
+        try:
+            shm.close()
+        except BufferError:
+            # 예외 traceback 등이 아직 뷰를 잡고 있으면 매핑 해제는 GC에 맡기고 원래 예외를 가리지 않음
+            pass
+        if self.owner:
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+def load_shared(file_path):
+    """
+    부모 프로세스에서 호출: 오디오 파일을 공유 블록에 디코딩
+
+    soundfile이 읽을 수 있으면 공유 메모리에 바로 읽어 넣고(중간 사본 없음),
+    아니면 load_audio_any(pydub/ffmpeg)로 읽은 배열을 한 번 복사해 올린다.
+
+    Returns:
+        tuple: (SharedAudio (호출자가 release), 샘플레이트)
+    """
+    try:
+        source = sf.SoundFile(file_path)
+    except Exception:
+        from audio_lp_processor import load_audio_any
+        audio_data, sample_rate = load_audio_any(file_path)
+        return SharedAudio.from_array(audio_data), sample_rate
+
+    with source:
+        shared = SharedAudio.create((source.frames, source.channels), np.float32)
+        try:
+            frames = len(source.read(out=shared.array, dtype="float32", always_2d=True))
+            shared.truncate(frames)
+        except BaseException:
+            shared.release()
+            raise
+        return shared, source.samplerate
+
+
+# ==================== 워커 렌더링 ====================
+def process_shared_file(source_handle, source_rate, input_path, output_dir, config, output_format,
+                        seed=0, thumbnail_dir=None):
+    """
+    워커 프로세스에서 실행: 부모가 디코딩해 둔 원본 블록으로 process_audio_file과 같은 처리
+
+    Returns:
+        str: 출력 파일 경로
+    """
+    from audio_lp_processor import process_loaded_audio
+
+    with SharedAudio.attach(source_handle) as source:
+        return process_loaded_audio(
+            input_path, source.array, source_rate, output_dir, config, output_format, seed, thumbnail_dir
+        )
+
+
+def render_into(source_handle, output_handle, sample_rate, config, render_seed, processing_rate):
+    """
+    워커 프로세스에서 실행: 원본 블록을 읽어 LP 효과를 적용하고 출력 블록에 기록
+
+    Returns:
+        int: 출력 블록에 기록한 샘플 수
+    """
+    from audio_lp_processor import render_lp_audio
+
+    with SharedAudio.attach(source_handle) as source, SharedAudio.attach(output_handle) as output:
+        processed = render_lp_audio(
+            source.array,
+            sample_rate,
+            config,
+            rng=np.random.default_rng(render_seed),
+            processing_rate=processing_rate
+        )
+        frames = min(len(processed), output.shape[0])
+        output.array[:frames] = processed[:frames]
+        del processed
+    return frames
+
+
+def render_in_worker(executor, audio_data, sample_rate, config, output_format, render_seed):
+    """
+    부모 프로세스에서 호출: 공유 블록으로 워커(executor)에 렌더링을 맡김
+
+    출력 블록 크기는 리샘플 계수로 미리 계산해 부모가 만들어 두므로,
+    두 블록 모두 부모가 owner이고 워커는 붙어서 읽고 쓰기만 한다.
+
+    Returns:
+        tuple: (SharedAudio 출력 블록(호출자가 release), 처리 샘플레이트)
+    """
+    from audio_lp_processor import plan_processing_rate, resample_factors
+    from lp_presets import EffectConfig
+
+    config = EffectConfig.coerce(config)
+    processing_rate = plan_processing_rate(sample_rate, output_format, config)
+    up, down = resample_factors(sample_rate, processing_rate, config.speed)
+    frames = -(-len(audio_data) * up // down)
+
+    output = SharedAudio.create((frames,) + np.shape(audio_data)[1:], np.float32)
+    try:
+        with SharedAudio.from_array(np.asarray(audio_data, dtype=np.float32)) as source:
+            written = executor.submit(
+                render_into, source.handle, output.handle, sample_rate, config, render_seed, processing_rate
+            ).result()
+        output.truncate(written)
+    except BaseException:
+        output.release()
+        raise
+    return output, processing_rate
@@ -0,0 +1,206 @@
+"""
+LP Thumbnails
+처리 전/후 파형 + 스펙트로그램 썸네일(PNG)을 만들고 디스크에 캐시하는 모듈
+
+처리 중 이미 메모리에 있는 오디오로 바로 그리므로 다시 디코딩하지 않는다.
+- 파형: 열(column)마다 최소/최대값만 남긴 엔벨로프
+- 스펙트로그램: 이미지 폭만큼의 프레임만 뽑아 계산한 STFT (로그 주파수 축)
+
+PNG 파일 이름은 내용 해시(처리 전: 원본 SHA-256, 처리 후: 렌더링 시드 + 출력 레이트)이고,
+원본 경로별 항목 파일(<경로 해시>.json)에 크기/mtime과 PNG 이름을 기록해
+GUI가 오디오를 열지 않고 바로 찾을 수 있게 한다. (항목 파일이 원본마다 따로라 병렬 처리에도 안전)
+"""
+
+import os
+import json
+import zlib
+import struct
+import hashlib
+
+import numpy as np
+
+
+# ==================== 상수 정의 ====================
+THUMBNAIL_DIRNAME = ".lp_thumbnails"
+
+THUMBNAIL_WIDTH = 480
+WAVEFORM_HEIGHT = 64
+SPECTROGRAM_HEIGHT = 96
+
+STFT_FRAME_SIZE = 1024
+SPECTROGRAM_MIN_HZ = 30.0
+SPECTROGRAM_FLOOR_DB = -90.0
+
+BACKGROUND_COLOR = (24, 24, 32)
+WAVEFORM_COLOR = (96, 200, 255)
+CENTER_LINE_COLOR = (64, 64, 80)
+
+# 스펙트로그램 색상표 (0 = 바닥 dB, 1 = 최대)
+COLORMAP_STOPS = np.array([0.0, 0.35, 0.7, 1.0])
+COLORMAP_COLORS = np.array([
+    [0, 0, 4],
+    [120, 28, 109],
+    [237, 105, 37],
+    [252, 255, 164],
+], dtype=np.float64)
+
+
+# ==================== 그리기 ====================
+def to_mono(audio_data):
+    audio_data = np.asarray(audio_data, dtype=np.float32)
+    return audio_data.mean(axis=1) if audio_data.ndim == 2 else audio_data
+
+
+def waveform_envelope(mono, width=THUMBNAIL_WIDTH):
+    """
+    열마다 (최소, 최대) 엔벨로프
+
+    Returns:
+        tuple: (mins, maxs) 길이 width 배열
+    """
+    if mono.size == 0:
+        return np.zeros(width, dtype=np.float32), np.zeros(width, dtype=np.float32)
+
+    # 열 경계로 나눠 reduceat 한 번으로 최소/최대 계산
+    edges = np.linspace(0, mono.size, width + 1).astype(np.int64)
+    starts = np.minimum(edges[:-1], mono.size - 1)
+    return np.minimum.reduceat(mono, starts), np.maximum.reduceat(mono, starts)
+
+
+def draw_waveform(mono, width=THUMBNAIL_WIDTH, height=WAVEFORM_HEIGHT):
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = BACKGROUND_COLOR
+    image[height // 2, :] = CENTER_LINE_COLOR
+
+    mins, maxs = waveform_envelope(mono, width)
+    # 진폭 +1 → 맨 위 행, -1 → 맨 아래 행
+    top = np.clip(((1 - np.clip(maxs, -1, 1)) / 2 * (height - 1)).round().astype(int), 0, height - 1)
+    bottom = np.clip(((1 - np.clip(mins, -1, 1)) / 2 * (height - 1)).round().astype(int), 0, height - 1)
+    rows = np.arange(height)[:, None]
+    image[(rows >= top) & (rows <= bottom)] = WAVEFORM_COLOR
+    return image
+
+
+def spectrogram_levels(mono, sample_rate, width=THUMBNAIL_WIDTH, height=SPECTROGRAM_HEIGHT):
+    """
+    이미지 폭만큼의 프레임만 계산한 STFT를 로그 주파수 height행으로 축소
+
+    Returns:
+        numpy.ndarray: (height, width) 0~1 레벨 (위쪽이 고주파)
+    """
+    if mono.size < STFT_FRAME_SIZE:
+        mono = np.pad(mono, (0, STFT_FRAME_SIZE - mono.size))
+
+    starts = np.linspace(0, mono.size - STFT_FRAME_SIZE, width).astype(np.int64)
+    frames = mono[starts[:, None] + np.arange(STFT_FRAME_SIZE)] * np.hanning(STFT_FRAME_SIZE).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+
+    # 로그 간격 주파수 경계마다 빈을 묶어 최대값 사용 (좁은 저역 구간에 빈이 없으면 가장 가까운 빈)
+    freqs = np.fft.rfftfreq(STFT_FRAME_SIZE, 1 / sample_rate)
+    edges = np.geomspace(SPECTROGRAM_MIN_HZ, sample_rate / 2, height + 1)
+    bins = np.searchsorted(freqs, edges)
+    bins = np.clip(bins, 1, freqs.size - 1)
+    ends = np.maximum(bins[1:], bins[:-1] + 1)
+    bands = np.stack([power[:, start:end].max(axis=1) for start, end in zip(bins[:-1], ends)], axis=0)
+
+    db = 10 * np.log10(bands + 1e-20)
+    db -= db.max()
+    levels = np.clip(1 - db / SPECTROGRAM_FLOOR_DB, 0, 1)
+    return levels[::-1]
+
+
+def apply_colormap(levels):
+    channels = [np.interp(levels, COLORMAP_STOPS, COLORMAP_COLORS[:, c]) for c in range(3)]
+    return np.stack(channels, axis=-1).round().astype(np.uint8)
+
+
+def render_thumbnail(audio_data, sample_rate, width=THUMBNAIL_WIDTH):
+    """
+    파형(위) + 스펙트로그램(아래) RGB 이미지
+
+    Returns:
+        numpy.ndarray: (높이, width, 3) uint8
+    """
+    mono = to_mono(audio_data)
+    waveform = draw_waveform(mono, width)
+    spectrogram = apply_colormap(spectrogram_levels(mono, sample_rate, width))
+    return np.concatenate([waveform, spectrogram], axis=0)
+
+
+def encode_png(image):
+    """RGB uint8 배열 → PNG 바이트 (zlib만 사용, Pillow 불필요)"""
+    height, width, _ = image.shape
+    # 행마다 필터 타입 0(None) 바이트를 앞에 붙임
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), image.reshape(height, -1)], axis=1)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)) + chunk(b"IEND", b""))
+
+
+# ==================== 캐시 ====================
+def _write_atomic(file_path, data):
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, file_path)
+
+
+def entry_path(thumbnail_dir, source_path):
+    key = hashlib.sha1(os.path.abspath(source_path).encode("utf-8")).hexdigest()
+    return os.path.join(thumbnail_dir, f"{key}.json")
+
+
+def store_thumbnail(thumbnail_dir, key, audio_data, sample_rate):
+    """
+    key.png가 없을 때만 그려서 저장
+
+    Returns:
+        str: PNG 파일 이름
+    """
+    filename = f"{key}.png"
+    file_path = os.path.join(thumbnail_dir, filename)
+    if not os.path.exists(file_path):
+        os.makedirs(thumbnail_dir, exist_ok=True)
+        _write_atomic(file_path, encode_png(render_thumbnail(audio_data, sample_rate)))
+    return filename
+
+
+def record_thumbnails(thumbnail_dir, source_path, before, after, output_path):
+    """원본 경로별 항목 파일에 처리 전/후 PNG 이름 기록"""
+    stat = os.stat(source_path)
+    entry = {
+        "source": os.path.abspath(source_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "before": before,
+        "after": after,
+        "output": os.path.abspath(output_path)
+    }
+    os.makedirs(thumbnail_dir, exist_ok=True)
+    _write_atomic(entry_path(thumbnail_dir, source_path), json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+
+def lookup_thumbnails(thumbnail_dir, source_path):
+    """
+    캐시된 썸네일 조회 (원본 크기/mtime이 바뀌었거나 PNG가 없으면 None)
+
+    Returns:
+        tuple 또는 None: (처리 전 PNG 경로, 처리 후 PNG 경로)
+    """
+    try:
+        with open(entry_path(thumbnail_dir, source_path), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        stat = os.stat(source_path)
+    except (OSError, ValueError):
+        return None
+    if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+
+    paths = tuple(os.path.join(thumbnail_dir, entry[name]) for name in ("before", "after"))
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    return paths
@@ -1,108 +1,29 @@
 import os
 import sys
+import time
 import threading
 import tkinter as tk
 from tkinter import filedialog
-import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 import soundfile as sf
-from scipy.signal import resample_poly
-from pedalboard import Pedalboard, Chorus, Distortion, LowpassFilter, Compressor, Gain
-from mutagen.flac import FLAC
-from mutagen.id3 import ID3, TIT2
-from mutagen.mp4 import MP4
-from mutagen.wave import WAVE
-from mutagen import MutagenError, File as MutagenFile
-from pydub import AudioSegment
 from nicegui import ui, app, run
+from audio_lp_processor import collect_audio_files, process_audio_file, load_audio_any, write_wav_24bit
+from lp_presets import EffectConfig, PresetStore
+import lp_shared_audio
+import lp_thumbnails
 
 # ==================== 상수 및 설정 데이터 ====================
-SUPPORTED_INPUT_FORMATS = {".wav", ".flac", ".mp3", ".m4a", ".aac", ".ogg"}
-
-# 프리셋 데이터
-PRESETS = {
-    "Piano/Modern": {"speed": 0.98, "cutoff": 14000, "sat": 4, "wf_rate": 0.6, "wf_depth": 0.015, "crackle_amt": 0, "crackle_cps": 0},
-    "Hardbop/Brass": {"speed": 0.97, "cutoff": 12000, "sat": 6, "wf_rate": 0.7, "wf_depth": 0.02, "crackle_amt": 0.0012, "crackle_cps": 0.8},
-    "Vocal Jazz": {"speed": 0.99, "cutoff": 11000, "sat": 6, "wf_rate": 0, "wf_depth": 0, "crackle_amt": 0.0018, "crackle_cps": 1.2},
-    "Fusion/Electric": {"speed": 0.96, "cutoff": 10000, "sat": 9, "wf_rate": 0.9, "wf_depth": 0.03, "crackle_amt": 0, "crackle_cps": 0},
-}
-
-# 기본 설정값
-current_config = {
-    "speed": 1.0, "cutoff": 20000, "sat": 0, 
-    "wf_rate": 0, "wf_depth": 0, 
-    "crackle_amt": 0, "crackle_cps": 0
-}
-
-# ==================== 핵심 로직 (기존 코드 유지) ====================
-# (기존 load_audio_any, write_*, metadata 관련 함수들은 로직이 동일하므로 그대로 사용합니다.)
-# 코드를 간결하게 하기 위해 핵심 처리 함수만 이곳에 포함하고, 
-# 실제 사용 시에는 원본 파일의 헬퍼 함수들을 그대로 가져와야 합니다.
-# 이 예제에서는 구조적 완결성을 위해 핵심 함수들을 다시 정의합니다.
-
-def load_audio_any(file_path):
-    try:
-        audio_data, sample_rate = sf.read(file_path, always_2d=True)
-        return audio_data.astype(np.float32), sample_rate
-    except Exception:
-        segment = AudioSegment.from_file(file_path)
-        sample_rate = segment.frame_rate
-        channels = segment.channels
-        audio_array = np.array(segment.get_array_of_samples()).astype(np.float32)
-        if channels > 1: audio_array = audio_array.reshape((-1, channels))
-        else: audio_array = audio_array.reshape((-1, 1))
-        max_value = float(2 ** (8 * segment.sample_width - 1))
-        return (audio_array / max_value).astype(np.float32), sample_rate
-
-def build_effect_board(rate_hz, depth, cutoff_hz, drive_db):
-    effect_chain = []
-    if rate_hz > 0 and depth > 0:
-        effect_chain.append(Chorus(rate_hz=rate_hz, depth=depth, centre_delay_ms=7.0))
-    if drive_db > 0:
-        effect_chain.append(Distortion(drive_db=drive_db))
-    try:
-        lowpass = LowpassFilter(cutoff_frequency_hz=cutoff_hz)
-    except TypeError:
-        lowpass = LowpassFilter(cutoff_hz=cutoff_hz)
-    effect_chain.extend([lowpass, Compressor(threshold_db=-18, ratio=2.0, attack_ms=15, release_ms=120), Gain(gain_db=-1.5)])
-    return Pedalboard(effect_chain)
-
-def add_crackle_noise(audio_signal, sample_rate, amount=0.0, crackles_per_second=0.0):
-    if amount <= 0 or crackles_per_second <= 0: return audio_signal
-    num_samples, num_channels = audio_signal.shape
-    output = audio_signal.copy()
-    num_crackles = int(crackles_per_second * num_samples / sample_rate)
-    for _ in range(num_crackles):
-        position = np.random.randint(0, max(1, num_samples - 64))
-        window = np.hanning(64).astype(np.float32) * (np.random.rand() * 0.6 + 0.4)
-        output[position:position + 64, :] += (amount * window)[:, None]
-    return np.clip(output, -1.0, 1.0)
-
-# 저장 및 메타데이터 복사 함수는 원본 코드의 것을 사용한다고 가정하고 간소화하여 작성합니다.
-# 실제 실행 시에는 원본 파일의 write_* 함수들과 copy_metadata 함수를 모두 포함시켜야 합니다.
-def save_processed_file(file_path, processed, sample_rate, output_format, output_dir):
-    os.makedirs(output_dir, exist_ok=True)
-    base_name = os.path.splitext(os.path.basename(file_path))[0]
-    output_filename = f"LP_{base_name}"
-    
-    # 원본 코드의 저장 로직 매핑
-    out_path = os.path.join(output_dir, f"{output_filename}.{output_format if output_format != 'cd' else 'wav'}")
-    
-    # 포맷별 저장 (약식 구현 - 원본 함수의 전체 로직 필요)
-    subtype = "PCM_16" if output_format == "cd" else "PCM_24"
-    if output_format in ["flac", "wav", "cd"]:
-        sf.write(out_path, processed, sample_rate, subtype=subtype)
-    elif output_format == "mp3":
-        # MP3 저장은 pydub 필요 (원본 코드 참조)
-        audio_int16 = (processed * 32767.0).astype(np.int16)
-        seg = AudioSegment(audio_int16.tobytes(), frame_rate=sample_rate, sample_width=2, channels=processed.shape[1])
-        seg.export(out_path, format="mp3", bitrate="320k")
-    elif output_format == "m4a":
-        # M4A 저장 (원본 코드 참조)
-        audio_int16 = (processed * 32767.0).astype(np.int16)
-        seg = AudioSegment(audio_int16.tobytes(), frame_rate=sample_rate, sample_width=2, channels=processed.shape[1])
-        seg.export(out_path, format="ipod", parameters=["-c:a", "alac"])
-
-    return out_path
+# 프리셋 데이터 (CLI와 같은 lp_presets.toml을 시작 시 한 번 로드)
+preset_store = PresetStore.load()
+
+# 미리 듣기: 앞부분 발췌 길이(초)와 결과 저장 폴더 (출력 폴더 안)
+PREVIEW_SECONDS = 20
+PREVIEW_DIRNAME = ".lp_preview"
+
+# 핵심 처리 로직(로드, 이펙트, 저장, 메타데이터 복사)은 audio_lp_processor의 함수를 그대로 사용합니다.
+
+# 미리 듣기 전용 워커 프로세스 (처음 사용할 때 생성, 앱 종료 시 정리)
+preview_executor = None
 
 # ==================== NiceGUI UI 로직 ====================
 
@@ -116,19 +37,164 @@ def select_folder():
     if folder_path:
         folder_input.value = folder_path
         status_log.push(f"폴더 선택됨: {folder_path}")
+        refresh_preview_files()
+
+def thumbnail_dir_for(source_folder):
+    """폴더별 썸네일 캐시 위치 (출력 폴더 안)"""
+    return os.path.join(source_folder, "LP_out", lp_thumbnails.THUMBNAIL_DIRNAME)
+
+def add_thumbnail_row(file_path, paths):
+    """파일 목록에 처리 전/후 썸네일 행 추가 (이미지는 펼칠 때 처음 생성)"""
+    before_path, after_path = paths
+
+    def show_images(e):
+        if e.value and not row.default_slot.children:
+            with row:
+                with ui.row().classes('w-full no-wrap gap-2'):
+                    with ui.column().classes('gap-0'):
+                        ui.label('Before').classes('text-xs text-gray-500')
+                        ui.image(before_path).classes('w-96')
+                    with ui.column().classes('gap-0'):
+                        ui.label('After').classes('text-xs text-gray-500')
+                        ui.image(after_path).classes('w-96')
+
+    with thumbnail_list:
+        row = ui.expansion(os.path.basename(file_path), on_value_change=show_images).classes('w-full')
+
+def load_cached_thumbnails():
+    """처리한 적 있는 파일의 썸네일을 캐시에서 바로 불러옵니다 (오디오 디코딩 없음)."""
+    source_folder = folder_input.value
+    if not source_folder or not os.path.exists(source_folder):
+        ui.notify('유효한 폴더를 선택해주세요.', type='warning')
+        return
+
+    thumbnail_dir = thumbnail_dir_for(source_folder)
+    thumbnail_list.clear()
+    found = 0
+    for file_path in collect_audio_files(source_folder):
+        paths = lp_thumbnails.lookup_thumbnails(thumbnail_dir, file_path)
+        if paths:
+            add_thumbnail_row(file_path, paths)
+            found += 1
+    status_log.push(f"썸네일 {found}개 불러옴")
+
+def refresh_preview_files():
+    """미리 듣기 파일 목록을 현재 폴더 기준으로 갱신합니다."""
+    source_folder = folder_input.value
+    files = collect_audio_files(source_folder) if source_folder and os.path.exists(source_folder) else []
+    preview_select.options = {path: os.path.relpath(path, source_folder) for path in files}
+    preview_select.value = files[0] if files else None
+    preview_select.update()
+
+def get_preview_executor():
+    global preview_executor
+    if preview_executor is None:
+        preview_executor = ProcessPoolExecutor(max_workers=1)
+    return preview_executor
+
+def shutdown_preview_executor():
+    if preview_executor is not None:
+        preview_executor.shutdown(cancel_futures=True)
+
+def load_excerpt(file_path, seconds=PREVIEW_SECONDS):
+    """앞부분 seconds초만 디코딩 (soundfile이 못 읽는 포맷은 전체를 읽어서 자름)"""
+    try:
+        with sf.SoundFile(file_path) as source:
+            frames = min(source.frames, int(seconds * source.samplerate))
+            return source.read(frames, dtype="float32", always_2d=True), source.samplerate
+    except Exception:
+        audio_data, sample_rate = load_audio_any(file_path)
+        return audio_data[:int(seconds * sample_rate)], sample_rate
+
+def render_preview(file_path, config, output_format, preview_dir):
+    """
+    발췌 구간을 미리 듣기 워커에서 렌더링해 WAV와 처리 전/후 썸네일로 저장합니다.
+    원본/결과 오디오는 공유 메모리로 오가므로 pickle 복사가 없습니다. (io_bound 스레드에서 실행)
+    """
+    excerpt, sample_rate = load_excerpt(file_path)
+    output, processing_rate = lp_shared_audio.render_in_worker(
+        get_preview_executor(), excerpt, sample_rate, config, output_format, 0
+    )
+
+    # 브라우저 캐시를 피하려고 매번 새 이름으로 저장하고 이전 미리 듣기 파일은 지움
+    os.makedirs(preview_dir, exist_ok=True)
+    for name in os.listdir(preview_dir):
+        os.remove(os.path.join(preview_dir, name))
+    stamp = time.time_ns()
+    paths = tuple(os.path.join(preview_dir, f"{kind}_{stamp}.{ext}")
+                  for kind, ext in (("preview", "wav"), ("before", "png"), ("after", "png")))
+
+    with output:
+        rendered = output.array
+        write_wav_24bit(paths[0], rendered, processing_rate)
+        after_png = lp_thumbnails.encode_png(lp_thumbnails.render_thumbnail(rendered, processing_rate))
+        del rendered
+    before_png = lp_thumbnails.encode_png(lp_thumbnails.render_thumbnail(excerpt, sample_rate))
+    for path, data in ((paths[1], before_png), (paths[2], after_png)):
+        with open(path, "wb") as f:
+            f.write(data)
+    return paths
+
+async def run_preview():
+    """선택한 파일의 앞부분에 현재 설정을 적용해 바로 들어봅니다."""
+    source_folder = folder_input.value
+    if not preview_select.value:
+        refresh_preview_files()
+    file_path = preview_select.value
+    if not file_path:
+        ui.notify('미리 들을 파일이 없습니다.', type='warning')
+        return
+
+    config = preset_store.resolve_for_file(file_path, current_config(), source_folder)
+    preview_dir = os.path.join(source_folder, "LP_out", PREVIEW_DIRNAME)
+
+    preview_btn.disable()
+    try:
+        wav_path, before_path, after_path = await run.io_bound(
+            render_preview, file_path, config, format_select.value, preview_dir
+        )
+    except Exception as e:
+        status_log.push(f"[에러] 미리 듣기 {os.path.basename(file_path)}: {str(e)}")
+        return
+    finally:
+        preview_btn.enable()
+
+    preview_area.clear()
+    with preview_area:
+        ui.audio(wav_path).classes('w-full')
+        with ui.row().classes('w-full no-wrap gap-2'):
+            with ui.column().classes('gap-0'):
+                ui.label('Before').classes('text-xs text-gray-500')
+                ui.image(before_path).classes('w-80')
+            with ui.column().classes('gap-0'):
+                ui.label('After').classes('text-xs text-gray-500')
+                ui.image(after_path).classes('w-80')
+    status_log.push(f"미리 듣기: {os.path.basename(file_path)} (앞 {PREVIEW_SECONDS}초)")
+
+def current_config():
+    """현재 슬라이더 값으로 만든 효과 설정"""
+    return EffectConfig.from_dict({
+        "speed": speed_slider.value,
+        "cutoff": cutoff_slider.value,
+        "sat": sat_slider.value,
+        "wf_rate": wfr_slider.value,
+        "wf_depth": wfd_slider.value,
+        "crackle_amt": amt_slider.value,
+        "crackle_cps": cps_slider.value
+    })
 
 def update_sliders_from_preset(e):
     """프리셋 선택 시 슬라이더 값을 업데이트합니다."""
     preset_name = e.value
-    if preset_name in PRESETS:
-        vals = PRESETS[preset_name]
-        speed_slider.value = vals['speed']
-        cutoff_slider.value = vals['cutoff']
-        sat_slider.value = vals['sat']
-        wfr_slider.value = vals['wf_rate']
-        wfd_slider.value = vals['wf_depth']
-        amt_slider.value = vals['crackle_amt']
-        cps_slider.value = vals['crackle_cps']
+    if preset_name in preset_store.presets:
+        vals = preset_store.get(preset_name)
+        speed_slider.value = vals.speed
+        cutoff_slider.value = vals.cutoff
+        sat_slider.value = vals.sat
+        wfr_slider.value = vals.wf_rate
+        wfd_slider.value = vals.wf_depth
+        amt_slider.value = vals.crackle_amt
+        cps_slider.value = vals.crackle_cps
         status_log.push(f"프리셋 적용: {preset_name}")
 
 async def run_processing():
@@ -138,11 +204,7 @@ async def run_processing():
         ui.notify('유효한 폴더를 선택해주세요.', type='warning')
         return
 
-    target_files = []
-    for root, _, files in os.walk(source_folder):
-        for filename in files:
-            if os.path.splitext(filename)[1].lower() in SUPPORTED_INPUT_FORMATS:
-                target_files.append(os.path.join(root, filename))
+    target_files = collect_audio_files(source_folder)
 
     if not target_files:
         ui.notify('처리할 오디오 파일이 없습니다.', type='warning')
@@ -150,6 +212,8 @@ async def run_processing():
 
     output_dir = os.path.join(source_folder, "LP_out")
     output_fmt = format_select.value
+    thumbnail_dir = thumbnail_dir_for(source_folder)
+    thumbnail_list.clear()
     
     # UI 비활성화 및 진행바 표시
     process_btn.disable()
@@ -168,40 +232,16 @@ async def run_processing():
             filename = os.path.basename(file_path)
             status_log.push(f"처리 중 ({i+1}/{total}): {filename}")
             
-            # 현재 슬라이더 값 읽기
-            config = {
-                "speed": speed_slider.value,
-                "cutoff": cutoff_slider.value,
-                "sat": sat_slider.value,
-                "wf_rate": wfr_slider.value,
-                "wf_depth": wfd_slider.value,
-                "crackle_amt": amt_slider.value,
-                "crackle_cps": cps_slider.value
-            }
-
-            # 비동기 환경에서 무거운 작업을 실행하기 위해 run.io_bound 또는 run.cpu_bound 사용 권장
-            # 여기서는 UI 반응성을 위해 NiceGUI의 run.cpu_bound 활용
-            def process_single():
-                audio_data, sample_rate = load_audio_any(file_path)
-                
-                # Resample
-                processed = resample_poly(audio_data, int(config["speed"] * 100), 100, axis=0).astype(np.float32)
-                
-                # Effects
-                board = build_effect_board(config["wf_rate"], config["wf_depth"], config["cutoff"], config["sat"])
-                processed = board(processed, sample_rate)
-                
-                # Crackle
-                processed = add_crackle_noise(processed, sample_rate, config["crackle_amt"], config["crackle_cps"])
-                
-                # Save
-                return save_processed_file(file_path, processed, sample_rate, output_fmt, output_dir)
-
-            # 별도 스레드에서 실행하여 UI 멈춤 방지
-            await run.cpu_bound(process_single)
+            # 현재 슬라이더 값 읽기 (폴더별 .lpconfig 오버라이드 적용)
+            config = preset_store.resolve_for_file(file_path, current_config(), source_folder)
+
+            # 별도 프로세스에서 실행하여 UI 멈춤 방지 (로드/이펙트/저장/메타데이터 복사 포함)
+            # 썸네일은 처리 중 메모리에 있는 신호로 함께 생성
+            await run.cpu_bound(process_audio_file, file_path, output_dir, config, output_fmt, 0, thumbnail_dir)
             
-            # 메타데이터 복사는 여기서 생략되었으나 원본 함수 호출 필요
-            # copy_metadata(file_path, output_path, ...)
+            paths = lp_thumbnails.lookup_thumbnails(thumbnail_dir, file_path)
+            if paths:
+                add_thumbnail_row(file_path, paths)
             
             success_count += 1
             progress_bar.value = (i + 1) / total
@@ -242,7 +282,7 @@ with ui.column().classes('w-full max-w-3xl mx-auto p-4 gap-4'):
         
         # 프리셋 선택
         ui.select(
-            options=list(PRESETS.keys()), 
+            options=preset_store.names(), 
             label='프리셋 선택 (선택 시 아래 값이 자동 변경됨)',
             on_change=update_sliders_from_preset
         ).classes('w-full mb-4')
@@ -277,6 +317,14 @@ with ui.column().classes('w-full max-w-3xl mx-auto p-4 gap-4'):
                 ui.label('Crackle Rate (CPS)')
                 cps_slider = ui.slider(min=0, max=5, step=0.1, value=0).props('label-always')
 
+        # 미리 듣기 (현재 설정으로 앞부분만 렌더링)
+        ui.separator().classes('my-2')
+        with ui.row().classes('w-full items-center'):
+            preview_select = ui.select(options={}, label='미리 들을 파일').classes('flex-grow')
+            ui.button(icon='refresh', on_click=refresh_preview_files).props('flat round')
+            preview_btn = ui.button('미리 듣기', on_click=run_preview, icon='headphones').props('flat')
+        preview_area = ui.column().classes('w-full gap-2')
+
     # 3. 실행 및 로그
     with ui.card().classes('w-full'):
         process_btn = ui.button('변환 시작', on_click=run_processing, icon='play_arrow').classes('w-full h-12 text-lg')
@@ -291,4 +339,12 @@ with ui.column().classes('w-full max-w-3xl mx-auto p-4 gap-4'):
         ui.label('작업 로그').classes('text-sm text-gray-500')
         status_log = ui.log().classes('w-full h-40 bg-gray-100 p-2 rounded')
 
+    # 4. 처리 전/후 미리보기 (파형 + 스펙트로그램)
+    with ui.card().classes('w-full'):
+        with ui.row().classes('w-full items-center'):
+            ui.label('4. 처리 전/후 미리보기').classes('text-lg font-bold flex-grow')
+            ui.button('캐시 불러오기', on_click=load_cached_thumbnails, icon='image').props('flat')
+        thumbnail_list = ui.column().classes('w-full gap-0')
+
+app.on_shutdown(shutdown_preview_executor)
 ui.run(title='LP Effect Processor', port=8080, reload=False)
\ No newline at end of file
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# 스크립트들이 같은 폴더의 모듈을 바로 import하므로 저장소 루트와 music 폴더를 경로에 추가
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "music"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
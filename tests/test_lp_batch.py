@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("pedalboard")
+pytest.importorskip("pydub")
+
+import lp_batch
+from audio_lp_processor import render_settings_key
+from lp_presets import EffectConfig
+
+SOURCE_RATE = 96000
+
+
+@pytest.fixture
+def hires_tone(tmp_path):
+    path = tmp_path / "hires.wav"
+    t = np.arange(SOURCE_RATE) / SOURCE_RATE
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    sf.write(path, np.stack([tone, tone], axis=1), SOURCE_RATE, subtype="FLOAT")
+    return str(path)
+
+
+def test_streaming_keeps_in_memory_output_rate(tmp_path, hires_tone):
+    in_memory = lp_batch.process_audio_file(hires_tone, str(tmp_path / "memory"), {}, "flac")
+    streamed = lp_batch.process_audio_file_streaming(hires_tone, str(tmp_path / "stream"), {}, "flac")
+    assert sf.info(streamed).samplerate == sf.info(in_memory).samplerate == SOURCE_RATE
+
+
+def test_streaming_rejects_native_engine(tmp_path, hires_tone):
+    config = EffectConfig.from_dict({"engine": "native"})
+    with pytest.raises(ValueError, match="native"):
+        lp_batch.process_audio_file_streaming(hires_tone, str(tmp_path / "stream"), config, "flac")
+    assert not (tmp_path / "stream").exists()
+
+
+def test_streaming_render_has_its_own_settings_key(hires_tone):
+    config = EffectConfig()
+    assert render_settings_key(config, 0, streaming=True) != render_settings_key(config, 0)
+
+    streamed, = lp_batch.plan_jobs([(hires_tone, config)], "flac", memory_budget=1)
+    assert streamed.streaming
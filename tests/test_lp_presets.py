@@ -0,0 +1,52 @@
+import pytest
+
+from audio_lp_processor import render_settings_key
+from lp_presets import EffectConfig, PresetStore
+
+
+def test_saturation_options_need_native_engine():
+    with pytest.raises(ValueError, match="native"):
+        EffectConfig.from_dict({"sat_mode": "tube"})
+    with pytest.raises(ValueError, match="native"):
+        EffectConfig.from_dict({"sat_oversample": 2})
+
+    config = EffectConfig.from_dict({"engine": "native", "sat_mode": "tube", "sat_oversample": "2"})
+    assert (config.sat_mode, config.sat_oversample) == ("tube", 2)
+
+
+@pytest.mark.parametrize("data", [{"sat_mode": "valve"}, {"sat_oversample": 1.5}, {"sat_oversample": 16}])
+def test_invalid_saturation_options_are_rejected(data):
+    with pytest.raises(ValueError):
+        EffectConfig.from_dict(dict(data, engine="native"))
+
+
+def test_saturation_options_feed_settings_key():
+    native = EffectConfig.from_dict({"engine": "native", "sat": 12})
+    keys = {
+        render_settings_key(native),
+        render_settings_key(EffectConfig.from_dict({"sat_mode": "tube"}, base=native)),
+        render_settings_key(EffectConfig.from_dict({"sat_oversample": 2}, base=native)),
+    }
+    assert len(keys) == 3
+
+
+@pytest.mark.parametrize("content", ["cutoff = [9000, 10000]", "[cutoff]\nvalue = 9000", "colour = 1", "preset = 3"])
+def test_invalid_folder_override_names_file(tmp_path, content):
+    album = tmp_path / "album"
+    album.mkdir()
+    config_path = album / ".lpconfig"
+    config_path.write_text(content, encoding="utf-8")
+
+    store = PresetStore.load()
+    with pytest.raises(ValueError, match=".lpconfig"):
+        store.resolve(str(album), EffectConfig(), str(tmp_path))
+
+
+def test_folder_override_is_applied(tmp_path):
+    album = tmp_path / "album"
+    album.mkdir()
+    (album / ".lpconfig").write_text('preset = "Vocal Jazz"\ncutoff = 9000\n', encoding="utf-8")
+
+    store = PresetStore.load()
+    config = store.resolve(str(album), EffectConfig(), str(tmp_path))
+    assert config == EffectConfig.from_dict({"cutoff": 9000}, base=store.get("Vocal Jazz"))
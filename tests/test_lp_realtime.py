@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("pedalboard")
+
+from lp_presets import EffectConfig, PresetStore
+from lp_realtime import FileBackend, RealtimeProcessor
+
+SAMPLE_RATE = 48000
+BLOCK_SIZE = 512
+
+
+def write_test_tone(path, seconds=3.0, channels=2):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    sf.write(path, np.repeat(tone[:, None], channels, axis=1), SAMPLE_RATE, subtype="FLOAT")
+    return len(tone)
+
+
+@pytest.mark.parametrize("preset", PresetStore.load().names())
+def test_file_loopback_has_no_underruns(tmp_path, preset):
+    config = PresetStore.load().get(preset)
+    input_path = tmp_path / "in.wav"
+    output_path = tmp_path / "out.wav"
+    num_samples = write_test_tone(input_path)
+
+    processor = RealtimeProcessor(config, SAMPLE_RATE, 2, BLOCK_SIZE, seed=0)
+    stats = FileBackend(str(input_path), str(output_path)).run(processor)
+
+    assert stats.underruns == 0
+    assert stats.dropped_frames == 0
+    # 파일 백엔드는 varispeed를 적용하므로 오프라인 처리(resample_factors)처럼 길이가 speed배
+    assert abs(sf.info(str(output_path)).frames - num_samples * config.speed) <= 4
+
+
+@pytest.mark.parametrize("speed", [0.96, 1.0, 1.05])
+def test_live_input_ignores_speed(speed):
+    config = EffectConfig.from_dict({"speed": speed})
+    processor = RealtimeProcessor(config, SAMPLE_RATE, 2, BLOCK_SIZE, seed=0, varispeed=False)
+    block = np.zeros((BLOCK_SIZE, 2), dtype=np.float32)
+
+    # 장치 콜백처럼 입력이 정확히 1배속으로 한 블록씩 들어옴
+    for _ in range(1000):
+        output = processor.process(block)
+        assert output.shape == (BLOCK_SIZE, 2)
+        assert processor.valid_frames == BLOCK_SIZE
+
+    assert processor.stats.underruns == 0
+    assert processor.stats.dropped_frames == 0
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+pytest.importorskip("pedalboard")
+
+import audio_lp_processor as processor
+
+SOURCE_RATE = 96000
+
+
+def write_test_tone(path, seconds=1.0, sample_rate=SOURCE_RATE):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    sf.write(path, np.stack([tone, tone], axis=1), sample_rate, subtype="FLOAT")
+    return len(tone)
+
+
+@pytest.mark.parametrize("output_format, expected_rate", [("flac", SOURCE_RATE), ("wav", SOURCE_RATE), ("cd", 44100)])
+def test_lossless_output_keeps_delivered_rate(tmp_path, output_format, expected_rate):
+    input_path = tmp_path / "hires.wav"
+    num_samples = write_test_tone(input_path)
+
+    # 처리 레이트는 낮아져도 저장 레이트는 원본(무손실) 또는 고정 레이트
+    assert processor.plan_processing_rate(SOURCE_RATE, output_format, {}) < SOURCE_RATE
+    output_path = processor.process_audio_file(str(input_path), str(tmp_path / "out"), {}, output_format)
+
+    info = sf.info(output_path)
+    assert info.samplerate == expected_rate
+    assert abs(info.frames - num_samples * expected_rate / SOURCE_RATE) <= 4
+
+
+SOURCE_HASH = "ab" * 32
+CRACKLE_CONFIG = {"crackle_amt": 0.05, "crackle_cps": 20.0}
+
+
+def render(audio, config, seed):
+    render_seed = processor.derive_render_seed("unused", config, seed, source_hash=SOURCE_HASH)
+    return processor.render_lp_audio(audio, 48000, config, rng=np.random.default_rng(render_seed))
+
+
+def crackle(config, seed, num_samples=48000):
+    render_seed = processor.derive_render_seed("unused", config, seed, source_hash=SOURCE_HASH)
+    silence = np.zeros((num_samples, 2), dtype=np.float32)
+    return processor.add_crackle_noise(silence, 48000, 0.05, 20.0, rng=np.random.default_rng(render_seed))
+
+
+@pytest.mark.parametrize("engine", ["pedalboard", "native"])
+def test_render_is_bit_identical_for_same_inputs(engine):
+    t = np.arange(24000) / 48000
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    audio = np.stack([tone, tone], axis=1)
+    config = processor.EffectConfig.from_dict(dict(CRACKLE_CONFIG, engine=engine))
+
+    assert np.array_equal(render(audio, config, seed=7), render(audio, config, seed=7))
+    assert not np.array_equal(render(audio, config, seed=7), render(audio, config, seed=8))
+
+
+def test_crackle_depends_on_seed_and_config():
+    config = processor.EffectConfig.from_dict(CRACKLE_CONFIG)
+    other_config = processor.EffectConfig.from_dict(dict(CRACKLE_CONFIG, cutoff=config.cutoff - 1000))
+
+    assert np.array_equal(crackle(config, 0), crackle(config, 0))
+    assert not np.array_equal(crackle(config, 0), crackle(config, 1))
+    assert not np.array_equal(crackle(config, 0), crackle(other_config, 0))
+
+
+def test_output_file_is_reproducible(tmp_path):
+    input_path = tmp_path / "tone.wav"
+    write_test_tone(input_path, seconds=0.5)
+    outputs = [
+        processor.process_audio_file(str(input_path), str(tmp_path / name), CRACKLE_CONFIG, "wav", seed=3)
+        for name in ("first", "second")
+    ]
+    assert processor.file_sha256(outputs[0]) == processor.file_sha256(outputs[1])
+
+
+def test_native_saturation_options_reach_kernel():
+    t = np.arange(24000) / 48000
+    tone = (0.5 * np.sin(2 * np.pi * 3000 * t)).astype(np.float32)
+    audio = np.stack([tone, tone], axis=1)
+    tape = processor.EffectConfig.from_dict({"engine": "native", "sat": 18})
+
+    outputs = [
+        processor.render_lp_audio(audio, 48000, config)
+        for config in (
+            tape,
+            processor.EffectConfig.from_dict({"sat_mode": "tube"}, base=tape),
+            processor.EffectConfig.from_dict({"sat_oversample": 4}, base=tape),
+        )
+    ]
+    assert not np.array_equal(outputs[0], outputs[1])
+    assert not np.array_equal(outputs[0], outputs[2])
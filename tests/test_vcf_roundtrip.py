@@ -0,0 +1,126 @@
+import pytest
+
+vobject = pytest.importorskip("vobject")
+pytest.importorskip("pandas")
+
+import vcf_csv_converter2 as converter
+
+# 2.1 quoted-printable(UTF-8, 접힌 줄, =0D=0A 줄바꿈), 반복 TEL/ADR, X- 속성을 포함한 카드
+FIXTURE_CARDS = """\
+BEGIN:VCARD
+VERSION:2.1
+N;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:=ED=99=8D;=EA=B8=B8=EB=8F=99;;;
+FN;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:=ED=99=8D=EA=B8=B8=EB=8F=99
+TEL;CELL:010-1234-5678
+TEL;HOME;VOICE:02-555-1234
+NOTE;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:=EC=B2=AB=EC=A4=84=0D=0A=EB=91=98=EC=A7=B8=20=
+=EC=A4=84
+X-CUSTOM-FIELD:hello
+END:VCARD
+BEGIN:VCARD
+VERSION:3.0
+N:Smith;John;Q;Dr.;Jr.
+FN:Dr. John Q Smith Jr.
+ORG:ACME\\, Inc.;R&D
+TEL;TYPE=CELL,VOICE;PREF=1:+1 555 0100
+TEL;TYPE=WORK:+1 555 0199
+EMAIL;TYPE=INTERNET:john@example.com
+ADR;TYPE=HOME:;;1 Main St;Springfield;IL;62701;USA
+ADR;TYPE=WORK:;Suite 5;2 Side Rd\\, Bldg 3;Shelbyville;IL;62565;USA
+BDAY:1980-01-02
+X-ABLABEL:Friend
+X-SOCIALPROFILE;TYPE=twitter:https://x.example/john
+END:VCARD
+BEGIN:VCARD
+VERSION:3.0
+N:Kim;Minji;;;
+FN:Kim Minji
+NOTE:Line one\\nLine two\\, with comma
+END:VCARD
+"""
+
+# vobject는 2.1 quoted-printable의 소프트 줄바꿈('='로 끝나는 줄)을 읽지 못하므로 비교용으로 한 줄로 펼친 버전
+FIXTURE_CARDS_UNFOLDED = FIXTURE_CARDS.replace("=\n=EC", "=EC")
+
+
+@pytest.fixture
+def fixture_csv(tmp_path):
+    vcf_path = tmp_path / "cards.vcf"
+    vcf_path.write_text(FIXTURE_CARDS.replace("\n", "\r\n"), encoding="utf-8", newline="")
+    csv_path = tmp_path / "cards.csv"
+    converter.vcard_to_csv(str(vcf_path), str(csv_path))
+    return csv_path
+
+
+def read_rows(csv_path):
+    return [list(row) for row in converter.iter_csv_rows(str(csv_path))]
+
+
+def column(row, name):
+    return row[converter.COLUMN_INDEX[name]]
+
+
+def test_fixture_fields_are_parsed(fixture_csv):
+    qp, smith, kim = read_rows(fixture_csv)
+
+    assert column(qp, "Full Name") == "홍길동"
+    assert column(qp, "Memo") == "첫줄\n둘째 줄"
+    assert column(qp, "Phone").split("\n") == ["010-1234-5678", "02-555-1234"]
+    assert column(qp, "Phone Type").split("\n") == ["CELL", "HOME,VOICE"]
+    assert column(qp, "Other") == "X-CUSTOM-FIELD:hello"
+
+    assert column(smith, "Address Street").split("\n") == ["1 Main St", "2 Side Rd, Bldg 3"]
+    assert column(smith, "Address Type").split("\n") == ["HOME", "WORK"]
+    assert column(smith, "Other").split("\n") == [
+        "X-ABLABEL:Friend", "X-SOCIALPROFILE;TYPE=twitter:https://x.example/john"
+    ]
+    assert column(kim, "Memo") == "Line one\nLine two, with comma"
+
+
+def test_fast_parser_matches_vobject_parser(tmp_path):
+    vcf_path = tmp_path / "cards.vcf"
+    vcf_path.write_text(FIXTURE_CARDS_UNFOLDED, encoding="utf-8")
+
+    with open(vcf_path, encoding="utf-8") as vcf:
+        fast = list(converter.iter_contact_rows(vcf, parser="fast"))
+    with open(vcf_path, encoding="utf-8") as vcf:
+        reference = list(converter.iter_contact_rows(vcf, parser="vobject"))
+    assert fast == reference
+
+
+@pytest.mark.parametrize("serializer", ["fast", "vobject"])
+def test_csv_vcf_csv_roundtrip(tmp_path, fixture_csv, serializer):
+    rows = read_rows(fixture_csv)
+    vcf_path = tmp_path / "roundtrip.vcf"
+    csv_path = tmp_path / "roundtrip.csv"
+
+    converter.csv_to_vcard(str(fixture_csv), str(vcf_path), serializer=serializer)
+    converter.vcard_to_csv(str(vcf_path), str(csv_path))
+    assert read_rows(csv_path) == rows
+
+    # 빠른 직렬화 결과는 vobject로 읽어도 같은 행이어야 함
+    with open(vcf_path, encoding="utf-8") as vcf:
+        assert list(converter.iter_contact_rows(vcf, parser="vobject")) == rows
+
+
+def test_fast_serializer_matches_vobject_serializer(fixture_csv):
+    assert converter.verify_serializer(str(fixture_csv))
+    assert converter.verify_roundtrip(str(fixture_csv))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_bom_prefixed_vcf_keeps_first_card(tmp_path, workers):
+    vcf_path = tmp_path / "bom.vcf"
+    vcf_path.write_text("\ufeff" + FIXTURE_CARDS.replace("\n", "\r\n"), encoding="utf-8", newline="")
+    csv_path = tmp_path / "bom.csv"
+
+    converter.vcard_to_csv(str(vcf_path), str(csv_path), workers=workers)
+    rows = read_rows(csv_path)
+    assert len(rows) == 3
+    assert column(rows[0], "Full Name") == "홍길동"
+
+
+def test_bom_prefixed_vcf_in_merge_input(tmp_path):
+    vcf_path = tmp_path / "bom.vcf"
+    vcf_path.write_text("\ufeff" + FIXTURE_CARDS, encoding="utf-8")
+    assert len(list(converter.iter_any_rows(str(vcf_path)))) == 3
@@ -1,17 +1,269 @@
-print("깨진 텍스트를 입력하세요 (빈 줄에서 종료):")
-
-lines = []
-while True:
-    line = input()
-    if line == "":
-        break
-    lines.append(line)
-
-text = "\n".join(lines)
-
-try:
-    fixed = text.encode("latin1").decode("cp949")
-    print("\n복원 결과:\n")
-    print(fixed)
-except UnicodeError as e:
-    print("복원 실패:", e)
+import os
+import re
+import sys
+import codecs
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 깨진 한글(모지바케) 복원
+# cp949/UTF-8 한글 바이트를 latin1/cp1252로 잘못 읽어 저장한 텍스트를 원래 글자로 되돌린다.
+# 붙여넣기 모드(인자 없이 실행)와 폴더 일괄 복원 모드를 지원한다.
+
+# ==================== 상수 정의 ====================
+# (파일을 읽을 인코딩, 잘못 디코딩된 코덱, 원래 코덱) - 뒤 두 값이 None이면 재변환 없이 그대로 읽음
+# 점수가 같으면 앞쪽 후보를 선택하므로 "수리 불필요"를 맨 앞에 둔다.
+CANDIDATE_CHAINS = [
+    ("utf-8", None, None),
+    ("utf-8", "latin1", "cp949"),
+    ("utf-8", "cp1252", "cp949"),
+    ("utf-8", "latin1", "euc-kr"),
+    ("utf-8", "cp1252", "euc-kr"),
+    ("utf-8", "latin1", "utf-8"),
+    ("utf-8", "cp1252", "utf-8"),
+    ("cp949", None, None),
+]
+
+SAMPLE_BYTES = 1 << 16
+TEXT_EXTENSIONS = (".txt", ".csv", ".tsv", ".md", ".srt", ".smi", ".html", ".htm", ".xml", ".json", ".log", ".ini")
+OUTPUT_DIR_SUFFIX = "_fixed"
+
+HANGUL = re.compile(r"[\uac00-\ud7a3]")
+# latin1/cp1252로 잘못 읽은 흔적: Latin-1 보충 문자와 cp1252 전용 문장부호
+MOJIBAKE = re.compile(r"[\u0080-\u00ff\u0152\u0153\u0160\u0161\u0178\u017d\u017e\u0192\u02c6\u02dc\u2013-\u2026\u2030\u2039\u203a\u20ac\u2122]")
+
+# 점수 가중치: 한글 음절 +, 모지바케 흔적/대체 문자/복원 실패 줄 -
+HANGUL_WEIGHT = 2
+MOJIBAKE_PENALTY = 3
+REPLACEMENT_PENALTY = 10
+LINE_ERROR_PENALTY = 20
+
+
+def latin1_fallback(error):
+    # cp1252에 없는 0x81, 0x8D 등은 잘못 읽을 때 latin1처럼 같은 코드값 문자로 들어오므로 바이트로 되돌림
+    chars = error.object[error.start:error.end]
+    if all(ord(ch) < 256 for ch in chars):
+        return bytes(ord(ch) for ch in chars), error.end
+    raise error
+
+
+codecs.register_error("latin1_fallback", latin1_fallback)
+
+
+# ==================== 변환 체인 ====================
+def chain_label(chain):
+    source, wrong, right = chain
+    if wrong is None:
+        return source
+    return f"{source}: {wrong}→{right}"
+
+
+def repair_line(line, chain):
+    """
+    바이트 한 줄을 체인대로 복원 (실패하면 UnicodeError)
+    """
+    source, wrong, right = chain
+    text = line.decode(source)
+    if wrong is None:
+        return text
+    return text.encode(wrong, errors="latin1_fallback").decode(right)
+
+
+def fallback_line(line, chain):
+    # 복원에 실패한 줄은 바꾸지 않고 원문 그대로 (읽을 수 없는 바이트만 대체 문자로)
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode(chain[0], errors="replace")
+
+
+def score_chain(sample, chain):
+    """
+    샘플에 체인을 적용했을 때의 점수 (높을수록 올바른 한글에 가까움)
+    """
+    score = 0
+    for line in sample.splitlines():
+        try:
+            text = repair_line(line, chain)
+        except UnicodeError:
+            score -= LINE_ERROR_PENALTY
+            text = fallback_line(line, chain)
+        score += HANGUL_WEIGHT * len(HANGUL.findall(text))
+        score -= MOJIBAKE_PENALTY * len(MOJIBAKE.findall(text))
+        score -= REPLACEMENT_PENALTY * text.count("\ufffd")
+    return score
+
+
+def chain_is_clean(sample, chain):
+    # 모든 줄이 오류 없이 복원되고 깨진 흔적이 남지 않으면 True
+    for line in sample.splitlines():
+        try:
+            text = repair_line(line, chain)
+        except UnicodeError:
+            return False
+        if MOJIBAKE.search(text) or "\ufffd" in text:
+            return False
+    return True
+
+
+def is_utf8(sample):
+    # 샘플 끝에서 잘린 여러 바이트 문자는 허용
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_chain(sample, hint=None):
+    """
+    샘플 앞부분으로 가장 그럴듯한 변환 체인 탐지
+
+    hint(같은 폴더에서 먼저 탐지한 체인)가 이 샘플을 깨끗하게 복원하면 점수 계산 없이 그대로 쓴다.
+    UTF-8로 읽히는 샘플은 UTF-8 후보만, 아니면 레거시 인코딩 후보만 비교한다.
+    (UTF-8 바이트도 cp949로는 대개 읽히지만 엉뚱한 한글이 되므로)
+    """
+    if hint is not None and chain_is_clean(sample, hint):
+        return hint
+    utf8 = is_utf8(sample)
+    candidates = [chain for chain in CANDIDATE_CHAINS if (chain[0] == "utf-8") == utf8]
+    scores = [score_chain(sample, chain) for chain in candidates]
+    return candidates[scores.index(max(scores))]
+
+
+def read_sample(file_path):
+    # 앞부분만 읽고, 여러 바이트 문자가 잘리지 않도록 마지막 줄바꿈까지만 사용
+    with open(file_path, "rb") as f:
+        sample = f.read(SAMPLE_BYTES)
+    if len(sample) == SAMPLE_BYTES and b"\n" in sample:
+        sample = sample[:sample.rindex(b"\n") + 1]
+    return sample
+
+
+# ==================== 파일 복원 ====================
+def repair_file(file_path, output_path, hint=None):
+    """
+    파일 하나를 줄 단위 스트리밍으로 복원해 UTF-8로 저장
+
+    Returns:
+        dict: {"path", "chain", "lines", "failed", "written"}
+    """
+    chain = detect_chain(read_sample(file_path), hint)
+    result = {"path": str(file_path), "chain": chain, "lines": 0, "failed": 0, "written": False}
+    if chain == CANDIDATE_CHAINS[0]:
+        return result
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(file_path, "rb") as src, open(output_path, "w", encoding="utf-8", newline="") as dst:
+        for line in src:
+            result["lines"] += 1
+            try:
+                dst.write(repair_line(line, chain))
+            except UnicodeError:
+                result["failed"] += 1
+                dst.write(fallback_line(line, chain))
+
+    result["written"] = True
+    return result
+
+
+def collect_text_files(folder, extensions=TEXT_EXTENSIONS):
+    return sorted(path for path in Path(folder).rglob("*") if path.is_file() and path.suffix.lower() in extensions)
+
+
+def repair_folder(folder, output_dir=None, workers=None):
+    """
+    폴더 안의 텍스트 파일을 프로세스 풀로 일괄 복원
+
+    체인은 폴더마다 첫 파일에서 한 번 탐지해 캐시하고, 같은 폴더의 나머지 파일에는 힌트로 넘긴다.
+    결과는 output_dir(기본: <폴더>_fixed)에 같은 하위 구조로 저장한다.
+    """
+    folder = Path(folder)
+    output_dir = Path(output_dir) if output_dir else folder.with_name(folder.name + OUTPUT_DIR_SUFFIX)
+    files = collect_text_files(folder)
+    if not files:
+        print(f"텍스트 파일이 없습니다: {folder}")
+        return []
+
+    chain_cache = {}
+    for path in files:
+        if path.parent not in chain_cache:
+            chain_cache[path.parent] = detect_chain(read_sample(path))
+
+    results = []
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(repair_file, path, output_dir / path.relative_to(folder), chain_cache[path.parent]): path
+            for path in files
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                result = future.result()
+            except OSError as e:
+                print(f"[{done}/{len(files)}] 실패: {path} ({e})")
+                continue
+            results.append(result)
+            if result["written"]:
+                print(f"[{done}/{len(files)}] {path.relative_to(folder)}: {chain_label(result['chain'])}, "
+                      f"{result['lines']:,}줄 중 {result['failed']:,}줄 원문 유지")
+            else:
+                print(f"[{done}/{len(files)}] {path.relative_to(folder)}: 정상 (변경 없음)")
+
+    repaired = sum(result["written"] for result in results)
+    print(f"\n완료: {len(files)}개 중 {repaired}개 복원 → {output_dir}")
+    return results
+
+
+# ==================== 붙여넣기 모드 ====================
+def paste_mode():
+    print("깨진 텍스트를 입력하세요 (빈 줄에서 종료):")
+
+    lines = []
+    while True:
+        line = input()
+        if line == "":
+            break
+        lines.append(line)
+
+    data = "\n".join(lines).encode("utf-8")
+    chain = detect_chain(data)
+    if chain == CANDIDATE_CHAINS[0]:
+        print("\n복원할 필요가 없어 보입니다 (깨진 흔적 없음).")
+        return
+
+    fixed = []
+    failed = 0
+    for line in data.split(b"\n"):
+        try:
+            fixed.append(repair_line(line, chain))
+        except UnicodeError:
+            failed += 1
+            fixed.append(fallback_line(line, chain))
+
+    print(f"\n복원 결과 ({chain_label(chain)}, 원문 유지 {failed}줄):\n")
+    print("\n".join(fixed))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="깨진 한글(모지바케) 복원")
+    parser.add_argument("folder", nargs="?", help="일괄 복원할 폴더 (생략하면 붙여넣기 모드)")
+    parser.add_argument("-o", "--output", default=None, help=f"저장 폴더 (기본: <폴더>{OUTPUT_DIR_SUFFIX})")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.folder is None:
+        paste_mode()
+    elif not os.path.isdir(args.folder):
+        print(f"폴더를 찾을 수 없습니다: {args.folder}")
+        sys.exit(1)
+    else:
+        repair_folder(args.folder, args.output, args.workers)
+
+
+if __name__ == "__main__":
+    main()
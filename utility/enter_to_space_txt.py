@@ -1,24 +1,192 @@
 import re
+import os
+import sys
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # 작성 배경: txt파일의 잘못된 엔터를 손으로 고치기가 너무 힘들어서 자동화 방법 검토
 # 디지털 데이터의 cleansing으로 이해하면 된디
+#
+# 단일 개행 → 공백 (문단 개행은 유지)
+# 파일 전체를 메모리에 올리지 않고 청크 단위로 읽고 바로 쓰므로 파일 크기와 무관하게 메모리가 일정하다.
 
-# 1. 파일 경로 입력
-file_path = Path(input("Enter txt file path: ").strip())
+# ==================== 상수 정의 ====================
+CHUNK_CHARS = 1 << 20
+NEWLINE_SNIFF_BYTES = 1 << 16
+OUTPUT_SUFFIX = "_cleaned"
 
-# 2. 파일 읽기
-with file_path.open("r", encoding="utf-8") as f:
-    text = f.read()
+NEWLINE_RUN = re.compile(r"\n+")
 
-# 3. 단일 개행 → 공백 (문단 개행은 유지)
-text = re.sub(r'(?<!\n)\n(?!\n)', ' ', text)
+# 한자/가나/CJK 문장부호/전각 문자: 줄 사이에 공백 없이 이어 붙임
+CJK_NOSPACE = re.compile(r"[\u3000-\u303f\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff\uff00-\uffef]")
+HANGUL = re.compile(r"[\uac00-\ud7a3]")
 
-# 4. 출력 파일 경로 생성
-output_path = file_path.with_stem(file_path.stem + "_cleaned")
+# 줄 첫머리에 조사/어미가 단독으로 오면 앞 단어에 붙여 씀 (예: "사과\n를 먹었다" → "사과를 먹었다")
+# 관형사/부사로도 쓰이는 "이", "그", "다", "도" 등은 오판이 많아 제외
+HANGUL_PARTICLES = re.compile(
+    r"(?:으로|에서|에게|까지|부터|처럼|보다|입니다|습니다|은|는|을|를|의|에|와|과)(?![가-힣])"
+)
+# 조사 판정에 필요한 다음 줄 앞부분 길이 (가장 긴 조사 + 뒤 글자 1자)
+LOOKAHEAD = 4
 
-# 5. 파일 저장
-with output_path.open("w", encoding="utf-8") as f:
-    f.write(text)
 
-print(f"Saved cleaned file to: {output_path}")
+# ==================== 줄 이어붙이기 ====================
+class Reflower:
+    """
+    청크 단위 문단 재배치기
+
+    청크 경계에 걸친 개행 묶음과 다음 줄 앞부분(조사 판정용)은 다음 청크까지 보류하고,
+    직전에 출력한 글자를 기억해 경계와 상관없이 한 번에 처리한 것과 같은 결과를 낸다.
+    """
+
+    def __init__(self, hangul_join=True):
+        self.hangul_join = hangul_join
+        self.carry = ""
+        self.last_char = ""
+
+    def separator(self, prev, count, following):
+        # 개행 count개를 대신할 문자열 결정
+        if count >= 2 or not following or not prev:
+            return "\n" * count
+        head = following[0]
+        if prev.isspace() or head.isspace():
+            return ""
+        if CJK_NOSPACE.match(prev) or CJK_NOSPACE.match(head):
+            return ""
+        if self.hangul_join and HANGUL.match(prev) and HANGUL_PARTICLES.match(following):
+            return ""
+        return " "
+
+    def feed(self, chunk, final=False):
+        """
+        청크를 받아 확정된 출력 반환 (final=True면 보류분까지 모두 내보냄)
+        """
+        buffer = self.carry + chunk
+        out = []
+        pos = 0
+        cut = None
+
+        for match in NEWLINE_RUN.finditer(buffer):
+            start, end = match.span()
+            following = buffer[end:end + LOOKAHEAD + 1]
+            # 다음 줄 앞부분이 아직 덜 들어왔으면 다음 청크까지 보류
+            if not final and (end == len(buffer) or (len(following) <= LOOKAHEAD and "\n" not in following)):
+                cut = start
+                break
+            prev = buffer[start - 1] if start > 0 else self.last_char
+            out.append(buffer[pos:start])
+            out.append(self.separator(prev, end - start, following))
+            pos = end
+
+        if cut is None:
+            out.append(buffer[pos:])
+            self.carry = ""
+        else:
+            out.append(buffer[pos:cut])
+            self.carry = buffer[cut:]
+
+        text = "".join(out)
+        if text:
+            self.last_char = text[-1]
+        return text
+
+
+# ==================== 파일 처리 ====================
+def detect_newline(file_path):
+    # 입력 파일 앞부분에 CRLF가 있으면 출력도 CRLF로 저장
+    with open(file_path, "rb") as f:
+        sample = f.read(NEWLINE_SNIFF_BYTES)
+    return "\r\n" if b"\r\n" in sample else "\n"
+
+
+def output_path_for(file_path):
+    return file_path.with_stem(file_path.stem + OUTPUT_SUFFIX)
+
+
+def reflow_file(file_path, output_path=None, hangul_join=True, encoding="utf-8"):
+    """
+    텍스트 파일 하나를 스트리밍으로 정리
+
+    CR/CRLF는 읽을 때 '\\n'으로 통일(universal newline)되고, 저장할 때 원래 형식으로 되돌린다.
+
+    Returns:
+        Path: 저장된 파일 경로
+    """
+    file_path = Path(file_path)
+    output_path = Path(output_path) if output_path else output_path_for(file_path)
+    newline = detect_newline(file_path)
+    reflower = Reflower(hangul_join)
+
+    with file_path.open("r", encoding=encoding, newline=None) as src, \
+            output_path.open("w", encoding=encoding, newline=newline) as dst:
+        while True:
+            chunk = src.read(CHUNK_CHARS)
+            if not chunk:
+                break
+            dst.write(reflower.feed(chunk))
+        dst.write(reflower.feed("", final=True))
+
+    return output_path
+
+
+def collect_text_files(folder):
+    # 이미 정리된 *_cleaned.txt는 다시 처리하지 않음
+    return sorted(
+        path for path in Path(folder).rglob("*.txt")
+        if not path.stem.endswith(OUTPUT_SUFFIX)
+    )
+
+
+def reflow_folder(folder, hangul_join=True, workers=None):
+    """
+    폴더 안의 모든 txt 파일을 프로세스 풀로 병렬 처리
+    """
+    files = collect_text_files(folder)
+    if not files:
+        print(f"txt 파일이 없습니다: {folder}")
+        return
+
+    workers = workers or os.cpu_count() or 1
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(reflow_file, path, None, hangul_join): path for path in files}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                output_path = future.result()
+                print(f"[{done}/{len(files)}] Saved cleaned file to: {output_path}")
+            except (OSError, UnicodeError) as e:
+                failed += 1
+                print(f"[{done}/{len(files)}] 실패: {path} ({e})")
+
+    print(f"완료: {len(files) - failed}개 성공, {failed}개 실패")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="txt 파일의 단일 개행을 공백으로 바꾸기 (문단 개행 유지)")
+    parser.add_argument("path", nargs="?", help="txt 파일 또는 폴더 경로 (생략하면 입력 받음)")
+    parser.add_argument("--workers", type=int, default=None, help="폴더 처리 프로세스 수")
+    parser.add_argument("--no-hangul-join", action="store_true", help="줄 첫머리 조사를 앞 단어에 붙이지 않음")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # 1. 파일/폴더 경로 입력
+    path = Path(args.path or input("Enter txt file or folder path: ").strip().strip('"'))
+    hangul_join = not args.no_hangul_join
+
+    if path.is_dir():
+        reflow_folder(path, hangul_join, args.workers)
+    elif path.is_file():
+        output_path = reflow_file(path, hangul_join=hangul_join)
+        print(f"Saved cleaned file to: {output_path}")
+    else:
+        print(f"경로를 찾을 수 없습니다: {path}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,549 @@
 import os
+import re
+import json
+import time
+import heapq
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-def save_tree_to_md():
-    # 1. 설정: 저장할 파일명 및 스캔 시작 위치
-    output_filename = "project_structure.md"
-    
+# ==================== 상수 정의 ====================
+OUTPUT_FILENAME = "project_structure.md"
+JSON_OUTPUT_FILENAME = "project_structure.json"
+SNAPSHOT_FILENAME = ".tree_snapshot.json"
+SNAPSHOT_VERSION = 2
+
+# 무시할 폴더 및 파일 (보기 싫은 것들)
+IGNORE_NAMES = {
+    '.git', '.vscode', 'myenv', '__pycache__',
+    '.ipynb_checkpoints', '.DS_Store', '.idea',
+    OUTPUT_FILENAME, JSON_OUTPUT_FILENAME, SNAPSHOT_FILENAME, '.gitignore', 'README.md'
+}
+IGNORE_SUFFIXES = ('.pyc',)
+
+# 줄 수 집계: 청크 크기, 앞부분에 NUL 바이트가 있으면 바이너리로 보고 건너뜀
+LINE_COUNT_CHUNK = 1 << 20
+BINARY_SNIFF_BYTES = 8192
+DEFAULT_TOP_FILES = 10
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# 최상위 폴더 병렬 스캔 스레드 수 (scandir/stat은 GIL을 놓으므로 프로세스 대신 스레드로 충분)
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+INDENT = ' ' * 4
+
+
+# ==================== .gitignore 매처 ====================
+def glob_to_regex(pattern):
+    # gitignore 글롭을 정규식 조각으로 변환 (**, *, ?, [...] 지원)
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            parts.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                parts.append(re.escape('['))
+                i += 1
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append(f'[{body}]')
+                i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            parts.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(parts)
+
+
+class GitIgnoreMatcher:
+    """
+    .gitignore 규칙을 정규식으로 컴파일한 매처 (스캔 루트 기준 상대 경로로 판정)
+
+    하위 폴더의 .gitignore는 extend()로 규칙을 덧붙인 새 매처를 만든다.
+    부정 규칙(!)이 없으면 모든 규칙을 정규식 하나로 합쳐 한 번에 검사한다.
+    """
+
+    def __init__(self, rules=(), sources=(), enabled=True):
+        # rules: [(정규식, 부정 여부, 폴더 전용 여부)], sources: 캐시 무효화용 원본 규칙 목록
+        self.rules = list(rules)
+        self.sources = tuple(sources)
+        self.enabled = enabled
+        self.signature = ''
+        if self.sources or not enabled:
+            raw = json.dumps([enabled, self.sources], ensure_ascii=False).encode('utf-8')
+            self.signature = hashlib.sha1(raw).hexdigest()
+        self._has_negation = any(negate for _, negate, _ in self.rules)
+        file_rules = [regex.pattern for regex, _, dir_only in self.rules if not dir_only]
+        all_rules = [regex.pattern for regex, _, _ in self.rules]
+        self._file_combined = re.compile('|'.join(file_rules)) if file_rules else None
+        self._dir_combined = re.compile('|'.join(all_rules)) if all_rules else None
+
+    def extend(self, base_rel, lines):
+        # base_rel 폴더의 .gitignore 내용을 덧붙인 매처 반환
+        if not self.enabled or not lines:
+            return self
+        rules = list(self.rules)
+        sources = list(self.sources)
+        prefix = re.escape(base_rel + '/') if base_rel else ''
+
+        for line in lines:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            sources.append((base_rel, line))
+
+            negate = line.startswith('!')
+            if negate or line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+
+            # 중간에 '/'가 있으면 .gitignore 위치 기준, 없으면 아무 깊이의 이름과 일치
+            if '/' in line:
+                body = glob_to_regex(line.lstrip('/'))
+                regex = f'(?:^{prefix}{body}$)'
+            else:
+                regex = f'(?:^{prefix}(?:.*/)?{glob_to_regex(line)}$)'
+            rules.append((re.compile(regex), negate, dir_only))
+
+        return GitIgnoreMatcher(rules, sources)
+
+    def is_ignored(self, rel_path, is_dir):
+        combined = self._dir_combined if is_dir else self._file_combined
+        if combined is None or not combined.match(rel_path):
+            return False
+        if not self._has_negation:
+            return True
+        # 부정 규칙이 있으면 마지막으로 일치한 규칙이 결과를 정함
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return False
+
+
+def read_gitignore(path):
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.readlines()
+    except OSError:
+        return None
+
+
+# ==================== 폴더 스캔 ====================
+def is_ignored_name(name):
+    return name in IGNORE_NAMES or name.endswith(IGNORE_SUFFIXES)
+
+
+def count_lines(path):
+    # 텍스트 파일 줄 수 (청크 단위로 읽어 메모리 일정), 바이너리거나 읽을 수 없으면 None
+    count = 0
+    last = b''
+    try:
+        with open(path, 'rb') as f:
+            chunk = f.read(LINE_COUNT_CHUNK)
+            if b'\0' in chunk[:BINARY_SNIFF_BYTES]:
+                return None
+            while chunk:
+                count += chunk.count(b'\n')
+                last = chunk[-1:]
+                chunk = f.read(LINE_COUNT_CHUNK)
+    except OSError:
+        return None
+    # 마지막 줄에 줄바꿈이 없어도 한 줄로 셈
+    if last and last != b'\n':
+        count += 1
+    return count
+
+
+def file_stats(path, name, cached=None):
+    """
+    파일 항목 [이름, 바이트, mtime_ns, 줄 수] 생성
+
+    크기와 mtime이 스냅샷과 같으면 줄 수를 다시 세지 않는다.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [name, None, None, None]
+    if cached is not None and cached[1] == stat.st_size and cached[2] == stat.st_mtime_ns:
+        return list(cached)
+    return [name, stat.st_size, stat.st_mtime_ns, count_lines(path)]
+
+
+def list_directory(path, rel, matcher, cached=None, with_stats=False):
+    """
+    폴더 한 단계 읽기 (정렬된 파일/하위 폴더 이름)
+
+    cached 노드의 폴더 mtime, 규칙, .gitignore mtime이 그대로면 scandir 없이 목록을 재사용한다.
+    파일 추가/삭제/이름 변경은 폴더 mtime을 바꾸므로 목록 재사용이 안전하다.
+    with_stats면 파일 내용 수정은 폴더 mtime에 반영되지 않으므로 파일마다 stat해서
+    크기/mtime이 바뀐 파일만 줄 수를 다시 센다.
+
+    Returns:
+        tuple: (노드 dict(하위 폴더 제외), 하위 폴더용 매처, 하위 폴더 이름 목록)
+    """
+    stat = os.stat(path)
+    gitignore_path = os.path.join(path, '.gitignore')
+
+    reuse = (
+        cached is not None
+        and cached.get('mtime') == stat.st_mtime_ns
+        and cached.get('signature') == matcher.signature
+    )
+    if reuse and cached.get('gitignore') is not None:
+        try:
+            reuse = os.stat(gitignore_path).st_mtime_ns == cached['gitignore']['mtime']
+        except OSError:
+            reuse = False
+
+    if reuse:
+        gitignore = cached.get('gitignore')
+        file_names = [entry[0] for entry in cached['files']]
+        dir_names = list(cached['dirs'])
+    else:
+        gitignore = None
+        lines = read_gitignore(gitignore_path) if matcher.enabled else None
+        if lines is not None:
+            gitignore = {'mtime': os.stat(gitignore_path).st_mtime_ns, 'lines': lines}
+
+        child_matcher = matcher.extend(rel, lines)
+        file_names, dir_names = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if is_ignored_name(entry.name):
+                    continue
+                is_dir = entry.is_dir(follow_symlinks=False)
+                child_rel = f'{rel}/{entry.name}' if rel else entry.name
+                if child_matcher.is_ignored(child_rel, is_dir):
+                    continue
+                (dir_names if is_dir else file_names).append(entry.name)
+        file_names.sort()
+        dir_names.sort()
+
+    if with_stats:
+        cached_files = {entry[0]: entry for entry in cached['files']} if cached else {}
+        files = [file_stats(os.path.join(path, name), name, cached_files.get(name)) for name in file_names]
+    else:
+        files = [[name, None, None, None] for name in file_names]
+
+    child_matcher = matcher.extend(rel, gitignore['lines'] if gitignore else None)
+    node = {
+        'mtime': stat.st_mtime_ns,
+        'signature': matcher.signature,
+        'gitignore': gitignore,
+        'files': files,
+        'dirs': {}
+    }
+    return node, child_matcher, dir_names
+
+
+def scan_directory(path, rel, matcher, cached=None, with_stats=False):
+    """
+    폴더를 재귀 스캔해 노드 생성
+
+    하위 폴더의 변경은 상위 폴더 mtime에 반영되지 않으므로 하위 폴더는 항상 다시 확인한다.
+    (변경 없는 폴더는 stat 한 번으로 끝남)
+    """
+    node, child_matcher, dir_names = list_directory(path, rel, matcher, cached, with_stats)
+    cached_dirs = cached.get('dirs', {}) if cached else {}
+
+    for name in dir_names:
+        child_rel = f'{rel}/{name}' if rel else name
+        try:
+            node['dirs'][name] = scan_directory(
+                os.path.join(path, name), child_rel, child_matcher, cached_dirs.get(name), with_stats
+            )
+        except OSError:
+            # 스캔 도중 삭제되었거나 권한이 없는 폴더는 건너뜀
+            continue
+    return node
+
+
+def scan_tree(base_dir, use_gitignore=True, snapshot=None, workers=DEFAULT_WORKERS, with_stats=False):
+    """
+    base_dir 전체를 스캔해 트리 노드 생성 (최상위 하위 폴더는 스레드로 병렬 스캔)
+
+    Args:
+        base_dir: 스캔 시작 폴더
+        use_gitignore: .gitignore 규칙 적용 여부
+        snapshot: 이전 스캔 결과 루트 노드 (있으면 변경된 폴더만 다시 읽음)
+        workers: 병렬 스캔 스레드 수
+        with_stats: 파일 크기/줄 수 수집 여부
+
+    Returns:
+        dict: 루트 노드 {"mtime", "signature", "gitignore", "files": [[이름, 바이트, mtime_ns, 줄 수]],
+              "dirs": {이름: 노드}}
+    """
+    matcher = GitIgnoreMatcher(enabled=use_gitignore)
+    root, child_matcher, dir_names = list_directory(base_dir, '', matcher, snapshot, with_stats)
+    cached_dirs = snapshot.get('dirs', {}) if snapshot else {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [
+            executor.submit(
+                scan_directory, os.path.join(base_dir, name), name, child_matcher, cached_dirs.get(name), with_stats
+            )
+            for name in dir_names
+        ]
+        for name, future in zip(dir_names, futures):
+            try:
+                root['dirs'][name] = future.result()
+            except OSError:
+                continue
+    return root
+
+
+# ==================== 스냅샷 캐시 ====================
+def load_snapshot(snapshot_path, base_dir):
+    # 같은 폴더를 같은 버전으로 스캔한 스냅샷만 사용
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != SNAPSHOT_VERSION or data.get('base_dir') != base_dir:
+        return None
+    return data.get('tree')
+
+
+def same_listing(node, cached):
+    """
+    스캔 결과가 스냅샷과 내용상 같은지 (폴더 mtime은 비교하지 않음)
+
+    출력 파일을 base_dir에 쓰면 루트 mtime은 매번 바뀌므로, 목록/규칙/파일 정보가 같으면 변경 없음으로 본다.
+    (mtime만 바뀐 폴더는 다음 실행에서 scandir 한 번으로 다시 확인됨)
+    """
+    if cached is None:
+        return False
+    if (node['files'] != cached.get('files') or node['gitignore'] != cached.get('gitignore')
+            or node['signature'] != cached.get('signature')):
+        return False
+    cached_dirs = cached.get('dirs', {})
+    if node['dirs'].keys() != cached_dirs.keys():
+        return False
+    return all(same_listing(child, cached_dirs[name]) for name, child in node['dirs'].items())
+
+
+def save_snapshot(snapshot_path, base_dir, tree):
+    # 임시 파일에 쓴 뒤 교체해 중간에 끊겨도 스냅샷이 깨지지 않게 함
+    # json.dump는 조각마다 write를 호출해 느리므로 한 번에 직렬화해서 씀
+    data = json.dumps({'version': SNAPSHOT_VERSION, 'base_dir': base_dir, 'tree': tree},
+                      ensure_ascii=False, separators=(',', ':'), check_circular=False)
+    temp_path = snapshot_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(temp_path, snapshot_path)
+
+
+# ==================== 집계 ====================
+def aggregate_tree(node, rel='', largest=None, top=DEFAULT_TOP_FILES):
+    """
+    스캔 결과 트리에서 폴더별 합계 계산 (추가 I/O 없음)
+
+    각 노드에 node['totals'] = {"bytes", "files", "lines", "dirs"}를 기록하고,
+    largest 힙에는 가장 큰 파일 top개를 (바이트, 상대 경로)로 유지한다.
+    """
+    totals = {'bytes': 0, 'files': 0, 'lines': 0, 'dirs': 0}
+    for name, size, _, lines in node['files']:
+        totals['files'] += 1
+        totals['bytes'] += size or 0
+        totals['lines'] += lines or 0
+        if largest is not None and size is not None:
+            item = (size, f'{rel}/{name}' if rel else name)
+            if len(largest) < top:
+                heapq.heappush(largest, item)
+            elif item > largest[0]:
+                heapq.heapreplace(largest, item)
+
+    for name, child in node['dirs'].items():
+        child_totals = aggregate_tree(child, f'{rel}/{name}' if rel else name, largest, top)
+        totals['dirs'] += child_totals['dirs'] + 1
+        for key in ('bytes', 'files', 'lines'):
+            totals[key] += child_totals[key]
+
+    node['totals'] = totals
+    return totals
+
+
+def format_size(num_bytes):
+    size = float(num_bytes)
+    for unit in SIZE_UNITS:
+        if size < 1024 or unit == SIZE_UNITS[-1]:
+            break
+        size /= 1024
+    return f'{int(size)} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+
+
+# ==================== 마크다운 출력 ====================
+def render_tree_lines(node, name, lines, level=0, max_depth=None, with_stats=False):
+    # 폴더명 → 파일 → 하위 폴더 순으로 기록, 깊이는 재귀 단계로 계산
+    indent = INDENT * level
+    totals = node['totals']
+    if with_stats:
+        lines.append(f"{indent}📂 {name}/ ({totals['files']:,} files, {format_size(totals['bytes'])}, {totals['lines']:,} lines)\n")
+    else:
+        lines.append(f'{indent}📂 {name}/\n')
+
+    subindent = INDENT * (level + 1)
+    # 깊이 제한: 이 폴더 내용은 개수만 표시
+    if max_depth is not None and level >= max_depth:
+        if totals['files'] or totals['dirs']:
+            lines.append(f"{subindent}… 파일 {totals['files']:,}개, 폴더 {totals['dirs']:,}개\n")
+        return
+
+    for file, size, _, line_count in node['files']:
+        if with_stats and size is not None:
+            detail = format_size(size) if line_count is None else f'{format_size(size)}, {line_count:,} lines'
+            lines.append(f'{subindent}📄 {file} ({detail})\n')
+        else:
+            lines.append(f'{subindent}📄 {file}\n')
+
+    for child_name, child in node['dirs'].items():
+        render_tree_lines(child, child_name, lines, level + 1, max_depth, with_stats)
+
+
+def render_markdown(tree, base_dir, largest=(), max_depth=None, with_stats=False):
+    # 전체 출력을 버퍼에 모은 뒤 한 번에 반환
+    lines = ["# 📂 프로젝트 폴더 구조\n\n", "```text\n"]
+    render_tree_lines(tree, os.path.basename(base_dir), lines, 0, max_depth, with_stats)
+    lines.append("```\n")
+
+    if with_stats:
+        totals = tree['totals']
+        lines.append("\n## 📊 요약\n\n")
+        lines.append("| 항목 | 값 |\n|---|---:|\n")
+        lines.append(f"| 파일 | {totals['files']:,} |\n")
+        lines.append(f"| 폴더 | {totals['dirs']:,} |\n")
+        lines.append(f"| 용량 | {format_size(totals['bytes'])} ({totals['bytes']:,} B) |\n")
+        lines.append(f"| 텍스트 줄 수 | {totals['lines']:,} |\n")
+
+        if largest:
+            lines.append("\n## 📦 가장 큰 파일\n\n")
+            lines.append("| # | 파일 | 크기 |\n|---:|---|---:|\n")
+            for rank, (size, path) in enumerate(largest, 1):
+                lines.append(f"| {rank} | `{path}` | {format_size(size)} |\n")
+    return ''.join(lines)
+
+
+# ==================== JSON 출력 ====================
+def tree_to_json(node, name, level=0, max_depth=None, with_stats=False):
+    # 폴더: {"name", "type", "files", "dirs", ["bytes", "lines"], "children" 또는 "truncated"}
+    totals = node['totals']
+    result = {'name': name, 'type': 'dir', 'files': totals['files'], 'dirs': totals['dirs']}
+    if with_stats:
+        result['bytes'] = totals['bytes']
+        result['lines'] = totals['lines']
+
+    if max_depth is not None and level >= max_depth:
+        result['truncated'] = True
+        return result
+
+    children = []
+    for file, size, _, line_count in node['files']:
+        entry = {'name': file, 'type': 'file'}
+        if with_stats:
+            entry['bytes'] = size
+            entry['lines'] = line_count
+        children.append(entry)
+    for child_name, child in node['dirs'].items():
+        children.append(tree_to_json(child, child_name, level + 1, max_depth, with_stats))
+    result['children'] = children
+    return result
+
+
+def render_json(tree, base_dir, largest=(), max_depth=None, with_stats=False):
+    document = {
+        'root': base_dir,
+        'totals': tree['totals'] if with_stats else {k: tree['totals'][k] for k in ('files', 'dirs')},
+        'tree': tree_to_json(tree, os.path.basename(base_dir), 0, max_depth, with_stats)
+    }
+    if with_stats:
+        document['largest'] = [{'path': path, 'bytes': size} for size, path in largest]
+    return json.dumps(document, ensure_ascii=False, indent=2) + '\n'
+
+
+def save_tree_to_md(base_dir=None, output_filename=None, use_gitignore=True,
+                    use_snapshot=False, workers=DEFAULT_WORKERS, output_format='md',
+                    with_stats=False, max_depth=None, top=DEFAULT_TOP_FILES):
+    """
+    프로젝트 폴더 구조를 마크다운(또는 JSON) 파일로 저장
+
+    Args:
+        base_dir: 스캔할 폴더 (None이면 이 스크립트 상위 폴더 = 프로젝트 루트)
+        output_filename: base_dir 안에 저장할 파일명 (None이면 형식별 기본 이름)
+        use_gitignore: .gitignore 규칙 적용 여부
+        use_snapshot: 스냅샷 캐시 사용 (mtime이 바뀐 폴더만 다시 스캔)
+        workers: 최상위 폴더 병렬 스캔 스레드 수
+        output_format: 'md' 또는 'json'
+        with_stats: 같은 스캔에서 폴더별 용량/파일 수/줄 수와 가장 큰 파일 집계
+        max_depth: 표시할 최대 깊이 (더 깊은 폴더는 합계만 표시, None이면 전체)
+        top: 가장 큰 파일 표시 개수
+    """
+    if output_filename is None:
+        output_filename = JSON_OUTPUT_FILENAME if output_format == 'json' else OUTPUT_FILENAME
     # 스크립트 파일의 위치(Utility)가 아니라, 프로젝트 루트(python_script)를 기준으로 잡기 위해 상위 폴더(..)로 이동
-    # 만약 이 파일을 루트에 두셨다면 base_dir = '.' 로 바꾸시면 됩니다.
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) 
+    if base_dir is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    base_dir = os.path.abspath(base_dir)
     output_path = os.path.join(base_dir, output_filename)
+    snapshot_path = os.path.join(base_dir, SNAPSHOT_FILENAME)
 
-    # 2. 무시할 폴더 및 파일 (보기 싫은 것들)
-    ignore_set = {
-        '.git', '.vscode', 'myenv', '__pycache__', 
-        '.ipynb_checkpoints', '.DS_Store', '.idea', 
-        output_filename, '.gitignore', 'README.md'
-    }
+    started = time.perf_counter()
+    snapshot = load_snapshot(snapshot_path, base_dir) if use_snapshot else None
+    tree = scan_tree(base_dir, use_gitignore, snapshot, workers, with_stats)
+    # 바뀐 폴더/파일이 없으면 스냅샷을 다시 쓰지 않음
+    if use_snapshot and not same_listing(tree, snapshot):
+        save_snapshot(snapshot_path, base_dir, tree)
 
-    # 3. 파일 작성 시작
+    heap = []
+    aggregate_tree(tree, '', heap, top)
+    largest = sorted(heap, reverse=True)
+
+    render = render_json if output_format == 'json' else render_markdown
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("# 📂 프로젝트 폴더 구조\n\n")
-        f.write("```text\n") # 마크다운 코드 블록 시작
-
-        for root, dirs, files in os.walk(base_dir):
-            # 무시할 폴더들을 탐색 목록에서 제외
-            dirs[:] = [d for d in dirs if d not in ignore_set]
-            
-            # 들여쓰기 계산
-            level = root.replace(base_dir, '').count(os.sep)
-            indent = ' ' * 4 * level
-            
-            # 폴더명 기록 (루트 폴더 이름은 제외하고 싶으면 level 0일 때 조건 추가 가능)
-            folder_name = os.path.basename(root)
-            f.write(f'{indent}📂 {folder_name}/\n')
-            
-            # 파일명 기록
-            subindent = ' ' * 4 * (level + 1)
-            for file in files:
-                if file not in ignore_set and not file.endswith('.pyc'):
-                    f.write(f'{subindent}📄 {file}\n')
-        
-        f.write("```\n") # 마크다운 코드 블록 끝
-
-    print(f"✅ 저장 완료! '{output_path}' 파일이 생성되었습니다.")
+        f.write(render(tree, base_dir, largest, max_depth, with_stats))
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ 저장 완료! '{output_path}' 파일이 생성되었습니다. ({elapsed:.2f}초)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="프로젝트 폴더 구조를 마크다운으로 저장")
+    parser.add_argument("base_dir", nargs="?", default=None, help="스캔할 폴더 (기본: 프로젝트 루트)")
+    parser.add_argument("-o", "--output", default=None, help="저장할 파일명 (기본: 형식별 project_structure.md/.json)")
+    parser.add_argument("--format", choices=("md", "json"), default="md", help="출력 형식")
+    parser.add_argument("--stats", action="store_true", help="폴더별 용량/파일 수/줄 수와 가장 큰 파일 집계")
+    parser.add_argument("--max-depth", type=int, default=None, help="표시할 최대 깊이 (더 깊은 폴더는 합계만)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_FILES, help="가장 큰 파일 표시 개수")
+    parser.add_argument("--no-gitignore", action="store_true", help=".gitignore 규칙 무시")
+    parser.add_argument("--snapshot", action="store_true", help=f"{SNAPSHOT_FILENAME} 캐시로 변경된 폴더만 다시 스캔")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="최상위 폴더 병렬 스캔 스레드 수")
+    return parser.parse_args(argv)
+
 
 if __name__ == '__main__':
-    save_tree_to_md()
+    args = parse_args()
+    save_tree_to_md(args.base_dir, args.output, not args.no_gitignore, args.snapshot, args.workers,
+                    args.format, args.stats, args.max_depth, args.top)
@@ -1,108 +1,1063 @@
 import vobject
 import pandas as pd
+import csv
+import mmap
 import os
+import quopri
+import re
+import time
+import unicodedata
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 
-def vcard_to_csv(vcf_path, csv_path):
-    contacts = []
-    with open(vcf_path, "r", encoding="utf-8") as vcf:
-        vcard = vobject.readComponents(vcf)
-        for contact in vcard:
-            # 이름 설정
-            first_name = getattr(contact.n.value, "given", "") if hasattr(contact, "n") else ""
-            last_name = getattr(contact.n.value, "family", "") if hasattr(contact, "n") else ""
-            
-            # 전화번호 (최대 2개)
-            tels = [tel.value for tel in contact.contents.get("tel", [])]
-            phone1 = tels[0] if len(tels) > 0 else ""
-            phone2 = tels[1] if len(tels) > 1 else ""
-
-            # 이메일 (최대 2개)
-            emails = [email.value for email in contact.contents.get("email", [])]
-            email1 = emails[0] if len(emails) > 0 else ""
-            email2 = emails[1] if len(emails) > 1 else ""
-
-            # 기타 필드
-            org = getattr(contact, "org", None)
-            url = getattr(contact, "url", None)
-            bday = getattr(contact, "bday", None)
-            memo = getattr(contact, "note", None)
-            
-            # 주소 처리
-            address_val = ""
-            if hasattr(contact, "adr"):
-                adr = contact.adr.value
-                address_val = f"{adr.street} {adr.city} {adr.region} {adr.code} {adr.country}".strip()
-
-            contacts.append({
-                "First Name": first_name,
-                "Last Name": last_name,
-                "Phone 1": phone1,
-                "Phone 2": phone2,
-                "Email 1": email1,
-                "Email 2": email2,
-                "Organization": org.value[0] if org else "",
-                "URL": url.value if url else "",
-                "Birthday": bday.value if bday else "",
-                "Address": address_val,
-                "Memo": memo.value if memo else ""
-            })
-
-    df = pd.DataFrame(contacts)
-    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+# ==================== 연락처 스키마 ====================
+# (vCard 속성, 종류, CSV 컬럼, 타입 컬럼)
+#   text: 단일 텍스트 값
+#   structured: 구성요소마다 컬럼을 나눈 단일 구조화 값 (N)
+#   components: 구성요소를 ';'로 이어 한 칸에 담는 단일 구조화 값 (ORG)
+#   multi: 반복 값 (칸 안에서 줄바꿈으로 구분, 타입 컬럼과 줄 단위로 대응)
+#   multi_structured: 반복 구조화 값 (ADR, 구성요소마다 컬럼, 줄 단위로 대응)
+# 스키마에 없는 속성과 해석할 수 없는 값은 원문 그대로 Other 컬럼에 보관한다.
+CONTACT_SCHEMA = [
+    ("N", "structured", ["Last Name", "First Name", "Middle Name", "Name Prefix", "Name Suffix"], None),
+    ("FN", "text", ["Full Name"], None),
+    ("ORG", "components", ["Organization"], None),
+    ("TITLE", "text", ["Title"], None),
+    ("TEL", "multi", ["Phone"], "Phone Type"),
+    ("EMAIL", "multi", ["Email"], "Email Type"),
+    ("URL", "multi", ["URL"], "URL Type"),
+    ("ADR", "multi_structured", [
+        "Address PO Box", "Address Extended", "Address Street", "Address City",
+        "Address Region", "Address Postal Code", "Address Country"
+    ], "Address Type"),
+    ("BDAY", "text", ["Birthday"], None),
+    ("NOTE", "text", ["Memo"], None),
+]
+OTHER_COLUMN = "Other"
+
+# 이전 버전의 고정 컬럼 CSV (읽기 전용 호환)
+LEGACY_HEADER = [
+    "First Name", "Last Name", "Phone 1", "Phone 2", "Email 1", "Email 2",
+    "Organization", "URL", "Birthday", "Address", "Memo"
+]
+
+# 진행 상황 출력 간격 (연락처 수)
+PROGRESS_INTERVAL = 10000
+
+# 값 자체가 아니라 전송 형식에 해당하는 파라미터 (디코딩 후 버림)
+TRANSPORT_PARAMS = {"ENCODING", "CHARSET"}
+
+# vCard 2.1의 값 없는 파라미터 중 인코딩을 뜻하는 것들 (나머지는 TYPE)
+ENCODING_KEYWORDS = {"QUOTED-PRINTABLE", "BASE64", "B", "8BIT", "7BIT"}
+
+PROPERTY_NAME_PATTERN = re.compile(r"(?:[^.:;]*\.)?([^.:;]*)")
+TEXT_ESCAPE_PATTERN = re.compile(r"\\[nN,;\\]")
+ESCAPE_NEEDED_PATTERN = re.compile(r"[\\;,\n]")
+
+# vCard 직렬화: 줄 길이 제한(옥텟)과 한 번에 직렬화/기록할 연락처 수
+VCARD_LINE_LIMIT = 75
+SERIALIZE_CHUNK_ROWS = 10000
+
+# 병렬 변환: 작업자당 샤드 수 (작을수록 샤드가 커짐)와 동시에 대기시킬 작업 수
+SHARDS_PER_WORKER = 4
+PENDING_PER_WORKER = 2
+# 샤드 경계: 줄 머리의 BEGIN:VCARD (iter_vcard_blocks처럼 대소문자 무시)
+SHARD_BOUNDARY_PATTERN = re.compile(rb"\nBEGIN:VCARD", re.IGNORECASE)
+
+# 중복 병합: 국가번호 없는 국내 번호(0으로 시작)에 붙일 기본 국가번호, 이름 블록당 비교할 최대 연락처 수,
+# 같은 사람의 근거로 인정할 전화번호/이메일의 최대 공유 연락처 수 (넘으면 대표번호/공용 메일로 보고 무시)
+DEFAULT_COUNTRY_CODE = "82"
+MAX_NAME_BLOCK = 50
+MAX_SHARED_KEY_CONTACTS = 3
+
+TEXT_UNESCAPES = {"\\n": "\n", "\\N": "\n", "\\,": ",", "\\;": ";", "\\\\": "\\"}
+
+def compile_schema(schema):
+    # 스키마에서 CSV 헤더와 속성별 (종류, 시작 컬럼, 컬럼 수, 타입 컬럼) 표를 미리 계산
+    header = []
+    fields = {}
+    for prop, kind, columns, type_column in schema:
+        start = len(header)
+        header.extend(columns)
+        type_index = None
+        if type_column:
+            type_index = len(header)
+            header.append(type_column)
+        fields[prop] = (kind, start, len(columns), type_index)
+    header.append(OTHER_COLUMN)
+    return header, fields
+
+CSV_HEADER, SCHEMA_FIELDS = compile_schema(CONTACT_SCHEMA)
+COLUMN_INDEX = {column: index for index, column in enumerate(CSV_HEADER)}
+OTHER_INDEX = COLUMN_INDEX[OTHER_COLUMN]
+FIRST_NAME_INDEX = COLUMN_INDEX["First Name"]
+LAST_NAME_INDEX = COLUMN_INDEX["Last Name"]
+FULL_NAME_INDEX = COLUMN_INDEX["Full Name"]
+
+# 행을 만드는 동안 리스트로 모았다가 마지막에 줄바꿈으로 합치는 칸
+LIST_INDICES = [OTHER_INDEX]
+for _kind, _start, _width, _type_index in SCHEMA_FIELDS.values():
+    if _kind in ("multi", "multi_structured"):
+        LIST_INDICES.extend(range(_start, _start + _width))
+        LIST_INDICES.append(_type_index)
+
+# ==================== 빠른 vCard 파서 ====================
+# vobject는 카드마다 전체 컴포넌트 트리를 만들기 때문에 대량 변환에서는 느림.
+# CSV에 필요한 속성만 줄 단위로 직접 읽고, 해석하지 못한 카드만 vobject로 넘긴다.
+
+def iter_vcard_blocks(lines):
+    # BEGIN:VCARD ~ END:VCARD 사이의 원문 줄 목록을 카드 단위로 반환
+    # 파일을 utf-8로 열어 BOM이 첫 줄에 남아 있어도 첫 카드를 놓치지 않도록 줄 앞의 BOM은 무시
+    block = None
+    depth = 0
+    for line in lines:
+        line = line.rstrip("\r\n").lstrip("\ufeff")
+        upper = line.upper()
+        if upper == "BEGIN:VCARD":
+            if block is None:
+                block = []
+            depth += 1
+        if block is not None:
+            block.append(line)
+            if upper == "END:VCARD":
+                depth -= 1
+                if depth == 0:
+                    yield block
+                    block = None
+
+def unfold_lines(lines):
+    # 접힌 줄 펼치기: 공백/탭으로 시작하는 줄(3.0/4.0)과 '='로 끝나는 quoted-printable 줄(2.1)
+    unfolded = []
+    qp_open = False
+    for line in lines:
+        if qp_open:
+            unfolded[-1] = unfolded[-1][:-1] + line
+        elif unfolded and line[:1] in (" ", "\t"):
+            unfolded[-1] += line[1:]
+        elif line:
+            unfolded.append(line)
+        else:
+            continue
+        current = unfolded[-1]
+        qp_open = current.endswith("=") and "QUOTED-PRINTABLE" in current[:current.find(":")].upper()
+    return unfolded
+
+def find_unquoted(text, char):
+    if '"' not in text:
+        return text.find(char)
+    in_quotes = False
+    for index, c in enumerate(text):
+        if c == '"':
+            in_quotes = not in_quotes
+        elif c == char and not in_quotes:
+            return index
+    return -1
+
+def parse_property(line):
+    # "group.NAME;PARAM=a,b;BARE:value" → (NAME, {PARAM: [a, b], TYPE: [BARE]}, value)
+    colon = find_unquoted(line, ":")
+    if colon < 0:
+        raise ValueError(f"잘못된 속성 줄: {line!r}")
+    head, value = line[:colon], line[colon + 1:]
+
+    parts = head.split(";")
+    name = parts[0].rsplit(".", 1)[-1].upper()
+    params = {}
+    for param in parts[1:]:
+        key, eq, param_value = param.partition("=")
+        key = key.strip().upper()
+        if eq:
+            params.setdefault(key, []).extend(v.strip('"') for v in param_value.split(","))
+        elif key in ENCODING_KEYWORDS:
+            params.setdefault("ENCODING", []).append(key)
+        elif key:
+            params.setdefault("TYPE", []).append(key)
+    return name, params, value
+
+def decode_value(params, value):
+    # quoted-printable + CHARSET 디코딩
+    # QP로 인코딩된 줄바꿈(=0D=0A)은 3.0의 \n 이스케이프와 같게 '\n' 하나로 통일 (왕복 시 값이 같도록)
+    encoding = params.get("ENCODING")
+    if encoding and encoding[0].upper() == "QUOTED-PRINTABLE":
+        raw = quopri.decodestring(value.encode("utf-8"))
+        charset = params.get("CHARSET", ["utf-8"])[0]
+        try:
+            text = raw.decode(charset)
+        except LookupError:
+            text = raw.decode("utf-8", errors="replace")
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+    return value
+
+def unescape_text(value):
+    if "\\" not in value:
+        return value
+    return TEXT_ESCAPE_PATTERN.sub(lambda m: TEXT_UNESCAPES[m.group()], value)
+
+def split_structured(value, size):
+    # 이스케이프되지 않은 ';'로 구조화된 값(N, ADR, ORG)을 나누고 size 개로 맞춤
+    if "\\" not in value:
+        parts = value.split(";")
+    else:
+        parts = []
+        current = []
+        index = 0
+        while index < len(value):
+            c = value[index]
+            if c == "\\" and index + 1 < len(value):
+                current.append(value[index:index + 2])
+                index += 2
+                continue
+            if c == ";":
+                parts.append("".join(current))
+                current = []
+            else:
+                current.append(c)
+            index += 1
+        parts.append("".join(current))
+    parts = [unescape_text(part) for part in parts]
+    return parts + [""] * (size - len(parts))
+
+def escape_cell(value):
+    # 반복 값 칸 안의 개별 값 이스케이프 (줄바꿈이 값 구분자이므로)
+    if "\\" not in value and "\n" not in value:
+        return value
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+def encode_components(parts):
+    # 구조화 값을 한 칸에 ';'로 이어 담기
+    return ";".join(part.replace("\\", "\\\\").replace(";", "\\;") for part in parts)
+
+def encode_params(params):
+    # 타입 칸: "CELL,VOICE" 또는 기타 파라미터 포함 시 "CELL;PREF=1"
+    types = ",".join(params.get("TYPE", ()))
+    extra = [f"{key}={','.join(values)}" for key, values in params.items()
+             if key != "TYPE" and key not in TRANSPORT_PARAMS]
+    return ";".join([types] + extra) if extra else types
+
+def decode_params(cell):
+    # 타입 칸 → vCard 파라미터 문자열 (";TYPE=CELL,VOICE;PREF=1")
+    if not cell:
+        return ""
+    types, _, extra = cell.partition(";")
+    parts = [f"TYPE={types}"] if types else []
+    if extra:
+        parts.append(extra)
+    return ";" + ";".join(parts)
+
+def extract_text(row, start, width, type_index, params, value):
+    row[start] = unescape_text(value)
+
+def extract_structured(row, start, width, type_index, params, value):
+    row[start:start + width] = split_structured(value, width)[:width]
+
+def extract_components(row, start, width, type_index, params, value):
+    row[start] = encode_components(split_structured(value, 0))
+
+def extract_multi(row, start, width, type_index, params, value):
+    row[start].append(escape_cell(unescape_text(value)))
+    row[type_index].append(encode_params(params))
+
+def extract_multi_structured(row, start, width, type_index, params, value):
+    for offset, part in enumerate(split_structured(value, width)[:width]):
+        row[start + offset].append(escape_cell(part))
+    row[type_index].append(encode_params(params))
+
+# 종류별 추출 함수를 속성마다 미리 묶어 둠 (카드마다 getattr/hasattr 탐색 없음)
+FIELD_EXTRACTORS = {
+    "text": extract_text,
+    "structured": extract_structured,
+    "components": extract_components,
+    "multi": extract_multi,
+    "multi_structured": extract_multi_structured,
+}
+PROPERTY_EXTRACTORS = {
+    prop: (FIELD_EXTRACTORS[kind], kind in ("multi", "multi_structured"), start, width, type_index)
+    for prop, (kind, start, width, type_index) in SCHEMA_FIELDS.items()
+}
+
+def derived_full_name(row):
+    return f"{row[FIRST_NAME_INDEX]} {row[LAST_NAME_INDEX]}".strip()
+
+def fast_card_to_row(block):
+    # 카드 원문 줄 → CSV_HEADER 순서의 행 (해석 불가 시 예외 발생)
+    row = [""] * len(CSV_HEADER)
+    for index in LIST_INDICES:
+        row[index] = []
+    seen = set()
+
+    for line in unfold_lines(block[1:-1]):
+        name = PROPERTY_NAME_PATTERN.match(line).group(1).upper()
+        extractor = PROPERTY_EXTRACTORS.get(name)
+        if extractor is None:
+            if name in ("BEGIN", "END"):
+                raise ValueError("중첩된 vCard")
+            if name != "VERSION":
+                row[OTHER_INDEX].append(line)
+            continue
+
+        extract, repeatable, start, width, type_index = extractor
+        name, params, value = parse_property(line)
+        encoding = params.get("ENCODING", ("",))[0].upper()
+        value_params = [key for key in params if key not in TRANSPORT_PARAMS]
+
+        # 단일 속성의 두 번째 값, 단일 속성의 파라미터, base64 값은 원문 보관
+        if encoding in ("B", "BASE64") or (not repeatable and (name in seen or value_params)):
+            row[OTHER_INDEX].append(line)
+            continue
+
+        seen.add(name)
+        extract(row, start, width, type_index, params, decode_value(params, value))
+
+    for index in LIST_INDICES:
+        row[index] = "\n".join(row[index])
+    if "FN" not in seen:
+        row[FULL_NAME_INDEX] = derived_full_name(row)
+    return row
+
+def component_to_row(contact):
+    # vobject 컴포넌트 → 행 (vobject로 3.0 텍스트로 정규화한 뒤 같은 추출기로 처리)
+    # vobject는 2.1의 값 없는 파라미터(TEL;CELL)를 singletonparams에 두고 직렬화 때 버리므로 TYPE으로 옮김
+    for child in contact.getChildren():
+        types = [param for param in child.singletonparams if param.upper() not in ENCODING_KEYWORDS]
+        if types:
+            child.params.setdefault("TYPE", []).extend(types)
+        child.singletonparams = []
+    return fast_card_to_row(contact.serialize().splitlines())
+
+def iter_contact_rows(vcf, parser="fast"):
+    # parser="fast": 빠른 파서 우선, 실패한 카드만 vobject로 처리
+    # parser="vobject": 모든 카드를 vobject로 처리
+    if parser == "vobject":
+        for contact in vobject.readComponents(vcf):
+            yield component_to_row(contact)
+        return
+
+    for block in iter_vcard_blocks(vcf):
+        try:
+            yield fast_card_to_row(block)
+        except Exception:
+            yield component_to_row(vobject.readOne("\r\n".join(block)))
+
+class ProgressCounter:
+    # 처리한 연락처 수와 초당 처리 속도를 한 줄에 갱신하며 출력
+    def __init__(self, interval=PROGRESS_INTERVAL):
+        self.interval = interval
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def tick(self):
+        self.count += 1
+        if self.count % self.interval == 0:
+            self.report(end="")
+
+    def report(self, end="\n"):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        print(f"\r⏳ {self.count:,}개 처리 ({self.count / elapsed:,.0f}개/초)", end=end, flush=True)
+
+# ==================== 병렬 샤드 처리 ====================
+def ordered_parallel_map(executor, func, arg_tuples, window):
+    # executor.map과 달리 입력을 미리 다 소비하지 않고, 대기 작업을 window개로 제한하며 순서대로 결과 반환
+    pending = deque()
+    for args in arg_tuples:
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def prompt_workers():
+    # 병렬 작업 수 입력 (엔터: CPU 코어 수, 1 이상의 정수가 아니면 다시 입력)
+    default = os.cpu_count() or 1
+    while True:
+        answer = input(f"병렬 작업 수 (엔터: CPU 코어 수 {default}): ").strip()
+        if not answer:
+            return default
+        try:
+            workers = int(answer)
+        except ValueError:
+            workers = 0
+        if workers >= 1:
+            return workers
+        print("❌ 1 이상의 숫자를 입력해주세요.")
+
+def find_shard_ranges(vcf_path, shards):
+    # 파일을 메모리 매핑해 대략 같은 크기로 나누되, 경계는 항상 줄 머리의 BEGIN:VCARD에 맞춤
+    size = os.path.getsize(vcf_path)
+    if size == 0:
+        return []
+
+    with open(vcf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        boundaries = [0]
+        for index in range(1, shards):
+            match = SHARD_BOUNDARY_PATTERN.search(mm, max(size * index // shards, boundaries[-1]))
+            if match is None:
+                break
+            position = match.start()
+            if position + 1 > boundaries[-1]:
+                boundaries.append(position + 1)
+        boundaries.append(size)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def parse_vcf_shard(vcf_path, start, end, parser="fast"):
+    # 샤드(바이트 범위) 하나를 파싱해 CSV 행 목록 반환 (프로세스 풀 작업 단위)
+    with open(vcf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode("utf-8-sig" if start == 0 else "utf-8")
+    return list(iter_contact_rows(text.splitlines(), parser))
+
+def vcard_to_csv_parallel(vcf_path, csv_path, workers, parser="fast"):
+    # VCF를 카드 경계에서 샤드로 나눠 여러 프로세스에서 파싱하고, 원래 순서대로 하나의 CSV로 병합
+    progress = ProgressCounter()
+    ranges = find_shard_ranges(vcf_path, workers * SHARDS_PER_WORKER)
+    tasks = ((vcf_path, start, end, parser) for start, end in ranges)
+
+    with open(csv_path, "w", newline="", encoding="utf-8-sig") as out, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.writer(out)
+        writer.writerow(CSV_HEADER)
+        for rows in ordered_parallel_map(executor, parse_vcf_shard, tasks, workers * PENDING_PER_WORKER):
+            writer.writerows(rows)
+            progress.count += len(rows)
+            progress.report(end="")
+
+    progress.report()
     print(f"✅ CSV 생성 완료: {csv_path}")
 
-def csv_to_vcard(csv_path, vcf_path):
-    df = pd.read_csv(csv_path, dtype=str).fillna("")
-    
-    with open(vcf_path, "w", encoding="utf-8") as vcf:
-        for _, row in df.iterrows():
-            vcard = vobject.vCard()
-            
-            # 이름 (N, FN)
-            vcard.add('n')
-            vcard.n.value = vobject.vcard.Name(family=row["Last Name"], given=row["First Name"])
-            vcard.add('fn')
-            vcard.fn.value = f"{row['First Name']} {row['Last Name']}".strip()
-
-            # 전화번호
-            if row["Phone 1"]:
-                vcard.add('tel').value = row["Phone 1"]
-                vcard.tel.type_param = "CELL"
-            if row["Phone 2"]:
-                t2 = vcard.add('tel')
-                t2.value = row["Phone 2"]
-                t2.type_param = "HOME"
-
-            # 이메일
-            if row["Email 1"]:
-                vcard.add('email').value = row["Email 1"]
-                vcard.email.type_param = "WORK"
-            if row["Email 2"]:
-                e2 = vcard.add('email')
-                e2.value = row["Email 2"]
-                e2.type_param = "HOME"
-
-            # 추가 필드
-            if row["Organization"]:
-                vcard.add('org').value = [row["Organization"]]
-            if row["URL"]:
-                vcard.add('url').value = row["URL"]
-            if row["Birthday"]:
-                vcard.add('bday').value = row["Birthday"]
-            if row["Address"]:
-                vcard.add('adr').value = vobject.vcard.Address(street=row["Address"])
-            if row["Memo"]:
-                vcard.add('note').value = row["Memo"]
-
-            vcf.write(vcard.serialize())
-
-    print(f"✅ VCF 생성 완료: {vcf_path}")
+def vcard_to_csv(vcf_path, csv_path, stream=True, parser="fast", workers=1):
+    # stream=True: 연락처를 읽는 즉시 CSV에 기록 (메모리 사용량 일정)
+    # stream=False: 전체를 DataFrame으로 모은 뒤 한 번에 기록 (기존 방식)
+    # parser: "fast" (빠른 파서 + vobject 대체) 또는 "vobject"
+    # workers > 1: 샤드 단위 병렬 파싱 (항상 스트리밍 기록)
+    if workers > 1:
+        vcard_to_csv_parallel(vcf_path, csv_path, workers, parser)
+        return
+
+    progress = ProgressCounter()
+
+    with open(vcf_path, "r", encoding="utf-8-sig") as vcf:
+        rows = iter_contact_rows(vcf, parser)
+
+        if stream:
+            with open(csv_path, "w", newline="", encoding="utf-8-sig") as out:
+                writer = csv.writer(out)
+                writer.writerow(CSV_HEADER)
+                for row in rows:
+                    writer.writerow(row)
+                    progress.tick()
+        else:
+            contacts = []
+            for row in rows:
+                contacts.append(row)
+                progress.tick()
+            df = pd.DataFrame(contacts, columns=CSV_HEADER)
+            df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+
+    progress.report()
+    print(f"✅ CSV 생성 완료: {csv_path}")
+
+# ==================== CSV → VCF 직렬화 ====================
+def escape_text(value):
+    # vCard 3.0 TEXT 값 이스케이프
+    if not ESCAPE_NEEDED_PATTERN.search(value):
+        return value
+    return (value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def fold_line(line):
+    # 75옥텟 단위로 줄 접기 (UTF-8 멀티바이트 문자는 중간에서 자르지 않음)
+    if len(line) <= VCARD_LINE_LIMIT and line.isascii():
+        return line + "\r\n"
+    encoded = line.encode("utf-8")
+    if len(encoded) <= VCARD_LINE_LIMIT:
+        return line + "\r\n"
+
+    pieces = []
+    start = 0
+    limit = VCARD_LINE_LIMIT
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode("utf-8"))
+        start = end
+        limit = VCARD_LINE_LIMIT - 1  # 이어지는 줄은 앞에 공백 한 칸
+    return "\r\n ".join(pieces) + "\r\n"
+
+def write_text(row, prop, start, width, type_index, lines):
+    # FN은 필수 속성이므로 비어 있어도 기록
+    if row[start] or prop == "FN":
+        lines.append(f"{prop}:{escape_text(row[start])}")
+
+def write_structured(row, prop, start, width, type_index, lines):
+    # N은 필수 속성이므로 비어 있어도 기록
+    if prop == "N" or any(row[start:start + width]):
+        lines.append(f"{prop}:{';'.join(escape_text(part) for part in row[start:start + width])}")
+
+def write_components(row, prop, start, width, type_index, lines):
+    if row[start]:
+        parts = split_structured(row[start], 0)
+        lines.append(f"{prop}:{';'.join(escape_text(part) for part in parts)}")
+
+def write_multi(row, prop, start, width, type_index, lines):
+    if not row[start]:
+        return
+    values = row[start].split("\n")
+    types = row[type_index].split("\n") if row[type_index] else []
+    for index, value in enumerate(values):
+        params = decode_params(types[index] if index < len(types) else "")
+        lines.append(f"{prop}{params}:{escape_text(unescape_text(value))}")
+
+def write_multi_structured(row, prop, start, width, type_index, lines):
+    columns = [row[start + offset].split("\n") for offset in range(width)]
+    count = max(len(column) for column in columns) if any(row[start:start + width]) else 0
+    types = row[type_index].split("\n") if row[type_index] else []
+    for index in range(count):
+        parts = [unescape_text(column[index]) if index < len(column) else "" for column in columns]
+        params = decode_params(types[index] if index < len(types) else "")
+        lines.append(f"{prop}{params}:{';'.join(escape_text(part) for part in parts)}")
+
+FIELD_WRITERS = {
+    "text": write_text,
+    "structured": write_structured,
+    "components": write_components,
+    "multi": write_multi,
+    "multi_structured": write_multi_structured,
+}
+PROPERTY_WRITERS = [
+    (FIELD_WRITERS[kind], prop, start, width, type_index)
+    for prop, (kind, start, width, type_index) in SCHEMA_FIELDS.items()
+]
+
+def row_to_vcard(row):
+    # 스키마 순서대로 vCard 3.0 텍스트를 직접 생성 (Other 칸의 원문 속성은 그대로 뒤에 붙임)
+    if not row[FULL_NAME_INDEX]:
+        row = list(row)
+        row[FULL_NAME_INDEX] = derived_full_name(row)
+
+    lines = ["BEGIN:VCARD", "VERSION:3.0"]
+    for write, prop, start, width, type_index in PROPERTY_WRITERS:
+        write(row, prop, start, width, type_index, lines)
+    if row[OTHER_INDEX]:
+        lines.extend(row[OTHER_INDEX].split("\n"))
+    lines.append("END:VCARD")
+
+    return "".join(fold_line(line) for line in lines)
+
+def serialize_rows(rows):
+    # 여러 행을 한 덩어리 텍스트로 직렬화 (프로세스 풀 작업 단위)
+    return "".join(row_to_vcard(row) for row in rows)
+
+def add_vobject_params(prop, cell):
+    # 타입 칸("CELL,VOICE;PREF=1")을 vobject 속성 파라미터로 설정
+    if not cell:
+        return
+    types, _, extra = cell.partition(";")
+    if types:
+        prop.params["TYPE"] = types.split(",")
+    for param in extra.split(";") if extra else []:
+        key, _, values = param.partition("=")
+        prop.params[key.upper()] = values.split(",")
+
+def row_to_vcard_vobject(row):
+    # vobject 객체 그래프 방식 직렬화 (느림, 빠른 직렬화 검증 및 비교용). row는 CSV_HEADER 순서의 값
+    if not row[FULL_NAME_INDEX]:
+        row = list(row)
+        row[FULL_NAME_INDEX] = derived_full_name(row)
+
+    vcard = vobject.vCard()
+    for prop, (kind, start, width, type_index) in SCHEMA_FIELDS.items():
+        values = row[start:start + width]
+        if kind == "structured":
+            if prop == "N" or any(values):
+                family, given, additional, prefix, suffix = values
+                vcard.add("n").value = vobject.vcard.Name(
+                    family=family, given=given, additional=additional, prefix=prefix, suffix=suffix
+                )
+        elif kind == "text":
+            if values[0] or prop == "FN":
+                vcard.add(prop.lower()).value = values[0]
+        elif kind == "components":
+            if values[0]:
+                vcard.add(prop.lower()).value = split_structured(values[0], 0)
+        else:
+            columns = [value.split("\n") for value in values]
+            count = max(len(column) for column in columns) if any(values) else 0
+            types = row[type_index].split("\n") if row[type_index] else []
+            for index in range(count):
+                parts = [unescape_text(column[index]) if index < len(column) else "" for column in columns]
+                item = vcard.add(prop.lower())
+                if kind == "multi":
+                    item.value = parts[0]
+                else:
+                    box, extended, street, city, region, code, country = parts
+                    item.value = vobject.vcard.Address(
+                        street=street, city=city, region=region, code=code,
+                        country=country, box=box, extended=extended
+                    )
+                add_vobject_params(item, types[index] if index < len(types) else "")
+
+    # Other 칸의 원문 속성은 vobject 콘텐츠 줄로 해석해 추가
+    for line in cell_values_raw(row[OTHER_INDEX]):
+        vcard.add(vobject.base.textLineToContentLine(line))
+    return vcard.serialize()
+
+def serialize_rows_vobject(rows):
+    return "".join(row_to_vcard_vobject(row) for row in rows)
+
+SERIALIZERS = {"fast": serialize_rows, "vobject": serialize_rows_vobject}
+
+def legacy_record_to_row(record):
+    # 이전 고정 컬럼 CSV(Phone 1/2, Email 1/2, Address) 한 줄 → 스키마 행
+    values = dict(zip(LEGACY_HEADER, record))
+    row = [""] * len(CSV_HEADER)
+    row[FIRST_NAME_INDEX] = values["First Name"]
+    row[LAST_NAME_INDEX] = values["Last Name"]
+    row[FULL_NAME_INDEX] = derived_full_name(row)
+
+    phones = [(values["Phone 1"], "CELL"), (values["Phone 2"], "HOME")]
+    emails = [(values["Email 1"], "WORK"), (values["Email 2"], "HOME")]
+    for column, pairs in (("Phone", phones), ("Email", emails)):
+        pairs = [(escape_cell(value), kind) for value, kind in pairs if value]
+        row[COLUMN_INDEX[column]] = "\n".join(value for value, _ in pairs)
+        row[COLUMN_INDEX[f"{column} Type"]] = "\n".join(kind for _, kind in pairs)
+
+    row[COLUMN_INDEX["Organization"]] = encode_components([values["Organization"]]) if values["Organization"] else ""
+    row[COLUMN_INDEX["URL"]] = escape_cell(values["URL"])
+    row[COLUMN_INDEX["Birthday"]] = values["Birthday"]
+    row[COLUMN_INDEX["Address Street"]] = escape_cell(values["Address"])
+    row[COLUMN_INDEX["Memo"]] = values["Memo"]
+    return tuple(row)
+
+def iter_csv_rows(csv_path):
+    # CSV를 한 줄씩 읽어 CSV_HEADER 순서의 튜플로 반환 (없는 컬럼은 빈 값, 이전 형식 CSV는 변환)
+    with open(csv_path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        legacy = "Phone 1" in header and "Phone" not in header
+        source = LEGACY_HEADER if legacy else CSV_HEADER
+        positions = [header.index(column) if column in header else None for column in source]
+        width = len(header)
+        for record in reader:
+            if len(record) < width:
+                record += [""] * (width - len(record))
+            values = tuple(record[i] if i is not None else "" for i in positions)
+            yield legacy_record_to_row(values) if legacy else values
+
+def iter_row_chunks(rows, size=SERIALIZE_CHUNK_ROWS):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def split_output_paths(vcf_path, parts):
+    stem, ext = os.path.splitext(vcf_path)
+    return [f"{stem}_{index + 1}{ext}" for index in range(parts)]
+
+def csv_to_vcard(csv_path, vcf_path, parts=1, workers=1, serializer="fast"):
+    # serializer="fast": 스키마 기반 템플릿 직렬화 + 큰 덩어리 단위 기록
+    # serializer="vobject": vobject 객체 그래프 방식 (느림, 비교용)
+    # parts > 1: 출력 파일을 N개로 나눔
+    # workers > 1: 덩어리 직렬화를 여러 프로세스에서 병렬 처리 (parts > 1이면 기본 parts개)
+    progress = ProgressCounter()
+    rows = iter_csv_rows(csv_path)
+    serialize = SERIALIZERS[serializer]
+
+    # 덩어리를 순서대로 파일에 돌아가며 배분 (각 파일 안에서는 원래 순서 유지)
+    output_paths = split_output_paths(vcf_path, parts) if parts > 1 else [vcf_path]
+    workers = max(workers, parts)
+    chunks = ((chunk,) for chunk in iter_row_chunks(rows))
+    outputs = [open(path, "w", newline="", encoding="utf-8") for path in output_paths]
+    try:
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            texts = ordered_parallel_map(executor, serialize, chunks, workers * PENDING_PER_WORKER)
+        else:
+            executor = None
+            texts = (serialize(*args) for args in chunks)
+
+        for index, text in enumerate(texts):
+            outputs[index % len(outputs)].write(text)
+            progress.count += text.count("BEGIN:VCARD\r\n")
+            progress.report(end="")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        for out in outputs:
+            out.close()
+
+    progress.report()
+    for path in output_paths:
+        print(f"✅ VCF 생성 완료: {path}")
+
+def verify_roundtrip(csv_path, limit=1000, check_vobject=True):
+    # CSV → VCF → CSV 왕복이 정확한지 확인 (vobject로 다시 읽은 결과도 함께 비교)
+    # 빈 Full Name은 이름에서 만들어 채우므로, 이 변환기가 만든 CSV 기준으로 정확히 일치해야 함
+    checked = 0
+    mismatches = 0
+    for row in iter_csv_rows(csv_path):
+        if checked >= limit:
+            break
+        checked += 1
+
+        expected = list(row)
+        if not expected[FULL_NAME_INDEX]:
+            expected[FULL_NAME_INDEX] = derived_full_name(expected)
+
+        text = row_to_vcard(row)
+        results = {"fast": fast_card_to_row(text.splitlines())}
+        if check_vobject:
+            results["vobject"] = component_to_row(vobject.readOne(text))
+
+        for parser, actual in results.items():
+            if actual != expected:
+                mismatches += 1
+                diff = {column: (want, got) for column, want, got in zip(CSV_HEADER, expected, actual) if want != got}
+                print(f"❌ {checked}번째 행 불일치 ({parser}): {diff}")
+    print(f"검증 완료: {checked}행 중 {mismatches}건 불일치")
+    return mismatches == 0
+
+def verify_serializer(csv_path, limit=1000):
+    # 빠른 직렬화 결과가 vobject 직렬화와 의미상 같은지 확인 (둘 다 vobject로 다시 읽어 비교)
+    checked = 0
+    mismatches = 0
+    for row in iter_csv_rows(csv_path):
+        if checked >= limit:
+            break
+        checked += 1
+        expected = component_to_row(vobject.readOne(row_to_vcard_vobject(row)))
+        actual = component_to_row(vobject.readOne(row_to_vcard(row)))
+        if expected != actual:
+            mismatches += 1
+            diff = {column: (want, got) for column, want, got in zip(CSV_HEADER, expected, actual) if want != got}
+            print(f"❌ {checked}번째 행 불일치 (vobject / fast): {diff}")
+    print(f"검증 완료: {checked}행 중 {mismatches}건 불일치")
+    return mismatches == 0
+
+# ==================== 중복 연락처 병합 ====================
+# 전화번호(E.164)/이메일 해시 인덱스로 같은 사람을 바로 묶고, 이름은 블록 인덱스로 후보만 비교한다.
+# 모든 쌍을 비교하지 않으므로 연락처 수에 거의 선형으로 동작한다.
+# 묶을 때마다 그룹 전체의 전화번호/이메일/생일을 비교해, 규칙상 다른 사람으로 판단되는 그룹끼리는 묶지 않는다.
+# 여러 연락처가 함께 쓰는 번호/메일(대표번호 등)은 같은 사람의 근거로도, 다른 사람의 근거로도 쓰지 않는다.
+
+PHONE_INDEX = COLUMN_INDEX["Phone"]
+EMAIL_INDEX = COLUMN_INDEX["Email"]
+BIRTHDAY_INDEX = COLUMN_INDEX["Birthday"]
+ORGANIZATION_INDEX = COLUMN_INDEX["Organization"]
+
+def normalize_phone(value, country_code=DEFAULT_COUNTRY_CODE):
+    # 010-1234-5678 → +821012345678, 0082... → +82..., 국가번호를 알 수 없는 짧은 번호는 숫자만
+    digits = re.sub(r"[^\d+]", "", value)
+    if digits.startswith("+"):
+        return "+" + digits[1:].replace("+", "")
+    digits = digits.replace("+", "")
+    if digits.startswith("00"):
+        return "+" + digits[2:]
+    if digits.startswith("0"):
+        return f"+{country_code}{digits[1:]}"
+    return digits
+
+def normalize_email(value):
+    return value.strip().lower()
+
+def normalize_name(value):
+    # 대소문자, 공백, 문장부호, 전각/반각 차이를 무시한 이름 키
+    value = unicodedata.normalize("NFKC", value).casefold()
+    return "".join(ch for ch in value if ch.isalnum())
+
+def cell_values(cell):
+    return [unescape_text(value) for value in cell.split("\n")] if cell else []
+
+def name_keys(row):
+    first, last = row[FIRST_NAME_INDEX], row[LAST_NAME_INDEX]
+    keys = {normalize_name(row[FULL_NAME_INDEX]), normalize_name(first + last), normalize_name(last + first)}
+    keys.discard("")
+    return keys
+
+class DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        # 먼저 나온 연락처가 대표가 되도록 작은 번호를 루트로
+        if root_b < root_a:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        return True
+
+def same_person_by_name(a, b):
+    # 이름이 같은 후보 중 같은 사람으로 볼 조건: 생일 충돌이 없고, 생일/소속이 같거나 한쪽에 연락처 정보가 없음
+    bday_a, bday_b = a[BIRTHDAY_INDEX], b[BIRTHDAY_INDEX]
+    if bday_a and bday_b and bday_a != bday_b:
+        return None
+    if bday_a and bday_a == bday_b:
+        return "name+birthday"
+    if a[ORGANIZATION_INDEX] and a[ORGANIZATION_INDEX] == b[ORGANIZATION_INDEX]:
+        return "name+organization"
+    if not (a[PHONE_INDEX] or a[EMAIL_INDEX]) or not (b[PHONE_INDEX] or b[EMAIL_INDEX]):
+        return "name+sparse"
+    return None
+
+def contact_evidence(row, shared_keys):
+    # 그룹 충돌 판단용 [전화번호 키, 이메일 키, 생일] 집합 (공유 키는 제외)
+    phones = {("phone", normalize_phone(value)) for value in cell_values(row[PHONE_INDEX])}
+    emails = {("email", normalize_email(value)) for value in cell_values(row[EMAIL_INDEX])}
+    phones = {key for key in phones if key[1] and key not in shared_keys}
+    emails = {key for key in emails if key[1] and key not in shared_keys}
+    return [phones, emails, {row[BIRTHDAY_INDEX]} if row[BIRTHDAY_INDEX] else set()]
+
+def conflicting_evidence(a, b):
+    # 양쪽 모두 값이 있는데 겹치는 전화번호/이메일/생일이 하나도 없으면 다른 사람
+    return any(values_a and values_b and not (values_a & values_b) for values_a, values_b in zip(a, b))
+
+def find_duplicate_clusters(rows):
+    # 반환: (DisjointSet, 병합 근거 목록 [(행 a, 행 b, 근거)], 충돌로 건너뛴 후보 목록 [(행 a, 행 b, 근거)])
+    groups = DisjointSet(len(rows))
+    reasons = []
+    skipped = []
+    key_rows = defaultdict(list)
+    name_blocks = defaultdict(list)
+
+    for number, row in enumerate(rows):
+        for index, normalize, label in (
+            (PHONE_INDEX, normalize_phone, "phone"),
+            (EMAIL_INDEX, normalize_email, "email"),
+        ):
+            for value in cell_values(row[index]):
+                key = normalize(value)
+                members = key_rows[(label, key)]
+                if key and (not members or members[-1] != number):
+                    members.append(number)
+
+        for key in name_keys(row):
+            block = name_blocks[key]
+            if len(block) < MAX_NAME_BLOCK:
+                block.append(number)
+
+    shared_keys = {key for key, members in key_rows.items() if len(members) > MAX_SHARED_KEY_CONTACTS}
+    # 그룹 대표(루트) 번호 → 그룹 전체의 근거 집합
+    evidence = [contact_evidence(row, shared_keys) for row in rows]
+
+    def merge(a, b, reason):
+        root_a, root_b = groups.find(a), groups.find(b)
+        if root_a == root_b:
+            return
+        if conflicting_evidence(evidence[root_a], evidence[root_b]):
+            skipped.append((a, b, reason))
+            return
+        groups.union(a, b)
+        root = groups.find(a)
+        absorbed = root_b if root == root_a else root_a
+        for values, more in zip(evidence[root], evidence[absorbed]):
+            values |= more
+        evidence[absorbed] = None
+        reasons.append((a, b, reason))
+
+    # 1) 공유되지 않은 전화번호/이메일
+    for key, members in key_rows.items():
+        if key in shared_keys:
+            continue
+        for number in members[1:]:
+            merge(members[0], number, f"{key[0]} {key[1]}")
+
+    # 2) 이름 블록 안에서만 쌍 비교 (같은 쌍이 여러 이름 키 블록에 나와도 한 번만)
+    candidates = set()
+    for block in name_blocks.values():
+        for i, a in enumerate(block):
+            for b in block[i + 1:]:
+                candidates.add((min(a, b), max(a, b)))
+
+    sparse_matches = defaultdict(set)
+    for a, b in sorted(candidates):
+        reason = same_person_by_name(rows[a], rows[b])
+        if reason is None:
+            continue
+        if reason != "name+sparse":
+            merge(a, b, reason)
+            continue
+        # 연락처 정보가 없는 쪽은 누구와 이어지는지 모아 두었다가 마지막에 판단
+        sparse_a = not (rows[a][PHONE_INDEX] or rows[a][EMAIL_INDEX])
+        sparse_b = not (rows[b][PHONE_INDEX] or rows[b][EMAIL_INDEX])
+        if sparse_a and sparse_b:
+            merge(a, b, reason)
+        else:
+            sparse, other = (a, b) if sparse_a else (b, a)
+            sparse_matches[sparse].add(other)
+
+    # 3) 이름만 같은 연락처 정보 없는 항목: 후보 그룹이 정확히 하나일 때만 병합 (여럿이면 누구인지 알 수 없음)
+    for sparse, others in sorted(sparse_matches.items()):
+        targets = {groups.find(other) for other in others} - {groups.find(sparse)}
+        if len(targets) == 1:
+            merge(sparse, next(other for other in sorted(others) if groups.find(other) in targets), "name+sparse")
+        elif targets:
+            skipped.extend((sparse, other, "name+sparse (ambiguous)") for other in sorted(others))
+
+    return groups, reasons, skipped
+
+def single_value_line(prop, kind, start, width, row):
+    # 단일 속성 값을 Other 칸에 보관할 원문 vCard 줄로 변환 (병합 시 충돌 값 보존용)
+    if kind == "structured":
+        return f"{prop}:{';'.join(escape_text(part) for part in row[start:start + width])}"
+    if kind == "components":
+        return f"{prop}:{';'.join(escape_text(part) for part in split_structured(row[start], 0))}"
+    return f"{prop}:{escape_text(row[start])}"
+
+def merge_rows(rows):
+    # 여러 행을 하나로 병합: 반복 값은 정규화 키로 중복 제거해 모두 유지,
+    # 단일 값은 첫 행 값을 쓰고 다른 값은 Other 칸에 원문 속성으로 보관
+    merged = list(rows[0])
+    conflicts = []
+    other_lines = cell_values_raw(merged[OTHER_INDEX])
+
+    for prop, (kind, start, width, type_index) in SCHEMA_FIELDS.items():
+        if kind in ("multi", "multi_structured"):
+            normalize = {"TEL": normalize_phone, "EMAIL": normalize_email}.get(prop, lambda v: v)
+            seen = set()
+            columns = [[] for _ in range(width)]
+            types = []
+            for row in rows:
+                parts = [row[start + offset].split("\n") if row[start + offset] else [] for offset in range(width)]
+                count = max(len(column) for column in parts)
+                row_types = row[type_index].split("\n") if row[type_index] else []
+                for index in range(count):
+                    value = tuple(column[index] if index < len(column) else "" for column in parts)
+                    key = tuple(normalize(unescape_text(part)) for part in value)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    for offset in range(width):
+                        columns[offset].append(value[offset])
+                    types.append(row_types[index] if index < len(row_types) else "")
+            for offset in range(width):
+                merged[start + offset] = "\n".join(columns[offset])
+            merged[type_index] = "\n".join(types)
+            continue
+
+        for row in rows[1:]:
+            current = merged[start:start + width]
+            candidate = row[start:start + width]
+            if not any(candidate) or candidate == current:
+                continue
+            if not any(current):
+                merged[start:start + width] = candidate
+                continue
+            line = single_value_line(prop, kind, start, width, row)
+            if line not in other_lines:
+                other_lines.append(line)
+                conflicts.append(f"{prop}: {' '.join(p for p in candidate if p)}")
+
+    for row in rows[1:]:
+        for line in cell_values_raw(row[OTHER_INDEX]):
+            if line not in other_lines:
+                other_lines.append(line)
+    merged[OTHER_INDEX] = "\n".join(other_lines)
+    return merged, conflicts
+
+def cell_values_raw(cell):
+    return cell.split("\n") if cell else []
+
+def dedupe_rows(rows, report_path=None):
+    # 중복 연락처를 찾아 병합한 행 목록 반환 (첫 등장 순서 유지), report_path에 병합 근거 기록
+    rows = [list(row) for row in rows]
+    groups, reasons, skipped = find_duplicate_clusters(rows)
+
+    clusters = defaultdict(list)
+    for number in range(len(rows)):
+        clusters[groups.find(number)].append(number)
+    cluster_reasons = defaultdict(list)
+    for a, b, reason in reasons:
+        cluster_reasons[groups.find(a)].append(f"#{a + 1}~#{b + 1} {reason}")
+
+    result = []
+    report = []
+    for root in sorted(clusters):
+        members = clusters[root]
+        if len(members) == 1:
+            result.append(rows[root])
+            continue
+        merged, conflicts = merge_rows([rows[number] for number in members])
+        result.append(merged)
+        report.append([
+            len(result),
+            merged[FULL_NAME_INDEX] or derived_full_name(merged),
+            " ".join(f"#{number + 1}" for number in members),
+            "; ".join(cluster_reasons[root]),
+            "; ".join(conflicts)
+        ])
+
+    if report_path:
+        with open(report_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Merged Row", "Name", "Source Rows", "Reasons", "Conflicts Kept In Other"])
+            writer.writerows(report)
+
+    print(f"🔗 중복 병합: {len(rows):,}개 → {len(result):,}개 ({len(report):,}개 그룹 병합)")
+    if skipped:
+        print(f"⚠️ 다른 사람으로 판단되는 정보가 있어 병합하지 않은 후보: {len(skipped):,}쌍")
+    return result
+
+def iter_any_rows(path, parser="fast"):
+    # 확장자에 따라 VCF 또는 CSV에서 스키마 행 읽기
+    if path.lower().endswith(".vcf"):
+        with open(path, "r", encoding="utf-8-sig") as vcf:
+            yield from iter_contact_rows(vcf, parser)
+    else:
+        yield from iter_csv_rows(path)
+
+def merge_address_books(input_paths, output_path, report_path=None):
+    # 여러 주소록(VCF/CSV)을 합쳐 중복을 병합하고, 출력 확장자에 맞춰 CSV 또는 VCF로 저장
+    # 원본 순서대로 이어 붙인 행 번호(#1부터)가 병합 보고서의 Source Rows에 기록됨
+    rows = []
+    for path in input_paths:
+        rows.extend(iter_any_rows(path))
+    merged = dedupe_rows(rows, report_path)
+
+    if output_path.lower().endswith(".vcf"):
+        with open(output_path, "w", newline="", encoding="utf-8") as vcf:
+            for chunk in iter_row_chunks(merged):
+                vcf.write(serialize_rows(chunk))
+        print(f"✅ VCF 생성 완료: {output_path}")
+    else:
+        with open(output_path, "w", newline="", encoding="utf-8-sig") as out:
+            writer = csv.writer(out)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(merged)
+        print(f"✅ CSV 생성 완료: {output_path}")
+    if report_path:
+        print(f"📝 병합 보고서: {report_path}")
 
 if __name__ == "__main__":
-    mode = input("작업 선택 (1: VCF -> CSV, 2: CSV -> VCF): ").strip()
+    mode = input("작업 선택 (1: VCF -> CSV, 2: CSV -> VCF, 3: 여러 주소록 병합 + 중복 제거): ").strip()
     
     # 경로 입력 단계
     in_dir = input("입력 폴더 경로 (현재 폴더는 엔터): ").strip() or "."
+
+    if mode == "3":
+        in_files = [name.strip() for name in input("입력 파일명들 (쉼표로 구분, VCF/CSV): ").split(",") if name.strip()]
+        in_paths = [os.path.join(in_dir, name) for name in in_files]
+        missing = [path for path in in_paths if not os.path.exists(path)]
+        if missing or not in_paths:
+            print(f"❌ 파일을 찾을 수 없습니다: {', '.join(missing)}")
+        else:
+            out_path = input("출력 파일 경로 (.csv 또는 .vcf): ").strip() or "merged.csv"
+            report_path = os.path.splitext(out_path)[0] + "_merge_report.csv"
+            merge_address_books(in_paths, out_path, report_path)
+        raise SystemExit
+
     in_file = input("입력 파일명 (확장자 포함): ").strip()
     in_path = os.path.join(in_dir, in_file)
 
@@ -116,7 +1071,9 @@ if __name__ == "__main__":
         out_file = in_file.rsplit(".", 1)[0] + (".csv" if mode == "1" else ".vcf")
         out_path = os.path.join(out_dir, out_file)
 
+        workers = prompt_workers()
+
         if mode == "1":
-            vcard_to_csv(in_path, out_path)
+            vcard_to_csv(in_path, out_path, workers=workers)
         else:
-            csv_to_vcard(in_path, out_path)
\ No newline at end of file
+            csv_to_vcard(in_path, out_path, workers=workers)
\ No newline at end of file